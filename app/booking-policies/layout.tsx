@@ -1,5 +1,6 @@
 import type { Metadata } from "next";
 import { generateMetadataFromConfig } from "../../lib/seo-metadata";
+import { getStructuredData } from "../../lib/structured-data";
 
 export async function generateMetadata(): Promise<Metadata> {
   return generateMetadataFromConfig("/booking-policies/");
@@ -10,5 +11,17 @@ export default function BookingPoliciesLayout({
 }: {
   children: React.ReactNode;
 }) {
-  return <>{children}</>;
+  const structuredData = getStructuredData("/booking-policies/");
+
+  return (
+    <>
+      {structuredData && (
+        <script
+          type="application/ld+json"
+          dangerouslySetInnerHTML={{ __html: structuredData }}
+        />
+      )}
+      {children}
+    </>
+  );
 }
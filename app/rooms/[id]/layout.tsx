@@ -1,7 +1,6 @@
 import { Metadata } from 'next';
 import { siteConfig, roomsSEOData } from '../../../lib/seo-config';
-import { BUSINESS_INFO, CONTACT } from '../../../lib/business-config';
-import { calculateAggregateRating, generateAggregateRatingSchema } from '../../../lib/review-schema';
+import { getStructuredData } from '../../../lib/structured-data';
 
 export async function generateMetadata({ params }: { params: { id: string } }): Promise<Metadata> {
   const room = roomsSEOData[params.id];
@@ -79,57 +78,18 @@ export default function RoomLayout({
   children: React.ReactNode;
   params: { id: string };
 }) {
-  const room = roomsSEOData[params.id];
-  
-  if (!room) {
+  // Hotel Room Schema.org structured data, pre-rendered by generate_rules.py
+  const structuredData = getStructuredData(`/rooms/${params.id}`);
+
+  if (!structuredData) {
     return <>{children}</>;
   }
 
-  // Calculate aggregate rating from reviews
-  const aggregateRating = calculateAggregateRating();
-
-  // Hotel Room Schema.org structured data
-  const structuredData = {
-    "@context": "https://schema.org",
-    "@type": "HotelRoom",
-    "name": room.name,
-    "description": room.description,
-    "image": `${siteConfig.url}${room.ogImage}`,
-    "url": `${siteConfig.url}/rooms/${params.id}`,
-    "aggregateRating": generateAggregateRatingSchema(aggregateRating),
-    "containedInPlace": {
-      "@type": "Hotel",
-      "name": BUSINESS_INFO.name,
-      "address": {
-        "@type": "PostalAddress",
-        "streetAddress": CONTACT.street,
-        "addressLocality": CONTACT.city,
-        "postalCode": CONTACT.zip,
-        "addressCountry": "XK"
-      },
-      "telephone": `+383 ${CONTACT.phone}`,
-      "email": CONTACT.email,
-      "url": BUSINESS_INFO.websiteUrl
-    },
-    "bed": room.amenities.find(a => a.includes("Bed")),
-    "amenityFeature": room.amenities.map(amenity => ({
-      "@type": "LocationFeatureSpecification",
-      "name": amenity
-    })),
-    "offers": {
-      "@type": "Offer",
-      "price": room.price.replace(/[€-]/g, ''),
-      "priceCurrency": "EUR",
-      "availability": "https://schema.org/InStock",
-      "url": `${siteConfig.url}/booking?room=${params.id}`
-    }
-  };
-
   return (
     <>
       <script
         type="application/ld+json"
-        dangerouslySetInnerHTML={{ __html: JSON.stringify(structuredData) }}
+        dangerouslySetInnerHTML={{ __html: structuredData }}
       />
       {children}
     </>
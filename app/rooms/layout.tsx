@@ -1,5 +1,6 @@
 import { Metadata } from 'next';
 import { generateMetadataFromConfig } from '../../lib/seo-metadata';
+import { getStructuredData } from '../../lib/structured-data';
 
 export const metadata: Metadata = generateMetadataFromConfig("/rooms/");
 
@@ -8,5 +9,17 @@ export default function RoomsLayout({
 }: {
   children: React.ReactNode;
 }) {
-  return <>{children}</>;
+  const structuredData = getStructuredData("/rooms/");
+
+  return (
+    <>
+      {structuredData && (
+        <script
+          type="application/ld+json"
+          dangerouslySetInnerHTML={{ __html: structuredData }}
+        />
+      )}
+      {children}
+    </>
+  );
 }
@@ -0,0 +1,325 @@
+"""Benchmarks for generate_rules.py
+
+Synthesizes business.yaml files and template sets at increasing sizes and
+times each generation stage. Results are printed as a table and can be
+written as JSON (--json) to track regressions across versions.
+Run `python benchmark_rules.py --help` for options.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import yaml
+
+import generate_rules
+
+# -----------------------------
+# Synthetic fixtures
+# -----------------------------
+# Placeholders sprinkled into synthetic templates, cycled in order
+TEMPLATE_PLACEHOLDERS = [
+    "BUSINESS_NAME", "WEBSITE_URL", "PRIMARY_KEYWORD", "CONTACT.PHONE", "CONTACT.EMAIL",
+    "SERVICES_MD", "LOCATIONS_MD", "META_TITLE", "META_DESCRIPTION", "AREA_SERVED",
+    "SOCIAL_PROFILES_ARRAY", "ALL_SERVICES_ARRAY", "BLOG_LINKS_MD", "CONTACT_MD",
+]
+
+def synthesize_business(locations=100, services=2, sub_services=2, blog_topics=5, social_profiles=2):
+    """Build a business.yaml-shaped dict scaled to the given sizes.
+
+    Starts from the site's own business.yaml so every key the generators
+    read is present, then replaces the lists that grow with the site.
+    """
+    with open(generate_rules.business_file, "r", encoding="utf-8") as f:
+        business = yaml.safe_load(f) or {}
+
+    service_items = []
+    for i in range(services):
+        service_items.append({
+            "NAME": f"Service {i}",
+            "URL": f"/service-{i}/",
+            "SUB_SERVICES": [
+                {"NAME": f"Service {i} Option {j}", "URL": f"/service-{i}-option-{j}/"}
+                for j in range(sub_services)
+            ],
+        })
+    all_services = [name for s in service_items for name in [s["NAME"]] + [sub["NAME"] for sub in s["SUB_SERVICES"]]]
+    all_urls = [url for s in service_items for url in [s["URL"]] + [sub["URL"] for sub in s["SUB_SERVICES"]]]
+
+    business.update({
+        "BUSINESS_NAME": "Benchmark Hotel",
+        "WEBSITE_URL": "https://example.com",
+        "PRIMARY_KEYWORD": "Hotel Services",
+        "LOCATIONS": [{"CITY": f"City {i}", "STATE": f"State {i % 50}"} for i in range(locations)],
+        "LOCATIONS_MD": [f"/city-{i}-state-{i % 50}/" for i in range(locations)],
+        "LOCATIONS_ARRAY": [f"City {i}, State {i % 50}" for i in range(locations)],
+        "CONTACT": {"PHONE": "044177665", "EMAIL": "info@example.com", "CITY": "City 0"},
+        "SERVICES": service_items,
+        "CORE_SERVICES": [s["NAME"] for s in service_items],
+        "CORE_SERVICES_URLS": [s["URL"] for s in service_items],
+        "ALL_SERVICES": all_services,
+        "ALL_SERVICES_URLS": all_urls,
+        "BLOG_TOPICS": [f"Guest's Guide to City {i}" for i in range(blog_topics)],
+        "SOCIAL_MEDIA": {
+            f"PLATFORM_{i}": {"URL": f"https://social-{i}.example.com/benchmark-hotel"}
+            for i in range(social_profiles)
+        },
+    })
+    return business
+
+def scale_business(size):
+    """Synthetic business.yaml for one point on the scaling curve"""
+    return synthesize_business(
+        locations=size,
+        services=max(1, size // 10),
+        sub_services=5,
+        blog_topics=max(1, size // 10),
+        social_profiles=min(size, 50),
+    )
+
+def synthesize_template(lines=1000, density=0.1):
+    """Build an MDX-style template where ``density`` of the lines hold a placeholder.
+
+    Lines mix plain text with apostrophes, HTML tags, <a> links and JSX
+    expressions so the post-processing passes have realistic work to do.
+    """
+    body = []
+    placeholders = 0
+    for i in range(lines):
+        if i * density >= placeholders:
+            ph = TEMPLATE_PLACEHOLDERS[placeholders % len(TEMPLATE_PLACEHOLDERS)]
+            placeholders += 1
+            body.append(f"<p className=\"line-{i}\">We're proud of {{{{{ph}}}}} and it's guests.</p>")
+        elif i % 3 == 0:
+            body.append(f"<a href=\"/page-{i}/\">Page {i}'s details</a> and {{items[{i}]}} that's listed")
+        else:
+            body.append(f"Line {i}: it's a plain paragraph that doesn't use any tags.")
+    return "\n".join(body) + "\n"
+
+def write_business(business, folder):
+    """Write a synthetic business.yaml into ``folder`` and return its path"""
+    path = os.path.join(folder, "business.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(business, f, allow_unicode=True, sort_keys=False)
+    return path
+
+def prepare_output_root(folder):
+    """Create an output root holding the files generators update in place"""
+    lib_folder = os.path.join(folder, "lib")
+    os.makedirs(lib_folder, exist_ok=True)
+    seo_config = os.path.join(generate_rules.script_dir, "lib/seo-config.ts")
+    if os.path.exists(seo_config):
+        shutil.copy(seo_config, lib_folder)
+    return folder
+
+# -----------------------------
+# Timing helpers
+# -----------------------------
+def best_of(fn, repeat=5, setup=None):
+    """Best wall-clock time of ``repeat`` calls, in milliseconds.
+
+    ``setup`` runs untimed before every call, e.g. to reset output files.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def quietly(fn):
+    """Run ``fn`` as a generation task so its warnings are collected, not printed"""
+    def run():
+        generate_rules._current_task.result = generate_rules.TaskResult("benchmark", "benchmark")
+        try:
+            return fn()
+        finally:
+            generate_rules._current_task.result = None
+    return run
+
+def record(results, benchmark, stage, elapsed, **params):
+    """Append one measurement in the machine-readable result format"""
+    results.append({"benchmark": benchmark, "stage": stage, "ms": round(elapsed, 3), "params": params})
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+def bench_yaml_load(locations, repeat):
+    """Compare business.yaml load strategies for a synthetic file"""
+    folder = tempfile.mkdtemp(prefix="bench-yaml-")
+    try:
+        path = write_business(synthesize_business(locations), folder)
+        with open(path, "rb") as f:
+            raw = f.read()
+
+        results = {"size_bytes": len(raw)}
+        results["safe_load (pure Python)"] = best_of(lambda: yaml.load(raw, Loader=yaml.SafeLoader), repeat)
+        if hasattr(yaml, "CSafeLoader"):
+            results["CSafeLoader"] = best_of(lambda: yaml.load(raw, Loader=yaml.CSafeLoader), repeat)
+
+        def cold():
+            shutil.rmtree(os.path.dirname(generate_rules.parsed_cache_path(path)), ignore_errors=True)
+            generate_rules.load_business(path)
+        results["load_business (cold cache)"] = best_of(cold, repeat)
+        results["load_business (cache hit)"] = best_of(lambda: generate_rules.load_business(path), repeat)
+
+        def touched():
+            os.utime(path)
+            generate_rules.load_business(path)
+        results["load_business (touched, same hash)"] = best_of(touched, repeat)
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def bench_business_stages(size, repeat):
+    """Time loading, placeholder derivation and every data generator for one size"""
+    results = []
+    folder = tempfile.mkdtemp(prefix="bench-stages-")
+    try:
+        business = scale_business(size)
+        path = write_business(business, folder)
+        params = {"size": size, "yaml_bytes": os.path.getsize(path)}
+
+        def cold_load():
+            generate_rules.load_business(path, use_cache=False)
+        record(results, "business", "yaml_load", best_of(cold_load, repeat), **params)
+        business = generate_rules.load_business(path, use_cache=False)
+
+        record(results, "business", "create_missing_placeholders",
+               best_of(lambda: generate_rules.create_missing_placeholders(business), repeat), **params)
+
+        output_root = os.path.join(folder, "site")
+        def reset_output():
+            shutil.rmtree(output_root, ignore_errors=True)
+            prepare_output_root(output_root)
+
+        generators = [("robots.txt", generate_rules.update_robots_txt), ("blog-posts.json", generate_rules.generate_blog_posts)]
+        generators += [(name, generator) for name, generator in generate_rules.DATA_GENERATORS]
+        for name, generator in generators:
+            run = quietly(lambda: generator(business, output_root))
+            record(results, "business", f"generate:{name}", best_of(run, repeat, setup=reset_output), **params)
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def bench_template_stages(lines, density, repeat):
+    """Time rendering, the JSX post-processing passes and the write of one template"""
+    results = []
+    folder = tempfile.mkdtemp(prefix="bench-template-")
+    try:
+        business = scale_business(100)
+        segments = generate_rules.compile_template(synthesize_template(lines, density))
+        params = {"lines": lines, "density": density, "placeholders": len(segments) // 2}
+
+        def render():
+            context = generate_rules.PlaceholderContext(business)
+            lookup = generate_rules.build_placeholder_lookup(segments, context)
+            return generate_rules.render_template(segments, lookup)
+        record(results, "template", "render", best_of(quietly(render), repeat), **params)
+
+        rendered = quietly(render)()
+        record(results, "template", "link_rewrite",
+               best_of(lambda: generate_rules.rewrite_links(rendered), repeat), **params)
+        linked = generate_rules.rewrite_links(rendered)
+        record(results, "template", "apostrophe_escape",
+               best_of(lambda: generate_rules.escape_apostrophes(linked), repeat), **params)
+        output = generate_rules.escape_apostrophes(linked)
+
+        output_path = os.path.join(folder, "rules", "benchmark.mdc")
+        def remove_output():
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        record(results, "template", "write_output",
+               best_of(quietly(lambda: generate_rules.write_output(output_path, output)), repeat, setup=remove_output),
+               bytes=len(output.encode("utf-8")), **params)
+        record(results, "template", "write_output (unchanged)",
+               best_of(quietly(lambda: generate_rules.write_output(output_path, output)), repeat),
+               bytes=len(output.encode("utf-8")), **params)
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def run_suite(sizes, lines, densities, repeat):
+    """Run the scaling benchmarks and return a list of measurements"""
+    results = []
+    for size in sizes:
+        results += bench_business_stages(size, repeat)
+    for density in densities:
+        results += bench_template_stages(lines, density, repeat)
+    return results
+
+def environment():
+    """Versions that results should be compared against"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=generate_rules.script_dir,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "generator_version": generate_rules.GENERATOR_VERSION,
+        "python": platform.python_version(),
+        "pyyaml": yaml.__version__,
+        "libyaml": hasattr(yaml, "CSafeLoader"),
+        "platform": platform.platform(),
+    }
+
+def parse_list(value, cast):
+    """Parse a comma separated command line list"""
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_rules.py")
+    parser.add_argument("--locations", type=int, default=5000, help="locations in the synthetic business.yaml for the YAML load comparison")
+    parser.add_argument("--sizes", default="10,100,1000", help="comma separated site sizes (locations; services and blog topics scale with size / 10)")
+    parser.add_argument("--lines", type=int, default=2000, help="lines in each synthetic template")
+    parser.add_argument("--densities", default="0.01,0.1,0.5", help="comma separated fractions of template lines holding a placeholder")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is reported)")
+    parser.add_argument("--json", metavar="PATH", help="also write machine-readable results to PATH ('-' for stdout only)")
+    args = parser.parse_args()
+
+    sizes = parse_list(args.sizes, int)
+    densities = parse_list(args.densities, float)
+
+    yaml_results = bench_yaml_load(args.locations, args.repeat)
+    yaml_bytes = yaml_results.pop("size_bytes")
+    results = [
+        {"benchmark": "yaml_load", "stage": name, "ms": round(elapsed, 3),
+         "params": {"locations": args.locations, "yaml_bytes": yaml_bytes}}
+        for name, elapsed in yaml_results.items()
+    ]
+    results += run_suite(sizes, args.lines, densities, args.repeat)
+
+    if args.json == "-":
+        print(json.dumps({"environment": environment(), "results": results}, indent=2))
+        return
+
+    print(f"YAML load, {args.locations} locations ({yaml_bytes / 1024:.0f} KiB):")
+    for name, elapsed in yaml_results.items():
+        print(f"  {name:<38} {elapsed:10.2f} ms")
+
+    for benchmark, keys in (("business", ("size",)), ("template", ("lines", "density"))):
+        print(f"\n{benchmark.capitalize()} stages:")
+        for entry in results:
+            if entry["benchmark"] != benchmark:
+                continue
+            label = ", ".join(f"{key}={entry['params'][key]}" for key in keys)
+            print(f"  {label:<24} {entry['stage']:<38} {entry['ms']:10.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\n📄 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 'use client';
 
 import { useState, useEffect, useRef } from 'react';
+import Link from 'next/link';
 import { io, Socket } from 'socket.io-client';
 import { FaTimes, FaPaperPlane, FaComments, FaMinus } from 'react-icons/fa';
 
@@ -16,6 +17,15 @@ interface Message {
   read: boolean;
 }
 
+// Instant answer from the server's generated index (server/chat-index.json)
+interface SuggestedAnswer {
+  kind: string;
+  title: string;
+  answer: string;
+  url: string | null;           // page with more detail, when the app has one
+  score: number;
+}
+
 interface ChatWidgetProps {
   userType?: 'guest' | 'staff';
 }
@@ -29,6 +39,7 @@ export default function ChatWidget({ userType = 'guest' }: ChatWidgetProps) {
   const [hasJoined, setHasJoined] = useState(false);
   const [isTyping, setIsTyping] = useState(false);
   const [otherUserTyping, setOtherUserTyping] = useState(false);
+  const [suggestedAnswers, setSuggestedAnswers] = useState<SuggestedAnswer[]>([]);
   const [roomId] = useState(() => userType === 'staff' ? 'hotel-support' : 'guest-' + Date.now());
   const userNameRef = useRef('');
   const messagesEndRef = useRef<HTMLDivElement>(null);
@@ -111,6 +122,10 @@ export default function ChatWidget({ userType = 'guest' }: ChatWidgetProps) {
       setMessages(history);
     });
 
+    socketInstance.on('suggested-answers', ({ answers }: { answers: SuggestedAnswer[] }) => {
+      setSuggestedAnswers(answers);
+    });
+
     socketInstance.on('user-typing', ({ userName: typingUser, isTyping }) => {
       // Only show typing indicator if it's not from the current user
       if (typingUser !== userNameRef.current) {
@@ -128,7 +143,7 @@ export default function ChatWidget({ userType = 'guest' }: ChatWidgetProps) {
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [messages, suggestedAnswers]);
 
   // Keep userNameRef in sync with userName
   useEffect(() => {
@@ -161,6 +176,7 @@ export default function ChatWidget({ userType = 'guest' }: ChatWidgetProps) {
 
     setInputMessage('');
     setIsTyping(false);
+    setSuggestedAnswers([]);
     
     if (typingTimeoutRef.current) {
       clearTimeout(typingTimeoutRef.current);
@@ -228,6 +244,7 @@ export default function ChatWidget({ userType = 'guest' }: ChatWidgetProps) {
                   setIsOpen(false);
                   setHasJoined(false);
                   setMessages([]);
+                  setSuggestedAnswers([]);
                   setUserName('');
                 }}
                 className="hover:bg-primary-700 p-2 rounded-full transition-colors"
@@ -307,6 +324,24 @@ export default function ChatWidget({ userType = 'guest' }: ChatWidgetProps) {
                     </div>
                   );
                 })}
+                {suggestedAnswers.length > 0 && (
+                  <div className="bg-white border border-primary-200 rounded-lg px-4 py-3 shadow-sm">
+                    <p className="text-xs font-semibold text-primary-700 mb-2">
+                      While you wait for our staff, this might help:
+                    </p>
+                    {suggestedAnswers.map((suggestion) => (
+                      <div key={suggestion.title} className="mb-2 last:mb-0">
+                        <p className="text-sm font-medium text-neutral-800">{suggestion.title}</p>
+                        <p className="text-sm text-neutral-600">{suggestion.answer}</p>
+                        {suggestion.url && (
+                          <Link href={suggestion.url} className="text-xs text-primary-600 hover:underline">
+                            Learn more
+                          </Link>
+                        )}
+                      </div>
+                    ))}
+                  </div>
+                )}
                 {otherUserTyping && (
                   <div className="flex justify-start">
                     <div className="bg-white text-neutral-600 rounded-lg px-4 py-2 shadow-sm">
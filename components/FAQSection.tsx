@@ -120,7 +120,7 @@ export default function FAQSection() {
   };
 
   return (
-    <section className="py-16 bg-gray-50">
+    <section id="faq" className="py-16 bg-gray-50">
       <div className="max-w-4xl mx-auto px-4 sm:px-6 lg:px-8">
         <h2 className="text-3xl sm:text-4xl font-bold text-gray-900 text-center mb-12">
           {language === 'sq' ? 'Pyetje të Shpeshta' : 'Frequently Asked Questions'}
@@ -6,6 +6,7 @@ import Image from "next/image";
 import { usePathname } from 'next/navigation';
 import { useLanguage } from "../lib/LanguageContext";
 import { t } from "../lib/translations";
+import SiteSearch from "./SiteSearch";
 
 export default function Header() {
   const { language, setLanguage } = useLanguage();
@@ -277,6 +278,11 @@ export default function Header() {
                 />
               </div>
 
+              {/* Site Search */}
+              <div className="px-8 pt-8 bg-white">
+                <SiteSearch onNavigate={closeMobileMenu} />
+              </div>
+
               {/* Menu Links */}
               <nav className="flex-1 px-8 py-10 bg-white">
                 <div className="space-y-4">
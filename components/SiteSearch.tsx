@@ -0,0 +1,101 @@
+'use client';
+
+import { useState, useEffect, useRef } from 'react';
+import Link from 'next/link';
+import { FaSearch } from 'react-icons/fa';
+import { useLanguage } from '../lib/LanguageContext';
+import type { SearchResult } from '../lib/search-index';
+
+interface SiteSearchProps {
+  onNavigate?: () => void;
+}
+
+const KIND_LABELS: Record<SearchResult['kind'], { en: string; sq: string }> = {
+  service: { en: 'Service', sq: 'Shërbim' },
+  location: { en: 'Location', sq: 'Vendndodhje' },
+  faq: { en: 'FAQ', sq: 'Pyetje' },
+  blog: { en: 'Blog', sq: 'Blog' },
+  review: { en: 'Review', sq: 'Vlerësim' },
+  policy: { en: 'Policy', sq: 'Politikë' },
+  room: { en: 'Room', sq: 'Dhomë' },
+};
+
+// Search over the generated index (lib/search-index.ts); the index is only
+// downloaded once the guest starts typing
+export default function SiteSearch({ onNavigate }: SiteSearchProps) {
+  const { language } = useLanguage();
+  const [query, setQuery] = useState('');
+  const [results, setResults] = useState<SearchResult[]>([]);
+  const [suggestions, setSuggestions] = useState<string[]>([]);
+  const latestQueryRef = useRef('');
+
+  useEffect(() => {
+    latestQueryRef.current = query;
+    if (!query.trim()) {
+      setResults([]);
+      setSuggestions([]);
+      return;
+    }
+    const timeout = setTimeout(async () => {
+      const { search, suggest } = await import('../lib/search-index');
+      const [found, completions] = await Promise.all([search(query, 8), suggest(query)]);
+      // Drop answers to a query the guest has already typed past
+      if (latestQueryRef.current !== query) return;
+      setResults(found);
+      setSuggestions(completions);
+    }, 150);
+    return () => clearTimeout(timeout);
+  }, [query]);
+
+  const completeWith = (term: string) => {
+    setQuery(query.replace(/\S*$/, term + ' '));
+  };
+
+  return (
+    <div className="relative">
+      <div className="flex items-center border border-neutral-300 rounded-lg px-4 py-3 focus-within:border-primary-600 transition-colors">
+        <FaSearch className="w-4 h-4 text-neutral-400 mr-3 flex-shrink-0" />
+        <input
+          type="search"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder={language === 'en' ? 'Search the site...' : 'Kërko në faqe...'}
+          aria-label={language === 'en' ? 'Search' : 'Kërko'}
+          className="w-full bg-transparent outline-none text-neutral-900 placeholder-neutral-400"
+        />
+      </div>
+
+      {query.trim() && (
+        <div className="mt-3 space-y-2">
+          {results.length === 0 && suggestions.length > 0 && (
+            <div className="flex flex-wrap gap-2">
+              {suggestions.map((term) => (
+                <button
+                  key={term}
+                  onClick={() => completeWith(term)}
+                  className="text-sm px-3 py-1 rounded-full bg-neutral-100 text-neutral-700 hover:bg-primary-50 hover:text-primary-700 transition-colors"
+                >
+                  {term}
+                </button>
+              ))}
+            </div>
+          )}
+          {results.map((result, i) => (
+            <Link
+              key={i}
+              href={result.url}
+              onClick={onNavigate}
+              className="block p-3 rounded-lg hover:bg-primary-50 transition-colors"
+            >
+              <span className="text-xs uppercase tracking-wide text-primary-600">
+                {KIND_LABELS[result.kind][language]}
+              </span>
+              <span className="block font-semibold text-neutral-900">{result.title}</span>
+              <span className="block text-sm text-neutral-600">{result.snippet}</span>
+            </Link>
+          ))}
+        </div>
+      )}
+    </div>
+  );
+}
@@ -1,30 +1,123 @@
 import yaml
 import os
+import pickle
 import json
+import math
+import csv
 import re
 import shutil
+import hashlib
+import gzip
+import html
+import io
+import difflib
+import argparse
+import threading
+import time
+import select
+import struct
+import unicodedata
+import ctypes
+import ctypes.util
+import sys
+from itertools import islice
+from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Prefer libyaml's C parser, which is much faster on large business.yaml files
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Optional: .br variants with --precompress need the brotli package
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # -----------------------------
 # Paths
 # -----------------------------
+# Layout of a site relative to its output root
+RULES_DIR = ".cursor/rules/"
+TEMPLATES_DIR = ".cursor/templates/"
+CACHE_DIR = ".generate_cache/"
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
 script_dir = os.path.dirname(os.path.abspath(__file__))
 business_file = os.path.join(script_dir, "business.yaml")
-rules_folder = os.path.join(script_dir, ".cursor/rules/")
-templates_folder = os.path.join(script_dir, ".cursor/templates/")
+rules_folder = os.path.join(script_dir, RULES_DIR)
+templates_folder = os.path.join(script_dir, TEMPLATES_DIR)
+manifest_file = os.path.join(script_dir, MANIFEST_PATH)
+
+def generator_fingerprint():
+    """Hash of this script's source.
+
+    Part of every manifest fingerprint, so any change to generator logic
+    makes previously generated files out of date without a manual bump.
+    """
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+GENERATOR_VERSION = generator_fingerprint()
 
 # -----------------------------
 # Load business YAML
 # -----------------------------
-try:
-    with open(business_file, "r") as f:
-        business = yaml.safe_load(f)
-    print(f"✅ Loaded business data from {business_file}")
-except FileNotFoundError:
-    print(f"❌ Error: {business_file} not found!")
-    exit(1)
-except Exception as e:
-    print(f"❌ Error loading {business_file}: {e}")
-    exit(1)
+PARSED_CACHE_VERSION = 1
+
+def parsed_cache_path(path):
+    """Location of the parsed-config cache for a YAML file"""
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, f"{name}.parsed.pickle")
+
+def load_business(path, use_cache=True):
+    """Parse a business.yaml file, reusing a cached parse when it is unchanged.
+
+    The cache is keyed by file size and mtime for a stat-only fast path, and
+    by the content hash so a touched but identical file is not reparsed.
+    """
+    if not use_cache:
+        with open(path, "rb") as f:
+            return yaml.load(f, Loader=SafeLoader)
+
+    stat = os.stat(path)
+    cache_path = parsed_cache_path(path)
+    cached = None
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("version") != PARSED_CACHE_VERSION:
+            cached = None
+        elif cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["data"]
+    except Exception:
+        cached = None
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    data = cached["data"] if cached and cached["sha256"] == digest else yaml.load(raw, Loader=SafeLoader)
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        entry = {
+            "version": PARSED_CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "data": data,
+        }
+        with open(cache_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return data
 
 # -----------------------------
 # Helper functions
@@ -102,106 +195,250 @@ def get_nested_value(data, key_path):
             return None
     return value
 
-def create_missing_placeholders(business_data):
-    """Create missing placeholders from existing data"""
-    placeholders = {}
-    
-    # Map existing data to expected placeholders
-    placeholders['BUSINESS_NAME'] = business_data.get('BUSINESS_NAME', business_data.get('SITE_NAME', ''))
-    placeholders['PRIMARY_KEYWORD'] = business_data.get('PRIMARY_KEYWORD', 'Landscaping')
-    placeholders['WEBSITE_URL'] = business_data.get('WEBSITE_URL', business_data.get('BASE_URL', ''))
-    
-    # Handle locations - use existing LOCATIONS_MD if available, otherwise generate from LOCATIONS
+# -----------------------------
+# Slug and URL index
+# -----------------------------
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SEPARATOR_PATTERN = re.compile(r"[\s_-]+")
+
+def slugify(text):
+    """URL slug for a name: lowercase, "&" -> "and", punctuation dropped, words joined by "-" """
+    text = str(text).lower().replace('&', 'and')
+    return SLUG_SEPARATOR_PATTERN.sub('-', SLUG_STRIP_PATTERN.sub('', text)).strip('-')
+
+# One addressable entity: kind is "service", "sub-service", "location" or "blog"
+Route = namedtuple("Route", ["kind", "name", "url", "slug", "parent"], defaults=(None,))
+
+# business.yaml keys the route index is built from
+ROUTE_INDEX_KEYS = (
+    'SERVICES', 'CORE_SERVICES', 'CORE_SERVICES_URLS', 'SERVICES_URLS',
+    'LOCATIONS', 'LOCATIONS_ARRAY', 'LOCATIONS_MD', 'BLOG_TOPICS',
+)
+
+class RouteIndex:
+    """Canonical URL for every service, sub-service, location and blog topic.
+
+    A URL given explicitly on the entity (SERVICES[].URL, LOCATIONS[].URL)
+    wins over the flattened lists (CORE_SERVICES_URLS, LOCATIONS_MD), which
+    win over a slug of the name. URLs claimed by two entities are listed in
+    ``duplicates`` (the first keeps the URL) and disagreeing sources in
+    ``conflicts``.
+    """
+
+    def __init__(self, business_data):
+        self.services = []       # core services, in order
+        self.all_services = []   # core services each followed by its sub-services
+        self.locations = []      # one per LOCATIONS / LOCATIONS_ARRAY position
+        self.blog_posts = []
+        self.by_url = {}
+        self.duplicates = []     # (url, route holding the URL, route that also claimed it)
+        self.conflicts = []
+        self._add_services(business_data)
+        self._add_locations(business_data)
+        for topic in business_data.get('BLOG_TOPICS', []):
+            slug = slugify(topic)
+            self.blog_posts.append(self._add(Route("blog", topic, f"/blog/{slug}/", slug)))
+
+    def _add(self, route):
+        existing = self.by_url.get(route.url)
+        if existing is None:
+            self.by_url[route.url] = route
+        elif existing != route:
+            self.duplicates.append((route.url, existing, route))
+        return route
+
+    def _route(self, kind, name, url, parent=None):
+        url = url or f"/{slugify(name)}/"
+        return self._add(Route(kind, name, url, url.strip('/').split('/')[-1], parent))
+
+    def _add_services(self, business_data):
+        hierarchy = business_data.get('SERVICES', [])
+        if not (hierarchy and isinstance(hierarchy[0], dict)):
+            hierarchy = []
+        explicit_urls = {s.get('NAME', ''): s.get('URL', '') for s in hierarchy}
+        flat_urls = business_data.get('CORE_SERVICES_URLS') or business_data.get('SERVICES_URLS') or []
+        if 'CORE_SERVICES' in business_data:
+            names = business_data['CORE_SERVICES']
+        elif hierarchy:
+            names = [s.get('NAME', '') for s in hierarchy]
+        else:
+            names = business_data.get('SERVICES', [])
+        sub_services = {s.get('NAME', ''): s.get('SUB_SERVICES', []) for s in hierarchy}
+
+        for i, name in enumerate(names):
+            explicit = explicit_urls.get(name)
+            flat = flat_urls[i] if i < len(flat_urls) else None
+            if explicit and flat and explicit != flat:
+                self.conflicts.append(f"{name}: SERVICES URL {explicit} differs from the flattened URL {flat}, using {explicit}")
+            service = self._route("service", name, explicit or flat)
+            self.services.append(service)
+            self.all_services.append(service)
+            for sub in sub_services.get(name, []):
+                self.all_services.append(self._route("sub-service", sub.get('NAME', ''), sub.get('URL'), name))
+
+    def _add_locations(self, business_data):
+        locations = business_data.get('LOCATIONS', [])
+        names = business_data.get('LOCATIONS_ARRAY', [])
+        flat_urls = business_data.get('LOCATIONS_MD', [])
+        for i in range(max(len(locations), len(names))):
+            loc = locations[i] if i < len(locations) else None
+            if i < len(names):
+                name = names[i]
+            elif isinstance(loc, dict):
+                name = ', '.join(part for part in (loc.get('CITY', ''), loc.get('STATE', '')) if part)
+            else:
+                name = str(loc)
+            url = loc.get('URL') if isinstance(loc, dict) else None
+            if not url and i < len(flat_urls) and str(flat_urls[i]).startswith('/'):
+                url = flat_urls[i]
+            self.locations.append(self._route("location", name, url))
+
+    def route_map(self):
+        """{url: entity} for every indexed URL"""
+        routes = {}
+        for url, route in self.by_url.items():
+            entry = {"type": route.kind, "name": route.name, "slug": route.slug}
+            if route.parent:
+                entry["parent"] = route.parent
+            routes[url] = entry
+        return routes
+
+_route_indexes = {}
+_route_index_lock = threading.Lock()
+
+def route_index(business_data):
+    """The RouteIndex for a business.yaml, built once and shared by every generator.
+
+    When called with a KeyRecorder the index's input keys are marked as read,
+    so outputs that use it are rebuilt when any of them change.
+    """
+    keys_read = getattr(business_data, "keys_read", None)
+    if keys_read is not None:
+        keys_read.update(ROUTE_INDEX_KEYS)
+    source = getattr(business_data, "source", business_data)
+    with _route_index_lock:
+        cached = _route_indexes.get(id(source))
+        if cached is None or cached[0] is not source:
+            # Long-lived processes (watch, batch) see many business dicts
+            if len(_route_indexes) >= 16:
+                _route_indexes.pop(next(iter(_route_indexes)))
+            cached = _route_indexes[id(source)] = (source, RouteIndex(source))
+        return cached[1]
+
+# -----------------------------
+# Derived placeholders
+# -----------------------------
+DERIVED_PLACEHOLDERS = {}
+
+def derives(*names):
+    """Register a builder that derives the given placeholders from business data"""
+    def register(builder):
+        for name in names:
+            DERIVED_PLACEHOLDERS[name] = builder
+        return builder
+    return register
+
+@derives('BUSINESS_NAME', 'PRIMARY_KEYWORD', 'WEBSITE_URL', 'CTA_TEXT')
+def derive_business_info(business_data):
+    """Map existing data to expected placeholders"""
+    return {
+        'BUSINESS_NAME': business_data.get('BUSINESS_NAME', business_data.get('SITE_NAME', '')),
+        'PRIMARY_KEYWORD': business_data.get('PRIMARY_KEYWORD', 'Landscaping'),
+        'WEBSITE_URL': business_data.get('WEBSITE_URL', business_data.get('BASE_URL', '')),
+        'CTA_TEXT': business_data.get('CTA_TEXT', 'Contact us today for a free consultation!'),
+    }
+
+@derives('LOCATIONS_MD')
+def derive_locations_md(business_data):
+    """Use existing LOCATIONS_MD if available, otherwise generate from LOCATIONS"""
     if 'LOCATIONS_MD' in business_data:
-        placeholders['LOCATIONS_MD'] = render_value(business_data['LOCATIONS_MD'], 'LOCATIONS_MD')
-    else:
-        placeholders['LOCATIONS_MD'] = render_value(business_data.get('LOCATIONS', []), 'LOCATIONS_MD')
-    
-    # Handle services - use flattened lists if available
+        return {'LOCATIONS_MD': render_value(business_data['LOCATIONS_MD'], 'LOCATIONS_MD')}
+    return {'LOCATIONS_MD': render_value(business_data.get('LOCATIONS', []), 'LOCATIONS_MD')}
+
+@derives('SERVICES_MD', 'SERVICES')
+def derive_services(business_data):
+    """Handle services - use flattened lists if available"""
     # Check for CORE_SERVICES (new hierarchical structure)
     if 'CORE_SERVICES' in business_data:
-        placeholders['SERVICES_MD'] = render_value(business_data['CORE_SERVICES'], 'SERVICES_MD')
-        placeholders['SERVICES'] = business_data['CORE_SERVICES']
-    elif 'SERVICES_MD' in business_data:
-        placeholders['SERVICES_MD'] = render_value(business_data['SERVICES_MD'], 'SERVICES_MD')
-    else:
-        # Handle old format (list of strings) or new format (list of dicts)
-        services = business_data.get('SERVICES', [])
-        if services and isinstance(services[0], dict):
-            # New hierarchical format - extract service names
-            service_names = [s.get('NAME', '') for s in services]
-            placeholders['SERVICES_MD'] = render_value(service_names, 'SERVICES_MD')
-            placeholders['SERVICES'] = service_names
-        else:
-            # Old format - simple list
-            placeholders['SERVICES_MD'] = render_value(services, 'SERVICES_MD')
-            placeholders['SERVICES'] = services
-    
-    placeholders['CTA_TEXT'] = business_data.get('CTA_TEXT', 'Contact us today for a free consultation!')
-    
-    # Meta information mapping
+        return {
+            'SERVICES_MD': render_value(business_data['CORE_SERVICES'], 'SERVICES_MD'),
+            'SERVICES': business_data['CORE_SERVICES'],
+        }
+    if 'SERVICES_MD' in business_data:
+        return {'SERVICES_MD': render_value(business_data['SERVICES_MD'], 'SERVICES_MD')}
+
+    # Handle old format (list of strings) or new format (list of dicts)
+    services = business_data.get('SERVICES', [])
+    if services and isinstance(services[0], dict):
+        # New hierarchical format - extract service names
+        services = [s.get('NAME', '') for s in services]
+    return {'SERVICES_MD': render_value(services, 'SERVICES_MD'), 'SERVICES': services}
+
+@derives('META_TITLE', 'META_DESCRIPTION', 'KEYWORDS_MD')
+def derive_meta(business_data):
+    """Meta information mapping"""
     meta = business_data.get('META', {})
-    placeholders['META_TITLE'] = meta.get('title', '')
-    placeholders['META_DESCRIPTION'] = meta.get('description', '')
-    placeholders['KEYWORDS_MD'] = render_value([meta.get('keywords', '')], 'KEYWORDS_MD')
-    
-    # Page-specific placeholders (these should be filled per-page, but provide defaults)
-    placeholders['PAGE_TITLE'] = business_data.get('PAGE_TITLE', '')
-    placeholders['PAGE_META_DESCRIPTION'] = business_data.get('PAGE_META_DESCRIPTION', '')
-    placeholders['PAGE_KEYWORDS_MD'] = render_value(business_data.get('PAGE_KEYWORDS', []), 'PAGE_KEYWORDS_MD')
-    placeholders['PAGE_URL_SLUG'] = business_data.get('PAGE_URL_SLUG', '')
-    placeholders['PAGE_CONTENT'] = business_data.get('PAGE_CONTENT', '')
-    
-    # Create service URLs - use flattened URLs if available
-    if 'CORE_SERVICES_URLS' in business_data:
-        service_urls = business_data['CORE_SERVICES_URLS']
-        placeholders['SERVICES_URLS'] = service_urls
-        placeholders['SERVICES_URLS_MD'] = render_value(service_urls, 'SERVICES_URLS_MD')
-    elif 'SERVICES_URLS' in business_data:
-        service_urls = business_data['SERVICES_URLS']
-        placeholders['SERVICES_URLS'] = service_urls
-        placeholders['SERVICES_URLS_MD'] = render_value(service_urls, 'SERVICES_URLS_MD')
-    else:
-        # Generate from SERVICES
-        services = business_data.get('SERVICES', [])
-        if services and isinstance(services[0], dict):
-            # New hierarchical format - extract URLs
-            service_urls = [s.get('URL', '') for s in services]
-        else:
-            # Old format - generate from service names
-            service_urls = [f"/{service.lower().replace(' ', '-').replace('(', '').replace(')', '').replace('&', 'and')}/" for service in services]
-        placeholders['SERVICES_URLS'] = service_urls
-        placeholders['SERVICES_URLS_MD'] = render_value(service_urls, 'SERVICES_URLS_MD')
-    
-    # Create blog links
-    blog_topics = business_data.get('BLOG_TOPICS', [])
-    blog_links = [f"/blog/{topic.lower().replace(' ', '-').replace(',', '').replace('&', 'and')}/" for topic in blog_topics]
-    placeholders['BLOG_LINKS_MD'] = render_value(blog_links, 'BLOG_LINKS_MD')
-    
-    # Contact info - handle both uppercase and lowercase keys
+    return {
+        'META_TITLE': meta.get('title', ''),
+        'META_DESCRIPTION': meta.get('description', ''),
+        'KEYWORDS_MD': render_value([meta.get('keywords', '')], 'KEYWORDS_MD'),
+    }
+
+@derives('PAGE_TITLE', 'PAGE_META_DESCRIPTION', 'PAGE_KEYWORDS_MD', 'PAGE_URL_SLUG', 'PAGE_CONTENT')
+def derive_page_defaults(business_data):
+    """Page-specific placeholders (these should be filled per-page, but provide defaults)"""
+    return {
+        'PAGE_TITLE': business_data.get('PAGE_TITLE', ''),
+        'PAGE_META_DESCRIPTION': business_data.get('PAGE_META_DESCRIPTION', ''),
+        'PAGE_KEYWORDS_MD': render_value(business_data.get('PAGE_KEYWORDS', []), 'PAGE_KEYWORDS_MD'),
+        'PAGE_URL_SLUG': business_data.get('PAGE_URL_SLUG', ''),
+        'PAGE_CONTENT': business_data.get('PAGE_CONTENT', ''),
+    }
+
+@derives('SERVICES_URLS', 'SERVICES_URLS_MD')
+def derive_service_urls(business_data):
+    """Service URLs from the route index"""
+    service_urls = [service.url for service in route_index(business_data).services]
+    return {
+        'SERVICES_URLS': service_urls,
+        'SERVICES_URLS_MD': render_value(service_urls, 'SERVICES_URLS_MD'),
+    }
+
+@derives('BLOG_LINKS_MD')
+def derive_blog_links(business_data):
+    """Create blog links"""
+    blog_links = [post.url for post in route_index(business_data).blog_posts]
+    return {'BLOG_LINKS_MD': render_value(blog_links, 'BLOG_LINKS_MD')}
+
+@derives('CONTACT_MD')
+def derive_contact_md(business_data):
+    """Contact info - handle both uppercase and lowercase keys"""
     contact = business_data.get('CONTACT', {})
     phone = contact.get('PHONE', contact.get('phone', ''))
     email = contact.get('EMAIL', contact.get('email', ''))
-    placeholders['CONTACT_MD'] = business_data.get('CONTACT_MD', f"Phone: {phone} | Email: {email}")
-    
-    # Arrays for schema
-    placeholders['LOCATIONS_ARRAY'] = business_data.get('LOCATIONS_ARRAY', business_data.get('LOCATIONS', []))
-    
+    return {'CONTACT_MD': business_data.get('CONTACT_MD', f"Phone: {phone} | Email: {email}")}
+
+@derives('LOCATIONS_ARRAY', 'SERVICES_ARRAY')
+def derive_schema_arrays(business_data):
+    """Arrays for schema"""
     # Handle SERVICES_ARRAY - use flattened list if available
     if 'ALL_SERVICES' in business_data:
-        placeholders['SERVICES_ARRAY'] = business_data['ALL_SERVICES']
+        services_array = business_data['ALL_SERVICES']
     elif 'SERVICES_ARRAY' in business_data:
-        placeholders['SERVICES_ARRAY'] = business_data['SERVICES_ARRAY']
+        services_array = business_data['SERVICES_ARRAY']
     else:
-        services = business_data.get('SERVICES', [])
-        if services and isinstance(services[0], dict):
+        services_array = business_data.get('SERVICES', [])
+        if services_array and isinstance(services_array[0], dict):
             # Extract service names from hierarchical structure
-            service_names = [s.get('NAME', '') for s in services]
-            placeholders['SERVICES_ARRAY'] = service_names
-        else:
-            placeholders['SERVICES_ARRAY'] = services
-    
-    # Social media profiles
+            services_array = [s.get('NAME', '') for s in services_array]
+    return {
+        'LOCATIONS_ARRAY': business_data.get('LOCATIONS_ARRAY', business_data.get('LOCATIONS', [])),
+        'SERVICES_ARRAY': services_array,
+    }
+
+@derives('SOCIAL_PROFILES_ARRAY')
+def derive_social_profiles(business_data):
+    """Social media profiles"""
     social_media = business_data.get('SOCIAL_MEDIA', {})
     social_profiles = []
     for platform, data in social_media.items():
@@ -209,9 +446,11 @@ def create_missing_placeholders(business_data):
             social_profiles.append(data['URL'])
         elif isinstance(data, str) and data:
             social_profiles.append(data)
-    placeholders['SOCIAL_PROFILES_ARRAY'] = business_data.get('SOCIAL_PROFILES_ARRAY', social_profiles)
-    
-    # Area served and language
+    return {'SOCIAL_PROFILES_ARRAY': business_data.get('SOCIAL_PROFILES_ARRAY', social_profiles)}
+
+@derives('AREA_SERVED', 'AVAILABLE_LANGUAGE')
+def derive_area_served(business_data):
+    """Area served and language"""
     locations = business_data.get('LOCATIONS', [])
     if locations and isinstance(locations[0], dict):
         # Handle dictionary locations (CITY-STATE format)
@@ -225,18 +464,140 @@ def create_missing_placeholders(business_data):
                 area_served.append(city)
             elif state:
                 area_served.append(state)
-        placeholders['AREA_SERVED'] = business_data.get('AREA_SERVED', ', '.join(area_served))
     else:
-        placeholders['AREA_SERVED'] = business_data.get('AREA_SERVED', ', '.join(str(loc) for loc in locations))
-    
-    placeholders['AVAILABLE_LANGUAGE'] = business_data.get('AVAILABLE_LANGUAGE', 'English')
-    
+        area_served = [str(loc) for loc in locations]
+    return {
+        'AREA_SERVED': business_data.get('AREA_SERVED', ', '.join(area_served)),
+        'AVAILABLE_LANGUAGE': business_data.get('AVAILABLE_LANGUAGE', 'English'),
+    }
+
+def create_missing_placeholders(business_data):
+    """Create missing placeholders from existing data"""
+    placeholders = {}
+    for builder in dict.fromkeys(DERIVED_PLACEHOLDERS.values()):
+        placeholders.update(builder(business_data))
     return placeholders
 
+class PlaceholderContext:
+    """Placeholder values for one business.yaml, resolved lazily and memoized.
+
+    Built once per run and shared by every template: a derived placeholder
+    is only computed the first time a template asks for it, and each
+    rendered value is reused by every later template.
+    """
+
+    def __init__(self, business_data):
+        self.business_data = business_data
+        self._derived = {}
+        self._builder_keys = {}
+        self._rendered = {}
+        self._keys = {}
+        # Templates may render in parallel; builders must still run once
+        self._lock = threading.RLock()
+
+    def get(self, name, default=None):
+        """Return a derived placeholder value, running its builder on first use"""
+        builder = DERIVED_PLACEHOLDERS.get(name)
+        with self._lock:
+            if builder is not None and builder not in self._builder_keys:
+                recorder = KeyRecorder(self.business_data)
+                self._derived.update(builder(recorder))
+                self._builder_keys[builder] = recorder.keys_read
+            return self._derived.get(name, default)
+
+    def render(self, ph):
+        """Return the rendered string for a placeholder (None if unknown)"""
+        with self._lock:
+            if ph not in self._rendered:
+                recorder = KeyRecorder(self.business_data)
+                self._rendered[ph] = resolve_placeholder(ph, recorder, self)
+                keys = set(recorder.keys_read)
+                builder = DERIVED_PLACEHOLDERS.get(ph)
+                if builder in self._builder_keys:
+                    keys |= self._builder_keys[builder]
+                self._keys[ph] = keys
+            return self._rendered[ph]
+
+    def keys_read(self, placeholders):
+        """Top-level business.yaml keys the given rendered placeholders depend on"""
+        keys = set()
+        for ph in placeholders:
+            keys |= self._keys.get(ph, set())
+        return keys
+
+# -----------------------------
+# Template engine
+# -----------------------------
+PLACEHOLDER_PATTERN = re.compile(r"{{(.*?)}}")
+EXAMPLE_PLACEHOLDER_PATTERN = re.compile(r"EXAMPLE_(\d+)")
+
+def compile_template(template):
+    """Tokenize a template once into literal and placeholder segments.
+
+    Returns a tuple where even indexes are literal text and odd indexes are
+    placeholder names, e.g. ("Hi ", "BUSINESS_NAME", "!").
+    """
+    return tuple(PLACEHOLDER_PATTERN.split(template))
+
+def resolve_placeholder(ph, business_data, derived_placeholders):
+    """Resolve a single placeholder name to its rendered string (None if unknown)"""
+    # Handle numbered examples (EXAMPLE_1, EXAMPLE_2, ...)
+    example_match = EXAMPLE_PLACEHOLDER_PATTERN.fullmatch(ph)
+    if example_match:
+        examples = business_data.get("EXAMPLES", [])
+        index = int(example_match.group(1))
+        if 1 <= index <= len(examples):
+            return render_value(examples[index - 1], ph)
+        return ""
+
+    # Handle nested dictionary access (e.g., CONTACT.PHONE)
+    if '.' in ph:
+        value = get_nested_value(business_data, ph)
+        # Try lowercase version if not found
+        if value is None:
+            keys = ph.split('.')
+            if len(keys) == 2:
+                parent_key = keys[0]
+                child_key = keys[1].lower()  # Try lowercase
+                if parent_key in business_data and isinstance(business_data[parent_key], dict):
+                    value = business_data[parent_key].get(child_key)
+    else:
+        value = business_data.get(ph) or derived_placeholders.get(ph)
+
+    if value is not None:
+        return render_value(value, ph)
+    if ph == "SUPPORTING_TOPICS_MD" and "SUPPORTING_TOPICS" in business_data:
+        return render_supporting_topics(business_data["SUPPORTING_TOPICS"])
+    return None
+
+def render_template(segments, lookup):
+    """Render compiled template segments in a single join.
+
+    ``lookup`` maps placeholder names to rendered strings and is shared by
+    every occurrence, so duplicate placeholders are only resolved once.
+    """
+    parts = list(segments)
+    for i in range(1, len(parts), 2):
+        parts[i] = lookup[parts[i]]
+    return "".join(parts)
+
+def build_placeholder_lookup(segments, context):
+    """Resolve every distinct placeholder used by compiled template segments"""
+    lookup = {}
+    for ph in segments[1::2]:
+        if ph in lookup:
+            continue
+        rendered = context.render(ph)
+        if rendered is None:
+            warn(f"Placeholder '{ph}' not found in business data")
+            rendered = ""
+        lookup[ph] = rendered
+    return lookup
 
-def update_robots_txt(business_data):
+
+def update_robots_txt(business_data, output_root=script_dir):
     """Update robots.txt with current business URL"""
-    robots_path = os.path.join(script_dir, "public/robots.txt")
+    robots_path = os.path.join(output_root, "public/robots.txt")
     website_url = business_data.get('WEBSITE_URL', 'https://yourbusiness.com')
     
     robots_content = f"""User-agent: *
@@ -263,18 +624,15 @@ Sitemap: {website_url}/sitemap.xml
 Crawl-delay: 1
 """
     
-    with open(robots_path, "w", encoding="utf-8") as f:
-        f.write(robots_content)
-    
-    print(f"✅ Updated: {robots_path}")
+    write_output(robots_path, robots_content)
 
 # -----------------------------
 # Data Generation Functions
 # -----------------------------
 
-def generate_ai_scrape_data(business_data):
+def generate_ai_scrape_data(business_data, output_root=script_dir):
     """Generate ai-scrape-data.json from business.yaml"""
-    output_path = os.path.join(script_dir, "public/ai-scrape-data.json")
+    output_path = os.path.join(output_root, "public/ai-scrape-data.json")
     
     # Get meta info
     meta = business_data.get('META', {})
@@ -301,30 +659,31 @@ def generate_ai_scrape_data(business_data):
     # Get locations
     locations = business_data.get('LOCATIONS_ARRAY', [])
     
-    # Build service pages
+    # Build service pages (streamed into the output one at a time)
+    routes = route_index(business_data)
     core_services = business_data.get('CORE_SERVICES', [])
-    core_urls = business_data.get('CORE_SERVICES_URLS', [])
-    service_pages = []
-    for i, service in enumerate(core_services):
-        url = core_urls[i] if i < len(core_urls) else f"/{service.lower().replace(' ', '-')}/"
-        service_pages.append({
-            "path": url,
-            "title": f"{service} Services in {', '.join(locations[:4])}",
-            "description": f"Professional {service} services in {', '.join(locations[:4])}. Expert craftsmanship and {business_data.get('CTA_TEXT', 'Contact us today!')}",
-            "type": "service"
-        })
+    top_locations = ', '.join(locations[:4])
+    cta_text = business_data.get('CTA_TEXT', 'Contact us today!')
+    def service_pages():
+        for service in routes.services:
+            yield {
+                "path": service.url,
+                "title": f"{service.name} Services in {top_locations}",
+                "description": f"Professional {service.name} services in {top_locations}. Expert craftsmanship and {cta_text}",
+                "type": "service"
+            }
     
-    # Build location pages
-    location_pages = []
-    locations_md = business_data.get('LOCATIONS_MD', [])
-    for i, loc in enumerate(locations):
-        slug = locations_md[i] if i < len(locations_md) else f"/{loc.lower().replace(', ', '-').replace(' ', '-')}/"
-        location_pages.append({
-            "path": slug,
-            "title": f"{business_data.get('BUSINESS_NAME', 'Our Company')} in {loc}",
-            "description": f"Professional {', '.join(core_services[:3]).lower()} services in {loc}",
-            "type": "location"
-        })
+    # Build location pages (streamed into the output one at a time)
+    location_business_name = business_data.get('BUSINESS_NAME', 'Our Company')
+    location_services = ', '.join(core_services[:3]).lower()
+    def location_pages():
+        for location in routes.locations:
+            yield {
+                "path": location.url,
+                "title": f"{location_business_name} in {location.name}",
+                "description": f"Professional {location_services} services in {location.name}",
+                "type": "location"
+            }
     
     ai_scrape_data = {
         "website_info": {
@@ -362,8 +721,8 @@ def generate_ai_scrape_data(business_data):
                 "type": "contact"
             }
         ],
-        "service_pages": service_pages,
-        "location_pages": location_pages[:10],  # Limit to first 10 for brevity
+        "service_pages": validated_items(service_pages(), PAGE_KEYS, "service_pages"),
+        "location_pages": validated_items(islice(location_pages(), 10), PAGE_KEYS, "location_pages"),  # Limit to first 10 for brevity
         "blog_topics": business_data.get('BLOG_TOPICS', []),
         "seo_data": {
             "primary_keyword": business_data.get('PRIMARY_KEYWORD', ''),
@@ -374,65 +733,64 @@ def generate_ai_scrape_data(business_data):
         }
     }
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(ai_scrape_data, f, indent=2)
-    
-    print(f"✅ Generated: {output_path}")
+    write_json_output(output_path, ai_scrape_data)
 
-def generate_blog_posts(business_data):
+def generate_blog_posts(business_data, output_root=script_dir):
     """Generate blog-posts.json stubs from business.yaml"""
-    output_path = os.path.join(script_dir, "data/blog-posts.json")
+    output_path = os.path.join(output_root, "data/blog-posts.json")
     
-    blog_topics = business_data.get('BLOG_TOPICS', [])
     business_name = business_data.get('BUSINESS_NAME', 'Our Company')
     primary_keyword = business_data.get('PRIMARY_KEYWORD', 'Services')
     
-    blog_posts = []
-    all_tags = set()
+    posts = route_index(business_data).blog_posts
+
+    # Tags only depend on the slugs, so they are known before any post is built
+    all_tags = {primary_keyword.lower()} if posts else set()
+    all_tags.update(post.slug for post in posts)
     
-    for i, topic in enumerate(blog_topics):
-        slug = topic.lower().replace(' ', '-').replace(',', '')
-        
-        # Create tags for this post
-        post_tags = [slug, primary_keyword.lower()]
-        all_tags.update(post_tags)
-        
-        blog_posts.append({
-            "id": slug,
-            "slug": slug,
-            "title": topic,
-            "excerpt": f"Expert advice and tips about {topic.lower()}. Learn from our professional team's experience in the industry.",
-            "content": f"# {topic}\n\nComprehensive guide to {topic.lower()}. Contact {business_name} for professional {primary_keyword.lower()}.\n\n[Content to be added]",
-            "date": "2024-01-01",
-            "publishedAt": "2024-01-01",
-            "updatedAt": "2024-01-01",
-            "author": {
-                "name": business_name,
-                "bio": f"Professional {primary_keyword.lower()} experts",
-                "avatar": "/assets/config/placeholder-image.png"
-            },
-            "category": {
-                "slug": primary_keyword.lower().replace(' ', '-'),
-                "name": primary_keyword,
-                "description": f"Tips and guides for {primary_keyword.lower()}"
-            },
-            "tags": post_tags,
-            "image": {
-                "url": "/assets/config/placeholder-image.png",
-                "alt": topic,
-                "width": 1200,
-                "height": 630
-            },
-            "readTime": "5 min read",
-            "featured": i == 0,
-            "status": "published",
-            "seo": {
-                "metaTitle": f"{topic} | {business_name}",
-                "metaDescription": f"Expert advice about {topic.lower()}. Professional {primary_keyword.lower()} tips and guides.",
-                "keywords": f"{topic.lower()}, {primary_keyword.lower()}",
-                "canonical": f"/blog/{slug}"
+    def blog_posts():
+        for i, post in enumerate(posts):
+            topic, slug = post.name, post.slug
+            
+            # Create tags for this post
+            post_tags = [slug, primary_keyword.lower()]
+            
+            yield {
+                "id": slug,
+                "slug": slug,
+                "title": topic,
+                "excerpt": f"Expert advice and tips about {topic.lower()}. Learn from our professional team's experience in the industry.",
+                "content": f"# {topic}\n\nComprehensive guide to {topic.lower()}. Contact {business_name} for professional {primary_keyword.lower()}.\n\n[Content to be added]",
+                "date": "2024-01-01",
+                "publishedAt": "2024-01-01",
+                "updatedAt": "2024-01-01",
+                "author": {
+                    "name": business_name,
+                    "bio": f"Professional {primary_keyword.lower()} experts",
+                    "avatar": "/assets/config/placeholder-image.png"
+                },
+                "category": {
+                    "slug": primary_keyword.lower().replace(' ', '-'),
+                    "name": primary_keyword,
+                    "description": f"Tips and guides for {primary_keyword.lower()}"
+                },
+                "tags": post_tags,
+                "image": {
+                    "url": "/assets/config/placeholder-image.png",
+                    "alt": topic,
+                    "width": 1200,
+                    "height": 630
+                },
+                "readTime": "5 min read",
+                "featured": i == 0,
+                "status": "published",
+                "seo": {
+                    "metaTitle": f"{topic} | {business_name}",
+                    "metaDescription": f"Expert advice about {topic.lower()}. Professional {primary_keyword.lower()} tips and guides.",
+                    "keywords": f"{topic.lower()}, {primary_keyword.lower()}",
+                    "canonical": f"/blog/{slug}"
+                }
             }
-        })
     
     # Create categories array (unique categories from all posts)
     categories = [
@@ -447,17 +805,14 @@ def generate_blog_posts(business_data):
     output_data = {
         "categories": categories,
         "tags": sorted(list(all_tags)),
-        "blogPosts": blog_posts
+        "blogPosts": blog_posts()
     }
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2)
-    
-    print(f"✅ Generated: {output_path}")
+    write_json_output(output_path, output_data)
 
-def generate_faqs(business_data):
+def generate_faqs(business_data, output_root=script_dir):
     """Generate faq.json from business.yaml"""
-    output_path = os.path.join(script_dir, "data/faq.json")
+    output_path = os.path.join(output_root, "data/faq.json")
     
     business_name = business_data.get('BUSINESS_NAME', 'Our Company')
     locations = business_data.get('LOCATIONS_ARRAY', [])
@@ -507,14 +862,11 @@ def generate_faqs(business_data):
     
     output_data = {"faqs": faqs}
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2)
-    
-    print(f"✅ Generated: {output_path}")
+    write_output(output_path, json.dumps(output_data, indent=2))
 
-def generate_portfolio(business_data):
+def generate_portfolio(business_data, output_root=script_dir):
     """Generate portfolio.json from business.yaml"""
-    output_path = os.path.join(script_dir, "data/portfolio.json")
+    output_path = os.path.join(output_root, "data/portfolio.json")
     
     business_name = business_data.get('BUSINESS_NAME', 'Our Company')
     locations = business_data.get('LOCATIONS', [])
@@ -552,20 +904,28 @@ def generate_portfolio(business_data):
         "yearsExperience": 10,
         "averageRating": 4.9
     }
+
+    # Real guest numbers once the review exports have been aggregated
+    review_summary = read_output(os.path.join(output_root, REVIEW_SUMMARY_PATH))
+    if review_summary:
+        review_summary = json.loads(review_summary)
+        if review_summary.get("reviewCount"):
+            stats["happyClients"] = review_summary["positiveCount"]
+            stats["averageRating"] = round(review_summary["ratingValue"] / 2, 1)   # out of 5
     
     output_data = {
         "stats": stats,
         "projects": projects
     }
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2)
-    
-    print(f"✅ Generated: {output_path}")
+    write_output(output_path, json.dumps(output_data, indent=2))
 
-def generate_business_config(business_data):
+def generate_business_config(business_data, output_root=script_dir):
     """Generate lib/business-config.ts from business.yaml"""
-    config_path = os.path.join(script_dir, "lib/business-config.ts")
+    config_path = os.path.join(output_root, "lib/business-config.ts")
+    if business_data.get('BUSINESS_CONFIG_MODE', 'single') == 'split':
+        generate_business_modules(business_data, output_root)
+        return
     
     business_name = business_data.get('BUSINESS_NAME', 'Our Company')
     website_url = business_data.get('WEBSITE_URL', 'https://example.com')
@@ -603,11 +963,15 @@ def generate_business_config(business_data):
     # Meta
     meta = business_data.get('META', {})
     
+    # Canonical URLs from the route index, keyed by (parent, name)
+    routes = route_index(business_data)
+    route_urls = {(route.parent, route.name): route.url for route in routes.all_services}
+    
     # Format services for TypeScript
     def format_service(service):
         if isinstance(service, dict):
             name = service.get('NAME', '')
-            url = service.get('URL', '')
+            url = route_urls.get((None, name), service.get('URL', ''))
             sub_services = service.get('SUB_SERVICES', [])
             
             sub_services_str = ""
@@ -615,7 +979,7 @@ def generate_business_config(business_data):
                 sub_items = []
                 for sub in sub_services:
                     sub_name = sub.get('NAME', '')
-                    sub_url = sub.get('URL', '')
+                    sub_url = route_urls.get((name, sub_name), sub.get('URL', ''))
                     sub_items.append(f'      {{ name: "{sub_name}", url: "{sub_url}" }}')
                 sub_services_str = f",\n    subServices: [\n" + ",\n".join(sub_items) + "\n    ]"
             
@@ -625,15 +989,14 @@ def generate_business_config(business_data):
     services_ts = ",\n".join([format_service(s) for s in services])
     
     # Format locations for TypeScript
-    def format_location(loc):
+    def format_location(loc, route):
         if isinstance(loc, dict):
             city = loc.get('CITY', '')
             state = loc.get('STATE', '')
-            url = loc.get('URL', f"/{city.lower().replace(' ', '-')}-{state.lower()}/")
-            return f'  {{ city: "{city}", state: "{state}", url: "{url}" }}'
+            return f'  {{ city: "{city}", state: "{state}", url: "{route.url}" }}'
         return ''
     
-    locations_ts = ",\n".join([format_location(loc) for loc in locations])
+    locations_ts = ",\n".join([format_location(loc, route) for loc, route in zip(locations, routes.locations)])
     
     # Format social media
     social_media_entries = []
@@ -878,377 +1241,3824 @@ export const getLegalLinks = () => [
 ];
 '''
     
-    with open(config_path, "w", encoding="utf-8") as f:
-        f.write(ts_content)
-    
-    print(f"✅ Generated: {config_path}")
+    write_output(config_path, ts_content)
 
-def generate_seo_config(business_data):
-    """Update siteConfig and seoConfigs in lib/seo-config.ts from business.yaml"""
-    config_path = os.path.join(script_dir, "lib/seo-config.ts")
-    
-    # Read existing file
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            file_content = f.read()
-    except FileNotFoundError:
-        print(f"⚠️  Warning: {config_path} not found, skipping update")
-        return
-    
-    business_name = business_data.get('BUSINESS_NAME', 'Example Company')
+BUSINESS_MODULE_HEADER = """/**
+ * {title}
+ * This file is AUTO-GENERATED from business.yaml
+ * Run `python generate_rules.py` to regenerate
+ * DO NOT EDIT THIS FILE DIRECTLY - Edit business.yaml instead
+ */
+"""
+
+def ts_literal(value):
+    """A JSON value as a TypeScript literal"""
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+def generate_business_modules(business_data, output_root=script_dir):
+    """Generate lib/business/ as small per-domain modules (BUSINESS_CONFIG_MODE: split).
+
+    Flattened arrays, lookup maps and navigation lists are computed here and
+    written as literals, so importing a module does no work at evaluation
+    time and client bundles only pull in the domains they use.
+    lib/business-config.ts re-exports everything for existing imports.
+    """
+    modules_folder = os.path.join(output_root, "lib/business")
     website_url = business_data.get('WEBSITE_URL', 'https://example.com')
-    meta = business_data.get('META', {})
+    categories = business_data.get('CATEGORIES', {})
     contact = business_data.get('CONTACT', {})
-    social_media = business_data.get('SOCIAL_MEDIA', {})
-    core_services = business_data.get('CORE_SERVICES', [])
     hours = business_data.get('HOURS', {})
     google_maps = business_data.get('GOOGLE_MAPS', {})
-    
-    # Format business hours
-    monday_hours = hours.get('MONDAY', 'Monday - Friday: 9:00 AM - 6:00 PM')
-    
-    # Extract social media links
-    facebook = social_media.get('FACEBOOK', {}).get('URL', '')
-    twitter = social_media.get('TWITTER', {}).get('URL', '')
-    linkedin = social_media.get('LINKEDIN', {}).get('URL', '')
-    instagram = social_media.get('INSTAGRAM', {}).get('URL', '')
-    youtube = social_media.get('YOUTUBE', {}).get('URL', '')
-    pinterest = social_media.get('PINTEREST', {}).get('URL', '')
-    nextdoor = social_media.get('NEXTDOOR', {}).get('URL', '')
-    yelp = social_media.get('YELP', {}).get('URL', '')
-    
-    # Extract twitter handle
-    twitter_handle = twitter.split('/')[-1] if twitter else business_name.lower().replace(' ', '')
-    
-    # Build social object with only existing links
-    social_lines = []
-    if facebook:
-        social_lines.append(f'    facebook: "{facebook}",')
-    if twitter:
-        social_lines.append(f'    twitter: "{twitter}",')
-        social_lines.append(f'    twitterHandle: "{twitter_handle}",')
-    if instagram:
-        social_lines.append(f'    instagram: "{instagram}",')
-    if linkedin:
-        social_lines.append(f'    linkedin: "{linkedin}",')
-    if youtube:
-        social_lines.append(f'    youtube: "{youtube}",')
-    if pinterest:
-        social_lines.append(f'    pinterest: "{pinterest}",')
-    if nextdoor:
-        social_lines.append(f'    nextdoor: "{nextdoor}",')
-    if yelp:
-        social_lines.append(f'    yelp: "{yelp}",')
-    
-    social_content = '\n'.join(social_lines).rstrip(',')  # Remove trailing comma from last item
-    
-    # Build new siteConfig
-    new_site_config = f'''export const siteConfig: SiteConfig = {{
-  name: "{business_name}",
-  url: process.env.NODE_ENV === 'development' ? 'http://localhost:3000' : '{website_url}',
-  description: "{meta.get('description', '')}",
-  logo: "/assets/config/logo.png",
-  favicon: "/assets/config/favicon.ico",
-  themeColor: "#3B82F6",
-  author: "{business_name}",
-  copyright: "© 2024 {business_name}. All rights reserved.",
-  social: {{
-{social_content}
-  }},
-  contact: {{
-    phone: "{contact.get('PHONE', '')}",
-    email: "{contact.get('EMAIL', '')}",
-    address: "{contact.get('STREET', contact.get('ADDRESS', ''))}",
-    city: "{contact.get('CITY', '')}",
-    state: "{contact.get('STATE', '')}",
-    zipCode: "{contact.get('ZIP', '')}",
-    country: "USA"
-  }},
-  businessHours: "{monday_hours}",
-  services: {json.dumps(core_services)},
-  coordinates: {{
-    latitude: "{google_maps.get('LATITUDE', '0')}",
-    longitude: "{google_maps.get('LONGITUDE', '0')}"
-  }}
-}};'''
-    
-    # Get locations for SEO
-    locations = business_data.get('LOCATIONS_ARRAY', [])
-    primary_cities = ', '.join(locations[:4]) if len(locations) >= 4 else ', '.join(locations)
-    
-    # Build new seoConfigs
-    keywords_list = ', '.join([f'"{business_data.get("PRIMARY_KEYWORD", "")}"'] + [f'"{service.lower()}"' for service in core_services[:3]])
-    
-    new_seo_configs = f'''export const seoConfigs: Record<string, SEOConfig> = {{
-  "/": {{
-    title: "{meta.get('title', '')}",
-    description: "{meta.get('description', '')}",
-    keywords: [{keywords_list}],
-    canonical: "{website_url}/",
-    ogImage: "{website_url}/og.png",
-    ogType: 'website',
-    twitterCard: 'summary_large_image',
-    geoRegion: "{contact.get('STATE', 'TX')}-US",
-    geoPlacename: "{contact.get('CITY', '')}, {contact.get('STATE', 'TX')}"
-  }},
-  "/about": {{
-    title: "About {business_name} | Professional {business_data.get('PRIMARY_KEYWORD', 'Services')}",
-    description: "Learn about {business_name}, your trusted {business_data.get('PRIMARY_KEYWORD', 'service')} provider in {primary_cities}. Expert team with years of experience.",
-    keywords: [{keywords_list}, "about us", "{business_name.lower()}"],
-    canonical: "{website_url}/about",
-    ogImage: "{website_url}/og.png",
-    ogType: 'website',
-    twitterCard: 'summary_large_image'
-  }},
-  "/contact": {{
-    title: "Contact {business_name} | {contact.get('PHONE', '')}",
-    description: "Contact {business_name} for professional {business_data.get('PRIMARY_KEYWORD', 'services').lower()} in {primary_cities}. Call {contact.get('PHONE', '')} or email us today!",
-    keywords: ["contact", "get quote", "{business_data.get('PRIMARY_KEYWORD', '').lower()}", "{contact.get('CITY', '')}"],
-    canonical: "{website_url}/contact",
-    ogImage: "{website_url}/og.png",
-    ogType: 'website',
-    twitterCard: 'summary_large_image'
-  }},
-  "/services": {{
-    title: "{business_data.get('PRIMARY_KEYWORD', 'Services')} | {business_name}",
-    description: "Complete {business_data.get('PRIMARY_KEYWORD', 'services').lower()} including {', '.join(core_services[:3])} in {primary_cities}. Professional quality guaranteed.",
-    keywords: [{keywords_list}],
-    canonical: "{website_url}/services",
-    ogImage: "{website_url}/og.png",
-    ogType: 'website',
-    twitterCard: 'summary_large_image'
-  }},
-  "/portfolio": {{
-    title: "Portfolio | {business_name} Projects",
-    description: "View our {business_data.get('PRIMARY_KEYWORD', 'service').lower()} portfolio. Quality projects across {primary_cities}. See our work and get inspired!",
-    keywords: ["portfolio", "projects", "gallery", "{business_data.get('PRIMARY_KEYWORD', '').lower()}"],
-    canonical: "{website_url}/portfolio",
-    ogImage: "{website_url}/og.png",
-    ogType: 'website',
-    twitterCard: 'summary_large_image'
-  }},
-  "/service-areas": {{
-    title: "Service Areas | {business_name}",
-    description: "We serve {primary_cities} and surrounding areas. Professional {business_data.get('PRIMARY_KEYWORD', 'services').lower()} throughout the region.",
-    keywords: ["service areas", "locations", "{contact.get('CITY', '')}", "{contact.get('STATE', 'TX')}"],
-    canonical: "{website_url}/service-areas",
-    ogImage: "{website_url}/og.png",
-    ogType: 'website',
-    twitterCard: 'summary_large_image'
-  }}
-}};'''
-    
-    # Replace siteConfig using regex
-    site_config_pattern = r'export const siteConfig: SiteConfig = \{[^}]*(?:\{[^}]*\}[^}]*)*\};'
-    if re.search(site_config_pattern, file_content, re.DOTALL):
-        file_content = re.sub(site_config_pattern, new_site_config, file_content, flags=re.DOTALL)
-    else:
-        print("⚠️  Warning: Could not find siteConfig pattern in file")
-    
-    # Replace seoConfigs using regex
-    seo_configs_pattern = r'export const seoConfigs: Record<string, SEOConfig> = \{[^}]*(?:\{[^}]*\}[^}]*)*\};'
-    if re.search(seo_configs_pattern, file_content, re.DOTALL):
-        file_content = re.sub(seo_configs_pattern, new_seo_configs, file_content, flags=re.DOTALL)
-    else:
-        print("⚠️  Warning: Could not find seoConfigs pattern in file")
-    
-    # Write updated content back
-    with open(config_path, "w", encoding="utf-8") as f:
-        f.write(file_content)
-    
-    print(f"✅ Updated: {config_path} (siteConfig & seoConfigs only)")
+    meta = business_data.get('META', {})
 
-# -----------------------------
-# Process all templates
-# -----------------------------
-templates_processed = 0
+    def write_module(name, title, body, imports=""):
+        header = BUSINESS_MODULE_HEADER.format(title=title)
+        content = header + ("\n" + imports if imports else "") + "\n" + body.strip("\n") + "\n"
+        write_output(os.path.join(modules_folder, f"{name}.ts"), content)
 
-# Check if templates folder exists
-if not os.path.exists(templates_folder):
-    print(f"❌ Templates folder not found: {templates_folder}")
-    print("Please ensure templates are in the correct location.")
-    exit(1)
+    routes = route_index(business_data)
 
-print(f"📁 Processing templates from: {templates_folder}")
+    # Services
+    core_services = []
+    all_services = []
+    children = {}
+    for route in routes.all_services:
+        service = {"name": route.name, "url": route.url}
+        all_services.append(service)
+        if route.parent is not None:
+            children.setdefault(route.parent, []).append(service)
+    for service in routes.services:
+        item = {"name": service.name, "url": service.url}
+        sub_services = children.get(service.name)
+        if sub_services:
+            item["subServices"] = sub_services
+        core_services.append(item)
+    services_by_url = {}
+    for service in all_services:
+        services_by_url.setdefault(service["url"], service)
 
-for file_name in os.listdir(templates_folder):
-    if not file_name.endswith(".template"):
-        continue
+    # Locations
+    locations = []
+    for loc, route in zip(business_data.get('LOCATIONS', []), routes.locations):
+        if isinstance(loc, dict):
+            locations.append({"city": loc.get('CITY', ''), "state": loc.get('STATE', ''), "url": route.url})
+    locations_by_url = {}
+    for location in locations:
+        locations_by_url.setdefault(location["url"], location)
 
-    template_path = os.path.join(templates_folder, file_name)
-    print(f"🔄 Processing: {file_name}")
-    
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template = f.read()
+    # Social media
+    social_media = {}
+    for platform, data in business_data.get('SOCIAL_MEDIA', {}).items():
+        if isinstance(data, dict) and data.get('URL'):
+            social_media[platform.lower()] = data['URL']
 
-        output_content = template
+    write_module("types", "Business Configuration - Types", '''
+export interface ServiceItem {
+  name: string;
+  url: string;
+  subServices?: ServiceItem[];
+}
 
-        # Handle numbered examples if present
-        for i in range(1, 5):
-            ph = f"EXAMPLE_{i}"
-            if ph in output_content:
-                ex_value = business.get("EXAMPLES", [])
-                if len(ex_value) >= i:
-                    output_content = output_content.replace(f"{{{{{ph}}}}}", ex_value[i-1])
-                else:
-                    output_content = output_content.replace(f"{{{{{ph}}}}}", "")
+export interface Location {
+  city: string;
+  state: string;
+  url?: string;
+}
 
-        # Create missing placeholders
-        missing_placeholders = create_missing_placeholders(business)
-        
-        # Replace all other placeholders dynamically
-        placeholders = re.findall(r"{{(.*?)}}", output_content)
-        for ph in placeholders:
-            # Handle nested dictionary access (e.g., CONTACT.PHONE)
-            if '.' in ph:
-                value = get_nested_value(business, ph)
-                # Try lowercase version if not found
-                if value is None:
-                    keys = ph.split('.')
-                    if len(keys) == 2:
-                        parent_key = keys[0]
-                        child_key = keys[1].lower()  # Try lowercase
-                        if parent_key in business and isinstance(business[parent_key], dict):
-                            value = business[parent_key].get(child_key)
+export interface ContactInfo {
+  address: string;
+  street: string;
+  city: string;
+  state: string;
+  zip: string;
+  areaCode: string;
+  phone: string;
+  email: string;
+  addressVisibility: 'HIDDEN' | 'VISIBLE';
+}
+
+export interface SocialMedia {
+  facebook?: string;
+  twitter?: string;
+  linkedin?: string;
+  pinterest?: string;
+  nextdoor?: string;
+  yelp?: string;
+  instagram?: string;
+  youtube?: string;
+}
+
+export interface GoogleMaps {
+  shortLink: string;
+  fullUrl: string;
+  embedCode: string;
+  latitude: string;
+  longitude: string;
+}
+
+export interface BusinessHours {
+  monday: string;
+  tuesday: string;
+  wednesday: string;
+  thursday: string;
+  friday: string;
+  saturday: string;
+  sunday: string;
+}
+
+export interface NavigationLink {
+  name: string;
+  href: string;
+}
+''')
+
+    business_info = {
+        "name": business_data.get('BUSINESS_NAME', 'Our Company'),
+        "websiteUrl": website_url,
+        "tone": business_data.get('TONE', 'Professional'),
+        "logoUrl": business_data.get('LOGO_URL', f'{website_url}/logo.png'),
+        "primaryKeyword": business_data.get('PRIMARY_KEYWORD', 'Services'),
+        "ctaText": business_data.get('CTA_TEXT', 'Contact us today!'),
+    }
+    business_categories = {
+        "primary": categories.get('PRIMARY', 'Service Business'),
+        "secondary": categories.get('SECONDARY', []),
+    }
+    meta_info = {
+        "title": meta.get('title', ''),
+        "description": meta.get('description', ''),
+        "keywords": meta.get('keywords', ''),
+    }
+    write_module("info", "Business Configuration - Business Information", f'''
+export const BUSINESS_INFO = {ts_literal(business_info)} as const;
+
+export const BUSINESS_CATEGORIES = {ts_literal(business_categories)} as const;
+
+export const META = {ts_literal(meta_info)} as const;
+''')
+
+    services_navigation = [{"name": s["name"], "href": s["url"]} for s in core_services]
+    write_module("services", "Business Configuration - Services", f'''
+export const CORE_SERVICES: ServiceItem[] = {ts_literal(core_services)};
+
+// Flattened arrays for quick access
+export const CORE_SERVICE_NAMES: string[] = {ts_literal([s["name"] for s in core_services])};
+export const CORE_SERVICE_URLS: string[] = {ts_literal([s["url"] for s in core_services])};
+
+// All services including sub-services
+export const ALL_SERVICES: ServiceItem[] = {ts_literal(all_services)};
+
+// Service (or sub-service) by URL
+export const SERVICES_BY_URL: Record<string, ServiceItem> = {ts_literal(services_by_url)};
+
+const SERVICES_NAVIGATION: NavigationLink[] = {ts_literal(services_navigation)};
+
+/**
+ * Get services formatted for navigation/footer
+ */
+export const getServicesForNavigation = (): NavigationLink[] => SERVICES_NAVIGATION;
+''', "import type { NavigationLink, ServiceItem } from './types';\n")
+
+    locations_navigation = [{"name": f"{loc['city']}, {loc['state']}", "href": loc["url"]} for loc in locations]
+    write_module("locations", "Business Configuration - Service Areas / Locations", f'''
+export const LOCATIONS: Location[] = {ts_literal(locations)};
+
+// Top locations (first 4)
+export const TOP_LOCATIONS: Location[] = {ts_literal(locations[:4])};
+
+// Location by URL
+export const LOCATIONS_BY_URL: Record<string, Location> = {ts_literal(locations_by_url)};
+
+// Helper to format location string
+export const formatLocation = (location: Location): string =>
+  `${{location.city}}, ${{location.state}}`;
+
+const LOCATIONS_NAVIGATION: NavigationLink[] = {ts_literal(locations_navigation)};
+
+/**
+ * Get locations formatted for navigation/footer
+ */
+export const getLocationsForNavigation = (limit?: number): NavigationLink[] =>
+  limit ? LOCATIONS_NAVIGATION.slice(0, limit) : LOCATIONS_NAVIGATION;
+''', "import type { Location, NavigationLink } from './types';\n")
+
+    contact_info = {
+        "address": contact.get('ADDRESS', ''),
+        "street": contact.get('STREET', ''),
+        "city": contact.get('CITY', ''),
+        "state": contact.get('STATE', ''),
+        "zip": contact.get('ZIP', ''),
+        "areaCode": contact.get('AREA_CODE', ''),
+        "phone": contact.get('PHONE', ''),
+        "email": contact.get('EMAIL', ''),
+        "addressVisibility": contact.get('ADDRESS_VISIBILITY', 'HIDDEN'),
+    }
+    business_hours = {
+        "monday": hours.get('MONDAY', '9:00 AM - 5:00 PM'),
+        "tuesday": hours.get('TUESDAY', '9:00 AM - 5:00 PM'),
+        "wednesday": hours.get('WEDNESDAY', '9:00 AM - 5:00 PM'),
+        "thursday": hours.get('THURSDAY', '9:00 AM - 5:00 PM'),
+        "friday": hours.get('FRIDAY', '9:00 AM - 5:00 PM'),
+        "saturday": hours.get('SATURDAY', '9:00 AM - 5:00 PM'),
+        "sunday": hours.get('SUNDAY', 'Closed'),
+    }
+    maps_info = {
+        "shortLink": google_maps.get('SHORT_LINK', ''),
+        "fullUrl": google_maps.get('FULL_URL', ''),
+        "embedCode": google_maps.get('EMBED_CODE', ''),
+        "latitude": str(google_maps.get('LATITUDE', '0')),
+        "longitude": str(google_maps.get('LONGITUDE', '0')),
+    }
+    write_module("contact", "Business Configuration - Contact, Hours and Maps", f'''
+export const CONTACT: ContactInfo = {ts_literal(contact_info)};
+
+export const BUSINESS_HOURS: BusinessHours = {ts_literal(business_hours)};
+
+// Business hours formatted for schema
+export const BUSINESS_HOURS_SCHEMA = {ts_literal(business_data.get('BUSINESS_HOURS_SCHEMA', 'Mo-Fr 09:00-17:00'))};
+
+export const GOOGLE_MAPS: GoogleMaps = {ts_literal(maps_info)};
+''', "import type { BusinessHours, ContactInfo, GoogleMaps } from './types';\n")
+
+    write_module("social", "Business Configuration - Social Media", f'''
+export const SOCIAL_MEDIA: SocialMedia = {ts_literal(social_media)};
+
+// Only platforms with a link (every generated entry has one)
+export const ACTIVE_SOCIAL_MEDIA: SocialMedia = SOCIAL_MEDIA;
+''', "import type { SocialMedia } from './types';\n")
+
+    write_module("blog", "Business Configuration - Blog Topics", f'''
+export const BLOG_TOPICS = {ts_literal(business_data.get('BLOG_TOPICS', []))} as const;
+''')
+
+    write_module("links", "Business Configuration - Site Links", '''
+/**
+ * Get company links for footer/navigation
+ */
+export const getCompanyLinks = () => [
+  { name: "About Us", href: "/about/" },
+  { name: "Blog", href: "/blog/" },
+  { name: "Contact", href: "/contact/" },
+  { name: "Portfolio", href: "/portfolio/" },
+  { name: "Service Areas", href: "/service-areas/" },
+];
+
+/**
+ * Get legal links for footer
+ */
+export const getLegalLinks = () => [
+  { name: "Privacy Policy", href: "/privacy-policy/" },
+  { name: "Terms & Conditions", href: "/terms/" },
+];
+''')
+
+    modules = ["types", "info", "services", "locations", "contact", "social", "blog", "links"]
+    write_module("index", "Business Configuration - All Modules",
+                 "\n".join(f"export * from './{name}';" for name in modules))
+
+    # Keep the old import path working; prefer importing from lib/business/<module>
+    write_output(os.path.join(output_root, "lib/business-config.ts"),
+                 BUSINESS_MODULE_HEADER.format(title="Business Configuration - Single Source of Truth")
+                 + "\n// Split into per-domain modules in ./business/ (BUSINESS_CONFIG_MODE: split)\n"
+                 + "export * from './business';\n")
+
+TS_DECLARATION_PATTERN = re.compile(r"export\s+(?:const|let|var)\s+([A-Za-z_$][\w$]*)")
+# A "/" after one of these starts a regex literal rather than a division
+TS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+TS_REGEX_KEYWORDS = frozenset(
+    "return typeof instanceof in of new delete void throw case do else yield await".split()
+)
+# A line starting with one of these continues the statement above it
+TS_CONTINUATION_CHARS = set(".,?:+-*/%&|^=<>([`")
+TS_NEXT_TOKEN_PATTERN = re.compile(r"\S")
+
+def _skip_ts_string(source, i, quote):
+    """Index just past the string literal whose opening quote is at ``i``"""
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            i += 2
+        elif c == quote or c == "\n":
+            return i + 1
+        else:
+            i += 1
+    return i
+
+def _skip_ts_template(source, i):
+    """Scan template literal text from ``i``.
+
+    Returns (index, closed): just past the closing backtick with closed=True,
+    or just past a "${" with closed=False.
+    """
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1, True
+        elif c == "$" and source.startswith("${", i):
+            return i + 2, False
+        else:
+            i += 1
+    return i, True
+
+def _skip_ts_regex(source, i):
+    """Index just past the regex literal starting at ``i`` (or i + 1 if it is not one)"""
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        c = source[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "\n":
+            return i + 1
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            j += 1
+            while j < len(source) and (source[j].isalnum() or source[j] == "_"):
+                j += 1
+            return j
+        j += 1
+    return i + 1
+
+def _ts_word_before(source, i):
+    """The identifier before ``i``, skipping whitespace (or "")"""
+    while i > 0 and source[i - 1].isspace():
+        i -= 1
+    j = i
+    while j > 0 and (source[j - 1].isalnum() or source[j - 1] in "_$"):
+        j -= 1
+    return source[j:i]
+
+def scan_ts_declarations(source):
+    """Find top-level ``export const`` statements in TypeScript source in one pass.
+
+    Returns {name: (start, end)} spanning from ``export`` through the closing
+    ``;``. Without a semicolon the declaration ends at the first top-level
+    line break after its closing bracket, unless the next line continues the
+    expression. Strings, template literals, comments and regex literals are
+    skipped, so braces inside them do not affect nesting.
+    """
+    declarations = {}
+    n = len(source)
+    depth = 0
+    template_depths = []   # brace depth of each open "${" expression
+    pending = None         # (name, start) of the declaration being scanned
+    closed = False         # pending declaration's last top-level token was a closing bracket
+    last_end = 0           # end of the last top-level token
+    prev = ""
+    i = 0
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            if c == "\n" and pending and closed and depth == 0:
+                # Look at the next token without copying the rest of the source;
+                # the whitespace before it has nothing else to scan
+                match = TS_NEXT_TOKEN_PATTERN.search(source, i)
+                i = match.start() if match else n
+                if (not match or source[i] not in TS_CONTINUATION_CHARS
+                        or source.startswith(("//", "/*"), i)):
+                    declarations[pending[0]] = (pending[1], last_end)
+                    pending = None
+                continue
+            i += 1
+            continue
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+
+        if c in "'\"":
+            i = _skip_ts_string(source, i, c)
+        elif c == "`" or (c == "}" and template_depths and template_depths[-1] == depth - 1):
+            if c == "}":
+                depth = template_depths.pop()
+            i, terminated = _skip_ts_template(source, i + 1)
+            if not terminated:
+                template_depths.append(depth)
+                depth += 1
+            c = "`"
+        elif c == "/" and (prev == "" or prev in TS_REGEX_PRECEDERS
+                           or _ts_word_before(source, i) in TS_REGEX_KEYWORDS):
+            i = _skip_ts_regex(source, i)
+        else:
+            match = None
+            if depth == 0 and c == "e" and (i == 0 or not (source[i - 1].isalnum() or source[i - 1] in "_$")):
+                match = TS_DECLARATION_PATTERN.match(source, i)
+            if match:
+                if pending:
+                    declarations[pending[0]] = (pending[1], last_end)
+                pending = (match.group(1), i)
+                i = match.end()
             else:
-                value = business.get(ph) or missing_placeholders.get(ph)
-            
-            if value is not None:
-                rendered_value = render_value(value, ph)
-                output_content = output_content.replace(f"{{{{{ph}}}}}", rendered_value)
-            elif ph == "SUPPORTING_TOPICS_MD" and "SUPPORTING_TOPICS" in business:
-                rendered_value = render_supporting_topics(business["SUPPORTING_TOPICS"])
-                output_content = output_content.replace(f"{{{{{ph}}}}}", rendered_value)
+                if c in "{([":
+                    depth += 1
+                elif c in "})]":
+                    depth = max(depth - 1, 0)
+                elif c == ";" and depth == 0 and pending:
+                    declarations[pending[0]] = (pending[1], i + 1)
+                    pending = None
+                i += 1
+        prev = c
+        if depth == 0:
+            last_end = i
+            closed = c in "})]"
+
+    if pending:
+        declarations[pending[0]] = (pending[1], last_end)
+    return declarations
+
+def replace_ts_declarations(source, replacements):
+    """Replace whole ``export const`` statements by name.
+
+    Returns the new source and the names that were not found.
+    """
+    declarations = scan_ts_declarations(source)
+    missing = [name for name in replacements if name not in declarations]
+    spans = sorted((declarations[name], content) for name, content in replacements.items() if name in declarations)
+    pieces = []
+    position = 0
+    for (start, end), content in spans:
+        pieces.append(source[position:start])
+        pieces.append(content)
+        position = end
+    pieces.append(source[position:])
+    return "".join(pieces), missing
+
+TS_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*")
+TS_NUMBER_PATTERN = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+TS_ESCAPE_PATTERN = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|[\s\S])")
+TS_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0", "\n": "", "\r\n": ""}
+TS_KEYWORD_VALUES = {"true": True, "false": False, "null": None, "undefined": None}
+
+def _unescape_ts(text):
+    """String literal text with its escape sequences decoded"""
+    def decode(match):
+        escape = match.group(1)
+        if escape[0] in "ux" and len(escape) > 1:
+            return chr(int(escape[1:].strip("{}"), 16))
+        return TS_ESCAPES.get(escape, escape)
+    return TS_ESCAPE_PATTERN.sub(decode, text)
+
+def _skip_ts_space(source, i):
+    """Index of the next token at or after ``i``, skipping whitespace and comments"""
+    while True:
+        match = TS_NEXT_TOKEN_PATTERN.search(source, i)
+        if not match:
+            return len(source)
+        i = match.start()
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = len(source) if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = len(source) if end < 0 else end + 2
+        else:
+            return i
+
+def _lookup_ts_name(name, variables):
+    """(found, value) of a dotted name like ``siteConfig.url`` in nested ``variables``"""
+    head, *path = name.split(".")
+    if head not in variables:
+        return False, None
+    value = variables[head]
+    for key in path:
+        if not isinstance(value, dict):
+            return False, None
+        value = value.get(key)
+    return True, value
+
+def parse_ts_literal(source, i=0, variables=None):
+    """Read the TypeScript literal starting at ``i`` as a JSON-like value.
+
+    Handles objects, arrays, strings, numbers, true/false/null/undefined and
+    template literals. An identifier such as ``siteConfig.url``, alone or in
+    a ``${...}``, is looked up in the nested ``variables`` dict, where a
+    missing property is undefined (None). Anything else is an expression
+    and raises ValueError. Returns (value, end).
+    """
+    variables = variables or {}
+    i = _skip_ts_space(source, i)
+
+    def fail(what):
+        return ValueError(f"{what} at line {source.count(chr(10), 0, i) + 1}")
+
+    if i >= len(source):
+        raise fail("Expected a literal")
+    c = source[i]
+    if c in "{[":
+        closing = "}" if c == "{" else "]"
+        value = {} if c == "{" else []
+        i += 1
+        while True:
+            i = _skip_ts_space(source, i)
+            if source.startswith(closing, i):
+                return value, i + 1
+            if c == "{":
+                if i < len(source) and source[i] in "'\"":
+                    end = _skip_ts_string(source, i, source[i])
+                    key = _unescape_ts(source[i + 1:end - 1])
+                else:
+                    match = TS_IDENTIFIER_PATTERN.match(source, i) or TS_NUMBER_PATTERN.match(source, i)
+                    if not match:
+                        raise fail("Expected a property name")
+                    key, end = match.group(), match.end()
+                i = _skip_ts_space(source, end)
+                if not source.startswith(":", i):
+                    raise fail(f"Expected ':' after {key!r}")
+                value[key], i = parse_ts_literal(source, i + 1, variables)
+            else:
+                item, i = parse_ts_literal(source, i, variables)
+                value.append(item)
+            i = _skip_ts_space(source, i)
+            if source.startswith(",", i):
+                i += 1
+            elif not source.startswith(closing, i):
+                raise fail(f"Expected ',' or '{closing}'")
+    if c in "'\"":
+        end = _skip_ts_string(source, i, c)
+        if source[end - 1] != c or end - 1 == i:
+            raise fail("Unterminated string")
+        return _unescape_ts(source[i + 1:end - 1]), end
+    if c == "`":
+        parts = []
+        i += 1
+        while True:
+            end, closed = _skip_ts_template(source, i)
+            parts.append(_unescape_ts(source[i:end - (1 if closed else 2)]))
+            if closed:
+                return "".join(parts), end
+            close = source.find("}", end)
+            name = source[end:close].strip() if close >= 0 else ""
+            found, value = _lookup_ts_name(name, variables)
+            if not found or value is None or isinstance(value, (dict, list)):
+                raise fail(f"Unsupported template expression ${{{name}}}")
+            parts.append(str(value))
+            i = close + 1
+    match = TS_NUMBER_PATTERN.match(source, i)
+    if match:
+        number = match.group()
+        return (float(number) if any(ch in number for ch in ".eE") else int(number)), match.end()
+    match = TS_IDENTIFIER_PATTERN.match(source, i)
+    if match and match.group() in TS_KEYWORD_VALUES:
+        return TS_KEYWORD_VALUES[match.group()], match.end()
+    if match:
+        found, value = _lookup_ts_name(match.group(), variables)
+        if found:
+            return value, match.end()
+    raise fail("Unsupported expression")
+
+def read_ts_constant(paths, name, variables=None):
+    """Literal value of ``const <name> = ...`` from the first of ``paths`` that declares it.
+
+    Returns None when no file declares it; a value that is not a literal
+    raises ValueError naming the file.
+    """
+    declaration = re.compile(rf"\bconst\s+{re.escape(name)}\b[^=]*=")
+    for path in paths:
+        # Config modules may have been regenerated earlier in this run
+        source = read_output(path)
+        if source is None:
+            continue
+        source = source.decode("utf-8")
+        match = declaration.search(source)
+        if match:
+            try:
+                return parse_ts_literal(source, match.end(), variables)[0]
+            except ValueError as e:
+                raise ValueError(f"{path}: {name}: {e}") from None
+    return None
+
+def generate_seo_config(business_data, output_root=script_dir):
+    """Update siteConfig in lib/seo-config.ts from business.yaml"""
+    config_path = os.path.join(output_root, "lib/seo-config.ts")
+    
+    # Read existing file
+    file_content = read_output(config_path)
+    if file_content is None:
+        warn(f"{config_path} not found, skipping update")
+        return
+    file_content = file_content.decode("utf-8").replace("\r\n", "\n")
+    
+    business_name = business_data.get('BUSINESS_NAME', 'Example Company')
+    website_url = business_data.get('WEBSITE_URL', 'https://example.com')
+    meta = business_data.get('META', {})
+    contact = business_data.get('CONTACT', {})
+    social_media = business_data.get('SOCIAL_MEDIA', {})
+    core_services = business_data.get('CORE_SERVICES', [])
+    hours = business_data.get('HOURS', {})
+    google_maps = business_data.get('GOOGLE_MAPS', {})
+    
+    # Format business hours
+    monday_hours = hours.get('MONDAY', 'Monday - Friday: 9:00 AM - 6:00 PM')
+    
+    # Extract social media links
+    facebook = social_media.get('FACEBOOK', {}).get('URL', '')
+    twitter = social_media.get('TWITTER', {}).get('URL', '')
+    linkedin = social_media.get('LINKEDIN', {}).get('URL', '')
+    instagram = social_media.get('INSTAGRAM', {}).get('URL', '')
+    youtube = social_media.get('YOUTUBE', {}).get('URL', '')
+    pinterest = social_media.get('PINTEREST', {}).get('URL', '')
+    nextdoor = social_media.get('NEXTDOOR', {}).get('URL', '')
+    yelp = social_media.get('YELP', {}).get('URL', '')
+    
+    # Extract twitter handle
+    twitter_handle = twitter.split('/')[-1] if twitter else business_name.lower().replace(' ', '')
+    
+    # Build social object with only existing links
+    social_lines = []
+    if facebook:
+        social_lines.append(f'    facebook: "{facebook}",')
+    if twitter:
+        social_lines.append(f'    twitter: "{twitter}",')
+        social_lines.append(f'    twitterHandle: "{twitter_handle}",')
+    if instagram:
+        social_lines.append(f'    instagram: "{instagram}",')
+    if linkedin:
+        social_lines.append(f'    linkedin: "{linkedin}",')
+    if youtube:
+        social_lines.append(f'    youtube: "{youtube}",')
+    if pinterest:
+        social_lines.append(f'    pinterest: "{pinterest}",')
+    if nextdoor:
+        social_lines.append(f'    nextdoor: "{nextdoor}",')
+    if yelp:
+        social_lines.append(f'    yelp: "{yelp}",')
+    
+    social_content = '\n'.join(social_lines).rstrip(',')  # Remove trailing comma from last item
+    
+    # Build new siteConfig
+    new_site_config = f'''export const siteConfig: SiteConfig = {{
+  name: "{business_name}",
+  url: process.env.NODE_ENV === 'development' ? 'http://localhost:3000' : '{website_url}',
+  description: "{meta.get('description', '')}",
+  logo: "/assets/config/logo.png",
+  favicon: "/assets/config/favicon.ico",
+  themeColor: "#3B82F6",
+  author: "{business_name}",
+  copyright: "© 2024 {business_name}. All rights reserved.",
+  social: {{
+{social_content}
+  }},
+  contact: {{
+    phone: "{contact.get('PHONE', '')}",
+    email: "{contact.get('EMAIL', '')}",
+    address: "{contact.get('STREET', contact.get('ADDRESS', ''))}",
+    city: "{contact.get('CITY', '')}",
+    state: "{contact.get('STATE', '')}",
+    zipCode: "{contact.get('ZIP', '')}",
+    country: "USA"
+  }},
+  businessHours: "{monday_hours}",
+  services: {json.dumps(core_services)},
+  coordinates: {{
+    latitude: "{google_maps.get('LATITUDE', '0')}",
+    longitude: "{google_maps.get('LONGITUDE', '0')}"
+  }}
+}};'''
+    
+    # Replace the siteConfig declaration, whatever its nesting. seoConfigs holds
+    # hand-curated per-route entries and is left alone.
+    file_content, missing = replace_ts_declarations(file_content, {"siteConfig": new_site_config})
+    for name in missing:
+        warn(f"Could not find {name} declaration in file")
+    
+    # Write updated content back
+    write_output(config_path, file_content)
+
+def generate_route_map(business_data, output_root=script_dir):
+    """Generate data/route-map.json: every service, sub-service, location and blog URL -> entity"""
+    routes = route_index(business_data)
+    for url, existing, duplicate in routes.duplicates:
+        warn(f"Duplicate URL {url}: {existing.kind} '{existing.name}' and {duplicate.kind} '{duplicate.name}'")
+    for conflict in routes.conflicts:
+        warn(f"Conflicting URLs for {conflict}")
+    write_output(os.path.join(output_root, "data/route-map.json"), json.dumps(routes.route_map(), indent=2, ensure_ascii=False))
+
+def route_shard(path, shard_count):
+    """FNV-1a over the key's UTF-16 code units, matching termShard() in lib/search-index.ts"""
+    data = path.encode("utf-16-le")
+    h = 0x811c9dc5
+    for (unit,) in struct.iter_unpack("<H", data):
+        h = ((h ^ unit) * 0x01000193) & 0xffffffff
+    return h % shard_count
+
+def normalize_route(path):
+    """Route keys always start and end with a slash, like getSEOConfig()"""
+    path = "/" + path.strip("/")
+    return path if path == "/" else path + "/"
+
+APP_PAGE_FILES = ("page.tsx", "page.ts", "page.jsx", "page.js")
+
+def app_page_files(output_root=script_dir):
+    """Page files of the Next.js app router (app/**/page.tsx)"""
+    app_folder = os.path.join(output_root, "app")
+    pages = []
+    for folder, subfolders, files in os.walk(app_folder):
+        subfolders.sort()
+        pages.extend(os.path.join(folder, name) for name in APP_PAGE_FILES if name in files)
+    return pages
+
+def app_routes(output_root=script_dir):
+    """Static routes the app actually serves, as normalize_route() keys.
+
+    Route groups "(name)" do not appear in the URL; dynamic "[param]" and
+    private "_folder" routes are left out.
+    """
+    app_folder = os.path.join(output_root, "app")
+    routes = set()
+    for page in app_page_files(output_root):
+        segments = os.path.relpath(os.path.dirname(page), app_folder).split(os.sep)
+        segments = [segment for segment in segments if segment != "." and not segment.startswith("(")]
+        if not any(segment.startswith(("[", "_")) for segment in segments):
+            routes.add(normalize_route("/".join(segments)))
+    return routes
+
+SEO_CONFIG_FILE = "lib/seo-config.ts"
+HOME_FAQ_FILE = "components/FAQSection.tsx"
+ROOM_PAGE_FOLDER = "app/rooms/[id]"
+
+def seo_config_constant(business_data, name, output_root=script_dir):
+    """A literal constant of lib/seo-config.ts, with siteConfig.url as business.yaml's WEBSITE_URL"""
+    # siteConfig.url is decided at runtime; the production URL is business.yaml's
+    website_url = business_data.get('WEBSITE_URL', 'https://example.com').rstrip('/')
+    variables = {"siteConfig": {"url": website_url, "social": {}}}
+    return read_ts_constant([os.path.join(output_root, SEO_CONFIG_FILE)], name, variables)
+
+def app_rooms(business_data, output_root=script_dir):
+    """roomsSEOData by room id ({} when the app has no /rooms/[id] page)"""
+    if not os.path.isdir(os.path.join(output_root, ROOM_PAGE_FOLDER)):
+        return {}
+    return seo_config_constant(business_data, "roomsSEOData", output_root) or {}
+
+def home_faqs(output_root=script_dir):
+    """The FAQs the home page shows ({"question": {"en", "sq"}, "answer": {...}} entries)"""
+    return read_ts_constant([os.path.join(output_root, HOME_FAQ_FILE)], "faqData") or []
+
+def build_route_seo(business_data):
+    """SEO entries for every service, sub-service and location route.
+
+    Service x location pages are added when SERVICE_LOCATION_PAGES is true.
+    Returns {route: SEOConfig dict}; the first entry for a route wins.
+    """
+    business_name = business_data.get('BUSINESS_NAME', 'Our Company')
+    website_url = business_data.get('WEBSITE_URL', 'https://example.com').rstrip('/')
+    primary_keyword = business_data.get('PRIMARY_KEYWORD', 'Services')
+    cta_text = business_data.get('CTA_TEXT', 'Contact us today!')
+    locations = business_data.get('LOCATIONS_ARRAY', [])
+    primary_cities = ', '.join(locations[:4])
+    og_image = f"{website_url}/og.png"
+
+    # (name, url, parent name or None) for each service page, and (name, url) for each location
+    index = route_index(business_data)
+    services = [(route.name, route.url, route.parent) for route in index.all_services]
+    location_pages = [(route.name, route.url) for route in index.locations]
+
+    routes = {}
+    def add(path, label, title, description, keywords, breadcrumbs, **extra):
+        route = normalize_route(path)
+        if route in routes:
+            return
+        canonical = f"{website_url}{route}"
+        routes[route] = {
+            "title": title,
+            "description": description,
+            "keywords": keywords,
+            "canonical": canonical,
+            "ogImage": og_image,
+            "ogType": "website",
+            "twitterCard": "summary_large_image",
+            **extra,
+            "breadcrumbs": [{"name": "Home", "url": f"{website_url}/"}] + breadcrumbs + [{"name": label, "url": canonical}],
+        }
+
+    services_crumb = {"name": "Services", "url": f"{website_url}/services"}
+    parent_urls = {name: url for name, url, parent in services if parent is None and url}
+    for name, url, parent in services:
+        if not name or not url:
+            continue
+        crumbs = [services_crumb]
+        if parent in parent_urls:
+            crumbs.append({"name": parent, "url": f"{website_url}{normalize_route(parent_urls[parent])}"})
+        add(url, name,
+            f"{name} in {primary_cities} | {business_name}",
+            f"Professional {name.lower()} in {primary_cities}. {cta_text}",
+            [name.lower(), primary_keyword.lower()] + locations[:4],
+            crumbs,
+            section=parent or name)
+
+    areas_crumb = {"name": "Service Areas", "url": f"{website_url}/service-areas"}
+    core_names = ', '.join([name for name, _, parent in services if parent is None][:3]).lower()
+    for loc, slug in location_pages:
+        add(slug, loc,
+            f"{business_name} in {loc} | {primary_keyword}",
+            f"Professional {core_names or primary_keyword.lower()} in {loc}. {cta_text}",
+            [loc, f"{primary_keyword.lower()} {loc.split(',')[0].lower()}"],
+            [areas_crumb],
+            geoPlacename=loc)
+
+    if business_data.get('SERVICE_LOCATION_PAGES'):
+        for loc, slug in location_pages:
+            location_crumb = {"name": loc, "url": f"{website_url}{normalize_route(slug)}"}
+            for name, url, parent in services:
+                if not name or not url:
+                    continue
+                add(normalize_route(slug) + url.strip('/'), name,
+                    f"{name} in {loc} | {business_name}",
+                    f"Professional {name.lower()} in {loc}. {cta_text}",
+                    [f"{name.lower()} {loc.split(',')[0].lower()}", name.lower(), loc],
+                    [areas_crumb, location_crumb],
+                    section=parent or name,
+                    geoPlacename=loc)
+    return routes
+
+# Sitemaps hold at most 50,000 URLs; larger catalogs get an index plus shards
+SITEMAP_URL_LIMIT = 50000
+SITEMAP_STATIC_PAGES = ("/", "/about", "/contact", "/services", "/portfolio", "/service-areas")
+# Site-wide keys whose changes update the lastmod of the static pages
+SITEMAP_SITE_KEYS = ('BUSINESS_NAME', 'META', 'CONTACT', 'HOURS', 'PRIMARY_KEYWORD', 'CTA_TEXT')
+# Next.js metadata routes that already serve /sitemap.xml
+DYNAMIC_SITEMAP_FILES = ("app/sitemap.ts", "app/sitemap.tsx", "app/sitemap.js")
+SITEMAP_SHARD_FILE_PATTERN = re.compile(r"sitemap-(\d+)\.xml(\.gz)?")
+
+def sitemap_pages(business_data, routes=None):
+    """(path, content hash) for every page the sitemap lists.
+
+    When ``routes`` (see app_routes) is given, pages the app does not serve
+    are left out.
+    """
+    site_hash = hash_text(json.dumps([business_data.get(key) for key in SITEMAP_SITE_KEYS], sort_keys=True, default=str))
+    pages = [(path, site_hash) for path in SITEMAP_STATIC_PAGES]
+    # Service, sub-service, location (and service x location) pages, hashed by their SEO content
+    for route, entry in build_route_seo(business_data).items():
+        pages.append((route, hash_text(json.dumps(entry, sort_keys=True))))
+    business_name = business_data.get('BUSINESS_NAME', '')
+    primary_keyword = business_data.get('PRIMARY_KEYWORD', '')
+    for post in route_index(business_data).blog_posts:
+        pages.append((post.url, hash_text(json.dumps([post.name, business_name, primary_keyword]))))
+    if routes is not None:
+        pages = [(path, content_hash) for path, content_hash in pages if normalize_route(path) in routes]
+    return pages
+
+def iter_sitemap_urlset(urls):
+    """Chunks of a <urlset> for (loc, lastmod) pairs"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for loc, lastmod in urls:
+        yield f"  <url>\n    <loc>{xml_escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </url>\n"
+    yield "</urlset>\n"
+
+def iter_sitemap_index(sitemaps):
+    """Chunks of a <sitemapindex> for (loc, lastmod) pairs"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for loc, lastmod in sitemaps:
+        yield f"  <sitemap>\n    <loc>{xml_escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </sitemap>\n"
+    yield "</sitemapindex>\n"
+
+def generate_sitemap(business_data, output_root=script_dir):
+    """Generate public/sitemap.xml, split into an index and shards past 50,000 URLs.
+
+    SITEMAP in business.yaml: "auto" (default) skips the file when the app
+    serves /sitemap.xml itself (app/sitemap.ts), "static" always builds it
+    and "off" disables it; a skipped run returns "skipped". Only pages the
+    app serves are listed. SITEMAP_GZIP gzips the shards. Each URL's lastmod
+    is the date its content hash last changed, kept in .generate_cache/.
+    """
+    mode = business_data.get('SITEMAP', 'auto')
+    if mode == 'off':
+        return "skipped"
+    if mode == 'auto':
+        dynamic = [name for name in DYNAMIC_SITEMAP_FILES if os.path.exists(os.path.join(output_root, name))]
+        if dynamic:
+            warn(f"{dynamic[0]} already serves /sitemap.xml, skipping public/sitemap.xml (set SITEMAP: static to build it)")
+            return "skipped"
+
+    website_url = business_data.get('WEBSITE_URL', 'https://example.com').rstrip('/')
+    compress = bool(business_data.get('SITEMAP_GZIP', False))
+    today = time.strftime("%Y-%m-%d", time.gmtime())
+
+    # lastmod only moves when a page's content hash changes
+    state_path = os.path.join(output_root, CACHE_DIR, "sitemap-lastmod.json")
+    try:
+        previous = json.loads(read_cache(state_path) or b"{}")
+    except json.JSONDecodeError:
+        previous = {}
+    state = {}
+    urls = []
+    for path, content_hash in sitemap_pages(business_data, app_routes(output_root)):
+        if path in state:
+            continue
+        known = previous.get(path)
+        lastmod = known[1] if known and known[0] == content_hash else today
+        state[path] = [content_hash, lastmod]
+        urls.append((website_url + quote(path, safe="/-_.~"), lastmod))
+
+    sitemap_path = os.path.join(output_root, "public/sitemap.xml")
+    shards_folder = os.path.join(output_root, "public/sitemaps")
+    shard_count = 0
+    if len(urls) <= SITEMAP_URL_LIMIT:
+        write_stream_output(sitemap_path, iter_sitemap_urlset(urls))
+    else:
+        extension = ".xml.gz" if compress else ".xml"
+        sitemaps = []
+        for start in range(0, len(urls), SITEMAP_URL_LIMIT):
+            shard = urls[start:start + SITEMAP_URL_LIMIT]
+            name = f"sitemap-{shard_count}{extension}"
+            write_stream_output(os.path.join(shards_folder, name), iter_sitemap_urlset(shard), compress=compress)
+            sitemaps.append((f"{website_url}/sitemaps/{name}", max(lastmod for _, lastmod in shard)))
+            shard_count += 1
+        write_stream_output(sitemap_path, iter_sitemap_index(sitemaps))
+
+    # Drop shards from an earlier, larger (or differently compressed) run
+    for file_name in list_outputs(shards_folder):
+        match = SITEMAP_SHARD_FILE_PATTERN.fullmatch(file_name)
+        if match and (int(match.group(1)) >= shard_count or bool(match.group(2)) != compress):
+            remove_output(os.path.join(shards_folder, file_name))
+
+    write_cache(state_path, json.dumps(state, indent=2, ensure_ascii=False))
+
+# Review exports: Booking.com's extranet CSV and a scraped Google Maps CSV
+REVIEWS_DIR = "data/reviews"
+BOOKING_REVIEWS_FILE = "Booking.csv"
+GOOGLE_REVIEWS_FILE = "google.csv"
+REVIEW_SUMMARY_PATH = "data/review-summary.json"
+REVIEW_PAGES_DIR = "data/review-pages"
+REVIEW_PAGE_FILE_PATTERN = re.compile(r"page-(\d+)\.json")
+REVIEW_PAGE_SIZE = 12
+# Where each export was read up to, so re-runs only parse appended rows
+REVIEW_CURSOR_PATH = os.path.join(CACHE_DIR, "reviews-cursor.json")
+REVIEW_CURSOR_VERSION = 1
+REVIEW_RECENT_COUNT = 5
+# Same rule as the reviews carousel: 8+ out of 10, no negative comment
+REVIEW_DISPLAY_MIN_RATING = 8
+# Booking.com category column -> normalized key
+BOOKING_CATEGORIES = {
+    "Staff": "staff",
+    "Cleanliness": "cleanliness",
+    "Location": "location",
+    "Facilities": "facilities",
+    "Comfort": "comfort",
+    "Value for money": "valueForMoney",
+}
+# Google's export is named after the scraped CSS classes, which change from
+# scrape to scrape, so each field falls back to its usual column position
+GOOGLE_COLUMNS = {
+    "avatar": ("NBa7we src", 0),
+    "author": ("d4r55", 1),
+    "rating": ("fontBodyLarge", 4),
+    "date": ("xRkPPb", 5),
+    "comment": ("wiI7pd", 8),
+}
+GOOGLE_RATING_PATTERN = re.compile(r"\s*(\d+(?:\.\d+)?)\s*/\s*5\s*")
+
+def review_sources(output_root=script_dir):
+    """Paths of the review exports, in the order they are ingested"""
+    folder = os.path.join(output_root, REVIEWS_DIR)
+    return [os.path.join(folder, BOOKING_REVIEWS_FILE), os.path.join(folder, GOOGLE_REVIEWS_FILE)]
+
+def review_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def normalize_booking_review(row):
+    """Normalized review for one Booking.csv row (None without a score)"""
+    rating = review_float(row.get("Review score"))
+    if rating is None:
+        return None
+    reservation = (row.get("Reservation Number") or "").strip()
+    reviewed_at = (row.get("Review date") or "").strip()
+    author = (row.get("Guest name") or "").strip()
+    key = reservation or hash_text(f"{reviewed_at}\n{author}\n{rating}")[:16]
+    categories = {}
+    for column, name in BOOKING_CATEGORIES.items():
+        score = review_float(row.get(column))
+        if score is not None:
+            categories[name] = score
+    return {
+        "id": f"booking:{key}",
+        "platform": "Booking.com",
+        "author": author or "Anonymous",
+        "rating": rating,
+        "date": reviewed_at.replace(" ", "T") or None,
+        "title": (row.get("Review title") or "").strip(),
+        "comment": (row.get("Positive review") or "").strip(),
+        "negativeComment": (row.get("Negative review") or "").strip(),
+        "categories": categories,
+    }
+
+def normalize_google_review(row, columns):
+    """Normalized review for one google.csv row (None without a "N/5" rating)"""
+    def field_of(name):
+        return row[columns[name]].strip() if columns[name] < len(row) else ""
+
+    match = GOOGLE_RATING_PATTERN.fullmatch(field_of("rating"))
+    if not match:
+        return None
+    author = field_of("author")
+    comment = field_of("comment")
+    review = {
+        "id": "google:" + hash_text(f"{author}\n{comment}")[:16],
+        "platform": "Google",
+        "author": author or "Anonymous",
+        "rating": float(match.group(1)) * 2,    # stars out of 5 -> out of 10
+        "date": None,                           # Google only shows "3 months ago"
+        "dateText": re.sub(r"\s+on$", "", field_of("date")),
+        "title": "",
+        "comment": comment,
+        "negativeComment": "",
+        "categories": {},
+    }
+    if field_of("avatar"):
+        review["avatar"] = field_of("avatar")
+    return review
+
+def google_columns(header):
+    """Column index of each GOOGLE_COLUMNS field for a google.csv header row"""
+    positions = {name: i for i, name in enumerate(header)}
+    return {field: positions.get(column, fallback) for field, (column, fallback) in GOOGLE_COLUMNS.items()}
+
+def review_displayed(review):
+    """Whether the reviews carousel shows a review"""
+    if review["platform"] == "Google" and not review["comment"]:
+        return False
+    return review["rating"] >= REVIEW_DISPLAY_MIN_RATING and not review["negativeComment"]
+
+class ReviewStats:
+    """Running review aggregates, updated one review at a time.
+
+    Only counts and sums are kept, so averages come out exact however the
+    reviews are fed in.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.positive = 0
+        self.platforms = {}       # platform -> [count, sum]
+        self.categories = {}      # category -> [count, sum]
+        self.distribution = {}    # rounded score out of 10 -> count
+        self.displayed = {}       # platform -> count shown by the carousel
+
+    def add(self, review):
+        rating = review["rating"]
+        self.count += 1
+        self.total += rating
+        if rating >= REVIEW_DISPLAY_MIN_RATING:
+            self.positive += 1
+        bucket = self.platforms.setdefault(review["platform"], [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += rating
+        for name, score in review["categories"].items():
+            bucket = self.categories.setdefault(name, [0, 0.0])
+            bucket[0] += 1
+            bucket[1] += score
+        score = str(min(10, max(1, int(rating + 0.5))))
+        self.distribution[score] = self.distribution.get(score, 0) + 1
+        if review_displayed(review):
+            self.displayed[review["platform"]] = self.displayed.get(review["platform"], 0) + 1
+
+    def merge(self, other):
+        """Add another set of aggregates (e.g. from a second export) to this one"""
+        self.count += other.count
+        self.total += other.total
+        self.positive += other.positive
+        for mine, theirs in ((self.platforms, other.platforms), (self.categories, other.categories)):
+            for key, (count, total) in theirs.items():
+                bucket = mine.setdefault(key, [0, 0.0])
+                bucket[0] += count
+                bucket[1] += total
+        for mine, theirs in ((self.distribution, other.distribution), (self.displayed, other.displayed)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+
+    def to_dict(self):
+        return {
+            "count": self.count, "total": self.total, "positive": self.positive,
+            "platforms": self.platforms, "categories": self.categories,
+            "distribution": self.distribution, "displayed": self.displayed,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for key, value in (data or {}).items():
+            setattr(stats, key, value)
+        return stats
+
+    @property
+    def rating_value(self):
+        return round(self.total / self.count, 2) if self.count else 0
+
+    def summary(self, pages):
+        """Contents of data/review-summary.json"""
+        average = lambda bucket: round(bucket[1] / bucket[0], 2)
+        return {
+            "reviewCount": self.count,
+            "ratingValue": self.rating_value,
+            "bestRating": 10,
+            "worstRating": 1,
+            "positiveCount": self.positive,
+            "platforms": {
+                platform: {"reviewCount": bucket[0], "ratingValue": average(bucket)}
+                for platform, bucket in sorted(self.platforms.items())
+            },
+            "categories": {name: average(bucket) for name, bucket in self.categories.items()},
+            "distribution": {str(score): self.distribution.get(str(score), 0) for score in range(10, 0, -1)},
+            "displayed": {"total": sum(self.displayed.values()), **dict(sorted(self.displayed.items()))},
+            "pageSize": REVIEW_PAGE_SIZE,
+            "pages": pages,
+            # Same shape as generateAggregateRatingSchema() in lib/review-schema.ts
+            "aggregateRating": {
+                "@type": "AggregateRating",
+                "ratingValue": f"{self.rating_value:.1f}",
+                "reviewCount": self.count,
+                "bestRating": "10",
+                "worstRating": "1",
+            },
+        }
+
+class ReviewSource:
+    """Ingestion cursor of one review export, plus everything read from it so far.
+
+    ``offset`` is the byte position after the last row read and ``prefix``
+    the hash of the bytes before it. Exports are rewritten as supersets of
+    the previous ones, so when a file still starts with those bytes only
+    the rows after ``offset`` are parsed and folded into the aggregates;
+    otherwise the file is read again from the start. ``seen`` holds the id
+    of every review counted (Booking reservation number, or a hash of the
+    Google author and text), so a review exported twice counts once.
+    """
+
+    def __init__(self, data=None):
+        self.reset()
+        if data:
+            self.offset = data["offset"]
+            self.prefix = data["prefix"]
+            self.header = data["header"]
+            self.seen = set(data["seen"])
+            self.stats = ReviewStats.from_dict(data["stats"])
+            self.displayed = data["displayed"]
+
+    def reset(self):
+        self.offset = 0
+        self.prefix = hashlib.sha256().hexdigest()
+        self.header = None
+        self.seen = set()
+        self.stats = ReviewStats()
+        self.displayed = []
+        self.tail = None
+
+    def to_dict(self):
+        return {
+            "offset": self.offset,
+            "prefix": self.prefix,
+            "header": self.header,
+            "seen": sorted(self.seen),
+            "stats": self.stats.to_dict(),
+            "displayed": self.displayed,
+        }
+
+    def normalizer(self, path):
+        if os.path.basename(path) == BOOKING_REVIEWS_FILE:
+            header = self.header
+            return lambda row: normalize_booking_review(dict(zip(header, row)))
+        columns = google_columns(self.header)
+        return lambda row: normalize_google_review(row, columns)
+
+    def ingest(self, path):
+        """Read the rows added to ``path`` since the cursor; returns the number of new reviews"""
+        with open(path, "rb") as f:
+            digest = hashlib.sha256()
+            remaining = self.offset
+            while remaining:
+                block = f.read(min(remaining, 1 << 16))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+            if remaining or digest.hexdigest() != self.prefix:
+                # Not an extension of the export read last time: start over
+                self.reset()
+                f.seek(0)
+                digest = hashlib.sha256()
+
+            # The cursor only moves past rows that end in a newline. A last
+            # row without one may still be being written: it is kept apart
+            # in ``tail`` for this run's outputs and read again next time
+            position, unterminated = self.offset, False
+            def lines():
+                nonlocal position, unterminated
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        unterminated = True
+                    else:
+                        digest.update(line)
+                        position += len(line)
+                    yield line.decode("utf-8")
+
+            rows = csv.reader(lines())
+            if self.header is None:
+                header = next(rows, None)
+                if header is None or unterminated:
+                    return 0
+                self.header = [header[0].lstrip("\ufeff")] + header[1:]
+            normalize = self.normalizer(path)
+            added = skipped = 0
+            offset, prefix = position, digest.copy()
+            for row in rows:
+                if not unterminated:
+                    offset, prefix = position, digest.copy()
+                if not row:
+                    continue
+                review = normalize(row)
+                if review is None:
+                    skipped += 1
+                    continue
+                if review["id"] in self.seen:
+                    continue
+                if unterminated:
+                    self.tail = review
+                    continue
+                self.seen.add(review["id"])
+                self.stats.add(review)
+                if review_displayed(review):
+                    self.displayed.append(review)
+                added += 1
+            if not unterminated:
+                offset, prefix = position, digest
+            self.offset = offset
+            self.prefix = prefix.hexdigest()
+        if skipped:
+            warn(f"Skipped {skipped} review(s) without a rating in {path}")
+        return added
+
+def sort_displayed_reviews(reviews):
+    """Newest first; undated (Google) reviews last, in export order"""
+    dated = [review for review in reviews if review["date"]]
+    dated.sort(key=lambda review: review["date"], reverse=True)
+    return dated + [review for review in reviews if not review["date"]]
+
+def generate_reviews(business_data, output_root=script_dir):
+    """Aggregate data/reviews/*.csv into a rating summary and pre-paginated review pages.
+
+    Each export is streamed from where the last run stopped (see
+    ReviewSource): new rows update the running aggregates and only reviews
+    the carousel shows are kept for the pages.
+    """
+    cursor_path = os.path.join(output_root, REVIEW_CURSOR_PATH)
+    try:
+        cursor = json.loads(read_cache(cursor_path) or b"{}")
+    except json.JSONDecodeError:
+        cursor = {}
+    if cursor.get("version") != REVIEW_CURSOR_VERSION:
+        cursor = {}
+
+    sources = {}
+    for path in review_sources(output_root):
+        if not os.path.exists(path):
+            continue
+        name = os.path.relpath(path, output_root)
+        source = ReviewSource(cursor.get("sources", {}).get(name))
+        source.ingest(path)
+        sources[name] = source
+    if not sources:
+        warn(f"No review exports found in {os.path.join(output_root, REVIEWS_DIR)}, skipping reviews")
+        return
+
+    stats = ReviewStats()
+    displayed = []
+    for source in sources.values():
+        stats.merge(source.stats)
+        displayed.extend(source.displayed)
+        if source.tail is not None:
+            stats.add(source.tail)
+            if review_displayed(source.tail):
+                displayed.append(source.tail)
+    displayed = sort_displayed_reviews(displayed)
+
+    pages_folder = os.path.join(output_root, REVIEW_PAGES_DIR)
+    page_count = (len(displayed) + REVIEW_PAGE_SIZE - 1) // REVIEW_PAGE_SIZE
+    for page in range(1, page_count + 1):
+        start = (page - 1) * REVIEW_PAGE_SIZE
+        document = {"page": page, "pages": page_count, "reviews": displayed[start:start + REVIEW_PAGE_SIZE]}
+        write_output(os.path.join(pages_folder, f"page-{page}.json"), json.dumps(document, indent=2, ensure_ascii=False))
+
+    # Drop pages left over from a run with more reviews
+    for file_name in list_outputs(pages_folder):
+        match = REVIEW_PAGE_FILE_PATTERN.fullmatch(file_name)
+        if match and not 1 <= int(match.group(1)) <= page_count:
+            remove_output(os.path.join(pages_folder, file_name))
+
+    summary = stats.summary(page_count)
+    write_output(os.path.join(output_root, REVIEW_SUMMARY_PATH), json.dumps(summary, indent=2, ensure_ascii=False))
+
+    recent = [review for review in displayed if review["date"] and review["comment"]][:REVIEW_RECENT_COUNT]
+    module = f'''// AUTO-GENERATED by generate_rules.py from data/reviews/*.csv - do not edit by hand
+
+export interface NormalizedReview {{
+  id: string;
+  platform: 'Booking.com' | 'Google';
+  author: string;
+  rating: number;               // out of 10 (Google stars x 2)
+  date: string | null;          // ISO date-time; null for Google
+  dateText?: string;            // e.g. "3 months ago" (Google)
+  title: string;
+  comment: string;
+  negativeComment: string;
+  categories: Record<string, number>;
+  avatar?: string;
+}}
+
+export interface ReviewPage {{
+  page: number;
+  pages: number;
+  reviews: NormalizedReview[];
+}}
+
+export const REVIEW_SUMMARY = {json.dumps(summary, indent=2, ensure_ascii=False)};
+
+// Precomputed AggregateRating JSON-LD
+export const AGGREGATE_RATING_SCHEMA = REVIEW_SUMMARY.aggregateRating;
+
+export const RECENT_REVIEWS: NormalizedReview[] = {json.dumps(recent, indent=2, ensure_ascii=False)};
+
+const pageCache = new Map<number, Promise<ReviewPage>>();
+
+/**
+ * One page of displayed reviews, newest first (1-based).
+ * Loads only that page's JSON; returns null past the last page.
+ */
+export async function getReviewPage(page: number): Promise<ReviewPage | null> {{
+  if (!Number.isInteger(page) || page < 1 || page > REVIEW_SUMMARY.pages) return null;
+  let pending = pageCache.get(page);
+  if (!pending) {{
+    pending = import(`../data/review-pages/page-${{page}}.json`).then((module) => module.default as ReviewPage);
+    pageCache.set(page, pending);
+  }}
+  return pending;
+}}
+'''
+    write_output(os.path.join(output_root, "lib/review-data.ts"), module)
+
+    cursor = {"version": REVIEW_CURSOR_VERSION, "sources": {name: source.to_dict() for name, source in sources.items()}}
+    write_cache(cursor_path, json.dumps(cursor, ensure_ascii=False))
+
+# -----------------------------
+# Search index
+# -----------------------------
+SEARCH_DIR = "data/search"
+SEARCH_SHARD_FILE_PATTERN = re.compile(r"terms-(\d+)\.json")
+# Terms plus prefixes per data/search/terms-<n>.json shard
+SEARCH_SHARD_SIZE = 2000
+SEARCH_PREFIX_MIN = 2
+# Completions kept per prefix, most common first
+SEARCH_PREFIX_LIMIT = 8
+SEARCH_SNIPPET_LENGTH = 160
+# Per-occurrence weight of a term in a document's title vs. its body
+SEARCH_TITLE_WEIGHT = 3
+SEARCH_BODY_WEIGHT = 1
+SEARCH_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+SEARCH_COMBINING_PATTERN = re.compile("[\u0300-\u036f]")
+# Letters NFKD leaves alone: Turkish dotless i, German sharp s and friends
+SEARCH_FOLD_TABLE = str.maketrans({"ı": "i", "ß": "ss", "æ": "ae", "ø": "o", "œ": "oe", "đ": "d", "ł": "l"})
+SEARCH_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we with you your "
+    "dhe me ne per qe te".split()
+)
+
+def fold_text(text):
+    """Lowercase and strip diacritics ("Prishtinë" -> "prishtine"); must match foldText() in lib/search-index.ts"""
+    text = SEARCH_COMBINING_PATTERN.sub("", unicodedata.normalize("NFKD", text)).lower()
+    return text.translate(SEARCH_FOLD_TABLE)
+
+def search_tokens(text):
+    """Folded index terms of ``text``, stopwords and single letters dropped"""
+    return [
+        token for token in SEARCH_TOKEN_PATTERN.findall(fold_text(html.unescape(text)))
+        if token not in SEARCH_STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+AMENITIES_PAGE = "app/amenities/page.tsx"
+# The amenity cards are { icon: <Icon />, title: "...", description: "..." } objects
+AMENITY_CARD_PATTERN = re.compile(r'\btitle:\s*"((?:[^"\\\n]|\\.)*)",\s*description:\s*"((?:[^"\\\n]|\\.)*)"')
+
+def amenities(output_root=script_dir):
+    """(title, text) of the amenities page's cards and of its sections that list items ([] without the page)"""
+    try:
+        with open(os.path.join(output_root, AMENITIES_PAGE), encoding="utf-8") as f:
+            source = f.read()
+    except FileNotFoundError:
+        return []
+    items = [(_unescape_ts(title), _unescape_ts(text)) for title, text in AMENITY_CARD_PATTERN.findall(source)]
+    for heading, blocks in jsx_sections(source):
+        # A heading and subtitle alone are not worth a result; icons are not text
+        if len(blocks) > 2:
+            items.append((heading, " ".join(block for block in blocks if SEARCH_TOKEN_PATTERN.search(block))))
+    return items
+
+def search_snippet(text):
+    text = " ".join(html.unescape(text).split())
+    if len(text) <= SEARCH_SNIPPET_LENGTH:
+        return text
+    return text[:SEARCH_SNIPPET_LENGTH - 3].rsplit(" ", 1)[0] + "..."
+
+def search_documents(business_data, faqs=(), reviews=(), policies=(), routes=None, home_faqs=(), amenities=(),
+                     rooms=None):
+    """(kind, title, url, body) for every searchable entity.
+
+    ``policies`` are the (heading, text blocks) sections of the booking
+    policies page, ``home_faqs`` the FAQSection entries (indexed in English
+    and Albanian), ``amenities`` the (title, text) items of the amenities
+    page and ``rooms`` the app's roomsSEOData. When ``routes`` (see
+    app_routes) is given, entities whose page the app does not serve are
+    left out, so every result links somewhere.
+    """
+    route_seo = build_route_seo(business_data)
+    index = route_index(business_data)
+    documents = []
+    for route in index.all_services:
+        seo = route_seo.get(normalize_route(route.url)) if route.url else None
+        if route.name and seo:
+            body = " ".join([route.parent or "", seo["description"], " ".join(seo["keywords"])])
+            documents.append(("service", route.name, normalize_route(route.url), body))
+    for route in index.locations:
+        seo = route_seo.get(normalize_route(route.url)) if route.url else None
+        if route.name and seo:
+            documents.append(("location", route.name, normalize_route(route.url), seo["description"]))
+    for faq in faqs:
+        documents.append(("faq", faq["question"], f"/faq/#faq-{faq['id']}", faq["answer"]))
+    for language in ("en", "sq"):
+        for faq in home_faqs:
+            documents.append(("faq", faq["question"][language], "/#faq", faq["answer"][language]))
+    for title, text in amenities:
+        documents.append(("service", title, "/amenities/", text))
+    for room_id, room in (rooms or {}).items():
+        body = " ".join([room.get("description", ""), room.get("price", ""), " ".join(room.get("amenities", []))])
+        documents.append(("room", room["name"], normalize_route(f"/rooms/{room_id}"), body))
+    for post in index.blog_posts:
+        documents.append(("blog", post.name, f"/blog/{post.slug}", ""))
+    for review in reviews:
+        text = " ".join(part for part in (review["title"], review["comment"]) if part)
+        if text:
+            documents.append(("review", f"{review['author']} on {review['platform']}", "/", text))
+    for heading, blocks in policies:
+        if blocks:
+            documents.append(("policy", heading, "/booking-policies/", " ".join(blocks)))
+    if routes is not None:
+        # Room pages are a dynamic route, served for every room in roomsSEOData
+        served = set(routes) | {normalize_route(f"/rooms/{room_id}") for room_id in rooms or {}}
+        documents = [document for document in documents if normalize_route(document[2].split("#")[0]) in served]
+    return documents
+
+def build_search_index(documents):
+    """Inverted index over ``documents``.
+
+    Returns (docs, postings, prefixes): docs is the list of result records,
+    postings maps each term to [[doc, weight], ...] sorted by doc, and
+    prefixes maps every prefix of at least SEARCH_PREFIX_MIN characters to
+    its most common completions.
+    """
+    docs = []
+    postings = {}
+    for doc_id, (kind, title, url, body) in enumerate(documents):
+        docs.append({"kind": kind, "title": html.unescape(title), "url": url, "snippet": search_snippet(body)})
+        weights = {}
+        for token in search_tokens(title):
+            weights[token] = weights.get(token, 0) + SEARCH_TITLE_WEIGHT
+        for token in search_tokens(body):
+            weights[token] = weights.get(token, 0) + SEARCH_BODY_WEIGHT
+        for token, weight in weights.items():
+            postings.setdefault(token, []).append([doc_id, weight])
+
+    completions = {}
+    for term in postings:
+        for end in range(SEARCH_PREFIX_MIN, len(term) + 1):
+            completions.setdefault(term[:end], []).append(term)
+    prefixes = {
+        prefix: sorted(terms, key=lambda term: (-len(postings[term]), term))[:SEARCH_PREFIX_LIMIT]
+        for prefix, terms in completions.items()
+    }
+    return docs, postings, prefixes
+
+def generate_search_index(business_data, output_root=script_dir):
+    """Generate the sharded site search index (data/search/) and its loader (lib/search-index.ts).
+
+    Covers services, locations, FAQs, blog topics, displayed review text,
+    the booking policy sections, the home page FAQs, the amenities page and
+    the rooms, keeping only those on pages the app serves.
+    A query loads docs.json plus one shard per term, so lookups cost O(terms)
+    and the browser never builds the index itself.
+    """
+    faq_data = read_output(os.path.join(output_root, "data/faq.json"))
+    faqs = json.loads(faq_data).get("faqs", []) if faq_data else []
+    reviews = []
+    review_summary = read_output(os.path.join(output_root, REVIEW_SUMMARY_PATH))
+    pages = json.loads(review_summary).get("pages", 0) if review_summary else 0
+    for page in range(1, pages + 1):
+        page_data = read_output(os.path.join(output_root, REVIEW_PAGES_DIR, f"page-{page}.json"))
+        if page_data:
+            reviews.extend(json.loads(page_data)["reviews"])
+
+    policies = booking_policies(output_root)
+    documents = search_documents(business_data, faqs, reviews, policies, app_routes(output_root),
+                                 home_faqs(output_root), amenities(output_root), app_rooms(business_data, output_root))
+    docs, postings, prefixes = build_search_index(documents)
+    shard_count = max(1, -(-(len(postings) + len(prefixes)) // SEARCH_SHARD_SIZE))
+    shards = [{"terms": {}, "prefixes": {}} for _ in range(shard_count)]
+    for term in sorted(postings):
+        shards[route_shard(term, shard_count)]["terms"][term] = postings[term]
+    for prefix in sorted(prefixes):
+        shards[route_shard(prefix, shard_count)]["prefixes"][prefix] = prefixes[prefix]
+
+    search_folder = os.path.join(output_root, SEARCH_DIR)
+    compact = {"ensure_ascii": False, "separators": (",", ":")}
+    write_output(os.path.join(search_folder, "docs.json"), json.dumps({"shards": shard_count, "docs": docs}, **compact))
+    for i, shard in enumerate(shards):
+        write_output(os.path.join(search_folder, f"terms-{i}.json"), json.dumps(shard, **compact))
+
+    # Drop shards left over from a run with more terms
+    for file_name in list_outputs(search_folder):
+        match = SEARCH_SHARD_FILE_PATTERN.fullmatch(file_name)
+        if match and int(match.group(1)) >= shard_count:
+            remove_output(os.path.join(search_folder, file_name))
+
+    loader = f'''// AUTO-GENERATED by generate_rules.py from business.yaml - do not edit by hand
+
+export const SEARCH_SHARDS = {shard_count};
+
+export interface SearchDoc {{
+  kind: 'service' | 'location' | 'faq' | 'blog' | 'review' | 'policy' | 'room';
+  title: string;
+  url: string;
+  snippet: string;
+}}
+
+export interface SearchResult extends SearchDoc {{
+  score: number;
+}}
+
+interface SearchShard {{
+  terms: Record<string, [number, number][]>;   // term -> [doc, weight] pairs
+  prefixes: Record<string, string[]>;         // prefix -> most common completions
+}}
+
+const STOPWORDS = new Set({json.dumps(sorted(SEARCH_STOPWORDS), ensure_ascii=False)});
+const FOLD_TABLE: Record<string, string> = {json.dumps({chr(k): v for k, v in SEARCH_FOLD_TABLE.items()}, ensure_ascii=False)};
+const PREFIX_MIN = {SEARCH_PREFIX_MIN};
+
+let docsPending: Promise<SearchDoc[]> | null = null;
+const shardCache = new Map<number, Promise<SearchShard>>();
+
+// Must match fold_text() in generate_rules.py
+export function foldText(text: string): string {{
+  return text
+    .normalize('NFKD')
+    .replace(/[\\u0300-\\u036f]/g, '')
+    .toLowerCase()
+    .replace(/[ıßæøœđł]/g, (ch) => FOLD_TABLE[ch]);
+}}
+
+export function searchTokens(text: string): string[] {{
+  return (foldText(text).match(/[\\p{{L}}\\p{{N}}]+/gu) || []).filter(
+    (token) => !STOPWORDS.has(token) && (token.length > 1 || /^\\d$/.test(token))
+  );
+}}
+
+// FNV-1a over UTF-16 code units; must match route_shard() in generate_rules.py
+function termShard(term: string): number {{
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < term.length; i++) {{
+    hash ^= term.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193) >>> 0;
+  }}
+  return hash % SEARCH_SHARDS;
+}}
+
+function loadDocs(): Promise<SearchDoc[]> {{
+  if (!docsPending) {{
+    docsPending = import('../data/search/docs.json').then((module) => module.default.docs as SearchDoc[]);
+  }}
+  return docsPending;
+}}
+
+function loadShard(shard: number): Promise<SearchShard> {{
+  let pending = shardCache.get(shard);
+  if (!pending) {{
+    pending = import(`../data/search/terms-${{shard}}.json`).then((module) => module.default as SearchShard);
+    shardCache.set(shard, pending);
+  }}
+  return pending;
+}}
+
+async function postings(term: string): Promise<[number, number][]> {{
+  return (await loadShard(termShard(term))).terms[term] || [];
+}}
+
+/** Autocomplete: the most common indexed terms starting with the last word of ``query``. */
+export async function suggest(query: string): Promise<string[]> {{
+  const tokens = searchTokens(query);
+  const prefix = tokens[tokens.length - 1];
+  if (!prefix || prefix.length < PREFIX_MIN) return [];
+  return (await loadShard(termShard(prefix))).prefixes[prefix] || [];
+}}
+
+/**
+ * Ranked results for ``query``; the last word also matches as a prefix.
+ * Each term costs one shard lookup, weighted by inverse document frequency.
+ */
+export async function search(query: string, limit = 10): Promise<SearchResult[]> {{
+  const tokens = searchTokens(query);
+  if (!tokens.length) return [];
+  const docs = await loadDocs();
+  const scores = new Map<number, number>();
+  const addTerm = async (term: string, boost: number) => {{
+    const list = await postings(term);
+    if (!list.length) return;
+    const idf = Math.log(1 + docs.length / list.length);
+    for (const [doc, weight] of list) {{
+      scores.set(doc, (scores.get(doc) || 0) + weight * idf * boost);
+    }}
+  }};
+
+  const last = tokens.pop() as string;
+  await Promise.all(tokens.map((term) => addTerm(term, 1)));
+  const completions = last.length >= PREFIX_MIN ? await suggest(last) : [];
+  const lastTerms = completions.includes(last) ? completions : [last, ...completions];
+  await Promise.all(lastTerms.map((term) => addTerm(term, term === last ? 1 : 0.5)));
+
+  return Array.from(scores, ([doc, score]) => ({{ ...docs[doc], score }}))
+    .sort((a, b) => b.score - a.score)
+    .slice(0, limit);
+}}
+'''
+    write_output(os.path.join(output_root, "lib/search-index.ts"), loader)
+
+# -----------------------------
+# Chat retrieval index
+# -----------------------------
+# Lives next to server/index.js, which is deployed on its own
+CHAT_INDEX_PATH = "server/chat-index.json"
+CHAT_INDEX_VERSION = 1
+# BM25 term-frequency saturation and length normalization
+CHAT_BM25_K1 = 1.2
+CHAT_BM25_B = 0.75
+# Question words carry no meaning for matching ("what time is check-in")
+CHAT_STOPWORDS = SEARCH_STOPWORDS | frozenset(
+    "can could do does how i is me my there what when where which who why will would".split()
+)
+# Extra words guests use for entries whose text lacks them
+CHAT_CONTACT_TERMS = "contact phone call number email reach address location"
+CHAT_HOURS_TERMS = "hours open opening closed reception front desk available"
+
+# Booking policies are indexed straight from the page, one answer per <h2> section
+BOOKING_POLICIES_PAGE = "app/booking-policies/page.tsx"
+JSX_COMMENT_PATTERN = re.compile(r"\{/\*.*?\*/\}", re.DOTALL)
+JSX_TAG_NAME_PATTERN = re.compile(r"</?([A-Za-z][\w.]*)?")
+# Closing one of these ends a sentence in the extracted text
+JSX_BLOCK_TAGS = frozenset("p li h1 h2 h3 h4 h5 h6 td th dt dd div section".split())
+
+def _skip_jsx_braces(source, i):
+    """Index just past the balanced {...} expression starting at ``i``"""
+    depth = 0
+    while i < len(source):
+        c = source[i]
+        if c in "'\"":
+            i = _skip_ts_string(source, i, c)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+def jsx_sections(source):
+    """Visible text of a page component, as (h2 heading, [text block, ...]) per section.
+
+    Tags, attributes and {expressions} are dropped and entities decoded;
+    each closing block tag (p, li, h3, ...) ends a text block. Text before
+    the first <h2> belongs to no section and is skipped.
+    """
+    source = JSX_COMMENT_PATTERN.sub("", source)
+    start = source.find("<h2")
+    end = source.rfind("</")
+    if start < 0:
+        return []
+    end = source.find(">", end) + 1
+
+    sections = []
+    heading = None       # text parts of an open <h2>
+    parts = []           # text parts of the current block
+    def flush():
+        text = " ".join(" ".join(parts).split())
+        parts.clear()
+        if text and sections:
+            sections[-1][1].append(html.unescape(text))
+
+    i = start
+    while i < end:
+        c = source[i]
+        if c == "{":
+            i = _skip_jsx_braces(source, i)
+        elif c == "<":
+            match = JSX_TAG_NAME_PATTERN.match(source, i)
+            name = (match.group(1) or "").lower()
+            closing = source.startswith("</", i)
+            # Skip attributes, including {...} values that may contain ">"
+            i = match.end()
+            while i < end and source[i] != ">":
+                if source[i] == "{":
+                    i = _skip_jsx_braces(source, i)
+                elif source[i] in "'\"":
+                    i = _skip_ts_string(source, i, source[i])
+                else:
+                    i += 1
+            i += 1
+            if name == "h2":
+                if closing and heading is not None:
+                    sections.append((html.unescape(" ".join(" ".join(heading).split())), []))
+                    heading = None
+                elif not closing:
+                    flush()
+                    heading = []
+            elif closing and name in JSX_BLOCK_TAGS:
+                flush()
+        else:
+            next_special = min((j for j in (source.find("<", i), source.find("{", i)) if j >= 0), default=end)
+            text = source[i:min(next_special, end)]
+            (heading if heading is not None else parts).append(text)
+            i = min(next_special, end)
+    flush()
+    return [(title, blocks) for title, blocks in sections if title]
+
+def booking_policies(output_root=script_dir):
+    """jsx_sections() of the booking policies page ([] when the app has none)"""
+    try:
+        with open(os.path.join(output_root, BOOKING_POLICIES_PAGE), encoding="utf-8") as f:
+            return jsx_sections(f.read())
+    except FileNotFoundError:
+        return []
+
+def policy_answer(blocks):
+    """One answer from a section's text blocks, each ending as a sentence"""
+    return " ".join(block if block[-1] in ".!?:" else block + "." for block in blocks)
+
+def chat_documents(business_data, faqs=(), policies=(), routes=None):
+    """(kind, title, answer, url, extra index terms) for every suggested answer.
+
+    Only the FAQ ids listed in CHAT_FAQS are included, when it is set.
+    ``policies`` are the (heading, text blocks) sections of the booking
+    policies page; CHAT_KEYWORDS adds index terms to them by heading. When
+    ``routes`` (see app_routes) is given, a URL the app does not serve is
+    replaced by None, so the widget shows the answer without a link.
+    """
+    contact = business_data.get('CONTACT', {})
+    hours = business_data.get('HOURS', {})
+    faq_ids = business_data.get('CHAT_FAQS')
+    documents = []
+    for faq in faqs:
+        if faq_ids is None or faq["id"] in faq_ids:
+            documents.append(("faq", faq["question"], html.unescape(faq["answer"]), "/faq/", ""))
+
+    parts = []
+    if contact.get('PHONE'):
+        parts.append(f"Call us at {contact['PHONE']}")
+    if contact.get('EMAIL'):
+        parts.append(f"email us at {contact['EMAIL']}")
+    if parts:
+        answer = " or ".join(parts) + "."
+        if contact.get('ADDRESS') and contact.get('ADDRESS_VISIBILITY') != "HIDDEN":
+            answer += f" We are located at {contact['ADDRESS']}."
+        documents.append(("contact", "Contact details", answer, "/contact", CHAT_CONTACT_TERMS))
+
+    if hours:
+        if len(set(hours.values())) == 1:
+            answer = f"We are open {next(iter(hours.values()))}, every day of the week."
+        else:
+            answer = "Opening hours: " + ", ".join(f"{day.title()} {value}" for day, value in hours.items()) + "."
+        documents.append(("hours", "Opening hours", answer, "/contact", CHAT_HOURS_TERMS))
+
+    route_seo = build_route_seo(business_data)
+    for route in route_index(business_data).all_services:
+        seo = route_seo.get(normalize_route(route.url)) if route.url else None
+        if route.name and seo:
+            documents.append(("service", route.name, seo["description"], normalize_route(route.url),
+                              " ".join(seo["keywords"])))
+
+    keywords = business_data.get('CHAT_KEYWORDS') or {}
+    for heading, blocks in policies:
+        if blocks:
+            documents.append(("policy", heading, policy_answer(blocks), "/booking-policies",
+                              keywords.get(heading, "")))
+    if routes is not None:
+        documents = [
+            (kind, title, answer, url if url and normalize_route(url) in routes else None, terms)
+            for kind, title, answer, url, terms in documents
+        ]
+    return documents
+
+def chat_tokens(text):
+    return [token for token in search_tokens(text) if token not in CHAT_STOPWORDS]
+
+def build_chat_index(documents):
+    """BM25 index over ``documents``: postings of [doc, term frequency], document lengths and IDF.
+
+    IDF is the Lucene-style ln(1 + (N - df + 0.5) / (df + 0.5)), which stays
+    positive, so common terms still count a little instead of scoring below
+    zero. Scoring is plain BM25 (no BM25+ lower-bound term).
+    """
+    docs, doc_lengths, postings = [], [], {}
+    for doc_id, (kind, title, answer, url, terms) in enumerate(documents):
+        docs.append({"kind": kind, "title": html.unescape(title), "answer": answer, "url": url})
+        tokens = chat_tokens(" ".join((title, answer, terms)))
+        doc_lengths.append(len(tokens))
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            postings.setdefault(token, []).append([doc_id, count])
+
+    total = len(docs)
+    idf = {
+        term: round(math.log(1 + (total - len(entries) + 0.5) / (len(entries) + 0.5)), 6)
+        for term, entries in postings.items()
+    }
+    return {
+        "version": CHAT_INDEX_VERSION,
+        "k1": CHAT_BM25_K1,
+        "b": CHAT_BM25_B,
+        "avgDocLength": round(sum(doc_lengths) / total, 6) if total else 0,
+        "tokenizer": {
+            "stopwords": sorted(CHAT_STOPWORDS),
+            "fold": {chr(k): v for k, v in SEARCH_FOLD_TABLE.items()},
+        },
+        "docs": docs,
+        "docLengths": doc_lengths,
+        "idf": {term: idf[term] for term in sorted(idf)},
+        "postings": {term: postings[term] for term in sorted(postings)},
+    }
+
+def generate_chat_index(business_data, output_root=script_dir):
+    """Generate the chat widget's BM25 answer index (server/chat-index.json) and its lookup module.
+
+    Covers generated FAQs, CONTACT, HOURS, services and the sections of the
+    booking policies page, so the Socket.IO server can suggest answers with
+    a local lookup.
+    """
+    faq_data = read_output(os.path.join(output_root, "data/faq.json"))
+    faqs = json.loads(faq_data).get("faqs", []) if faq_data else []
+    policies = booking_policies(output_root)
+    index = build_chat_index(chat_documents(business_data, faqs, policies, app_routes(output_root)))
+    write_output(os.path.join(output_root, CHAT_INDEX_PATH),
+                 json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+
+    module = '''// AUTO-GENERATED by generate_rules.py from business.yaml - do not edit by hand
+const index = require('./chat-index.json');
+
+// Answers scoring below this, or below RELATIVE_SCORE x the best match, are too weak to suggest
+const MIN_SCORE = 1.2;
+const RELATIVE_SCORE = 0.5;
+
+const { k1, b, avgDocLength, docs, docLengths, idf, postings } = index;
+const stopwords = new Set(index.tokenizer.stopwords);
+const foldTable = index.tokenizer.fold;
+const foldPattern = new RegExp(`[${Object.keys(foldTable).join('')}]`, 'g');
+// Per-document part of the BM25 denominator, computed once at startup
+const lengthNorms = docLengths.map((length) => k1 * (1 - b + (b * length) / (avgDocLength || 1)));
+
+// Must match search_tokens()/chat_tokens() in generate_rules.py
+function tokenize(text) {
+  const folded = text
+    .normalize('NFKD')
+    .replace(/[\\u0300-\\u036f]/g, '')
+    .toLowerCase()
+    .replace(foldPattern, (ch) => foldTable[ch]);
+  return (folded.match(/[\\p{L}\\p{N}]+/gu) || []).filter(
+    (token) => !stopwords.has(token) && (token.length > 1 || /^\\d$/.test(token))
+  );
+}
+
+/**
+ * Best matching answers for a guest message, highest BM25 score first.
+ * Each query term is one postings lookup; no I/O after startup.
+ */
+function suggestAnswers(message, limit = 3, minScore = MIN_SCORE) {
+  const scores = new Map();
+  for (const term of new Set(tokenize(message || ''))) {
+    const entries = postings[term];
+    if (!entries) continue;
+    for (const [doc, tf] of entries) {
+      const score = (idf[term] * tf * (k1 + 1)) / (tf + lengthNorms[doc]);
+      scores.set(doc, (scores.get(doc) || 0) + score);
+    }
+  }
+  const answers = Array.from(scores, ([doc, score]) => ({ ...docs[doc], score }))
+    .sort((x, y) => y.score - x.score);
+  const cutoff = Math.max(minScore, answers.length ? answers[0].score * RELATIVE_SCORE : 0);
+  return answers.filter((answer) => answer.score >= cutoff).slice(0, limit);
+}
+
+module.exports = { suggestAnswers, tokenize };
+'''
+    write_output(os.path.join(output_root, "server/chat-retrieval.js"), module)
+
+# -----------------------------
+# Structured data (JSON-LD)
+# -----------------------------
+STRUCTURED_DATA_PATH = "data/structured-data.json"
+ROOM_PRICE_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+def business_config_files(output_root=script_dir):
+    """lib/business-config.ts and, in split mode, the lib/business/ modules it re-exports"""
+    modules_folder = os.path.join(output_root, "lib/business")
+    modules = list_outputs(modules_folder)
+    return [os.path.join(output_root, "lib/business-config.ts")] + [
+        os.path.join(modules_folder, name) for name in modules if name.endswith(".ts")]
+
+def structured_data_inputs(output_root=script_dir):
+    """App files the JSON-LD is read from, plus review-summary.json and the page files"""
+    return (business_config_files(output_root)
+            + [os.path.join(output_root, name) for name in (SEO_CONFIG_FILE, HOME_FAQ_FILE, REVIEW_SUMMARY_PATH)]
+            + app_page_files(output_root))
+
+def serialize_json_ld(schemas):
+    """Minified JSON-LD safe to inline in a <script> tag ("<" is escaped, so no "</script>")"""
+    return json.dumps(schemas, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+
+def breadcrumb_schema(breadcrumbs):
+    """BreadcrumbList from an SEOConfig's breadcrumbs"""
+    return {
+        "@context": "https://schema.org",
+        "@type": "BreadcrumbList",
+        "itemListElement": [
+            {"@type": "ListItem", "position": i + 1, "name": crumb["name"], "item": crumb["url"]}
+            for i, crumb in enumerate(breadcrumbs)
+        ],
+    }
+
+def room_offer(price, url):
+    """Offer for a room price like "€28-39"; a range becomes an AggregateOffer"""
+    amounts = ROOM_PRICE_PATTERN.findall(price or "")
+    offer = {"@type": "AggregateOffer", "lowPrice": amounts[0], "highPrice": amounts[-1]} if len(amounts) > 1 \
+        else {"@type": "Offer", "price": amounts[0] if amounts else ""}
+    offer.update({"priceCurrency": "EUR", "availability": "https://schema.org/InStock", "url": url})
+    return offer
+
+def build_structured_data(business_data, contact, google_maps=None, opening_hours="", rooms=None, pages=None,
+                          faqs=(), aggregate_rating=None, routes=None):
+    """JSON-LD schemas for the routes the app serves, as {route: [schema, ...]}.
+
+    ``contact``, ``google_maps`` and ``opening_hours`` are the app's
+    CONTACT, GOOGLE_MAPS and BUSINESS_HOURS_SCHEMA, ``rooms`` and ``pages``
+    its roomsSEOData and seoConfigs, and ``faqs`` the FAQSection entries.
+    ``routes`` limits the static pages to app_routes(); every room in
+    ``rooms`` gets its /rooms/[id] route.
+    """
+    business_name = business_data.get('BUSINESS_NAME', 'Our Company')
+    website_url = business_data.get('WEBSITE_URL', 'https://example.com').rstrip('/')
+    hotel = business_data.get('HOTEL', {})
+    google_maps = google_maps or {}
+    pages = pages or {}
+
+    address = {
+        "@type": "PostalAddress",
+        "streetAddress": contact.get('street', ''),
+        "addressLocality": contact.get('city', ''),
+        "postalCode": contact.get('zip', ''),
+        "addressCountry": hotel.get('COUNTRY', 'XK'),
+    }
+    hotel_reference = {
+        "@type": "Hotel",
+        "name": business_name,
+        "address": address,
+        "telephone": f"+383 {contact.get('phone', '')}",
+        "email": contact.get('email', ''),
+        "url": website_url,
+    }
+    rating = {"aggregateRating": aggregate_rating} if aggregate_rating else {}
+
+    def page_schema(route, schema_type, **fields):
+        page = pages.get(route, {})
+        schemas = [{
+            "@context": "https://schema.org",
+            "@type": schema_type,
+            "name": page.get("title", business_name),
+            "description": page.get("description", ""),
+            "url": f"{website_url}{route}",
+            **fields,
+        }]
+        if page.get("breadcrumbs"):
+            schemas.append(breadcrumb_schema(page["breadcrumbs"]))
+        return schemas
+
+    structured = {}
+    home = {
+        "@context": "https://schema.org",
+        "@type": "Hotel",
+        "name": business_name,
+        "description": hotel.get('DESCRIPTION', ''),
+        "image": f"{website_url}{hotel.get('IMAGE', '')}",
+        "address": address,
+    }
+    if google_maps.get("latitude") and google_maps.get("longitude"):
+        home["geo"] = {"@type": "GeoCoordinates", "latitude": google_maps["latitude"],
+                       "longitude": google_maps["longitude"]}
+    home.update({
+        "telephone": hotel_reference["telephone"],
+        "email": hotel_reference["email"],
+        **({"starRating": {"@type": "Rating", "ratingValue": str(hotel['STAR_RATING'])}}
+           if hotel.get('STAR_RATING') else {}),
+        **rating,
+        **({"priceRange": hotel['PRICE_RANGE']} if hotel.get('PRICE_RANGE') else {}),
+        "amenityFeature": [{"@type": "LocationFeatureSpecification", "name": name}
+                           for name in hotel.get('AMENITIES', [])],
+        "openingHours": opening_hours,
+        "url": website_url,
+    })
+    structured["/"] = [home]
+    if faqs:
+        structured["/"].append({
+            "@context": "https://schema.org",
+            "@type": "FAQPage",
+            "mainEntity": [
+                {"@type": "Question", "name": faq["question"]["en"],
+                 "acceptedAnswer": {"@type": "Answer", "text": faq["answer"]["en"]}}
+                for faq in faqs
+            ],
+        })
+
+    room_schemas = {}
+    room_routes = {}
+    for room_id, room in (rooms or {}).items():
+        url = f"{website_url}/rooms/{room_id}"
+        schema = {
+            "@context": "https://schema.org",
+            "@type": "HotelRoom",
+            "name": room["name"],
+            "description": room.get("description", ""),
+            "image": f"{website_url}{room.get('ogImage', '')}",
+            "url": url,
+            **rating,
+            "containedInPlace": hotel_reference,
+        }
+        bed = next((amenity for amenity in room.get("amenities", []) if "Bed" in amenity), None)
+        if bed:
+            schema["bed"] = bed
+        schema["amenityFeature"] = [{"@type": "LocationFeatureSpecification", "name": amenity}
+                                    for amenity in room.get("amenities", [])]
+        schema["offers"] = room_offer(room.get("price"), f"{website_url}/booking?room={room_id}")
+        room_schemas[room_id] = schema
+        room_routes[normalize_route(f"/rooms/{room_id}")] = [schema] + (
+            [breadcrumb_schema(room["breadcrumbs"])] if room.get("breadcrumbs") else [])
+
+    structured["/rooms/"] = page_schema("/rooms/", "CollectionPage", mainEntity={
+        "@type": "ItemList",
+        "numberOfItems": len(room_schemas),
+        "itemListElement": [
+            {"@type": "ListItem", "position": i + 1,
+             "item": {key: schema[key] for key in ("@type", "name", "url", "image", "offers")}}
+            for i, schema in enumerate(room_schemas.values())
+        ],
+    })
+    structured.update(room_routes)
+    structured["/contact/"] = page_schema("/contact/", "ContactPage", mainEntity={
+        **hotel_reference,
+        "contactPoint": {
+            "@type": "ContactPoint",
+            "telephone": hotel_reference["telephone"],
+            "email": hotel_reference["email"],
+            "contactType": "reservations",
+            "availableLanguage": ["English", "Albanian"],
+        },
+    })
+    structured["/booking-policies/"] = page_schema("/booking-policies/", "WebPage", about=hotel_reference)
+
+    if routes is not None:
+        served = set(routes) | set(room_routes)
+        structured = {route: schemas for route, schemas in structured.items() if route in served}
+    return structured
+
+def generate_structured_data(business_data, output_root=script_dir):
+    """Pre-render the JSON-LD of the app's routes into data/structured-data.json.
+
+    Reads what the pages show: CONTACT, GOOGLE_MAPS and BUSINESS_HOURS_SCHEMA
+    from lib/business-config.ts, roomsSEOData and seoConfigs from
+    lib/seo-config.ts, the home page FAQs from components/FAQSection.tsx and
+    the aggregate rating from review-summary.json. Each value is the final
+    minified payload, so a layout inlines one string instead of building
+    schema objects and calling JSON.stringify.
+    """
+    config_files = business_config_files(output_root)
+    review_summary = read_output(os.path.join(output_root, REVIEW_SUMMARY_PATH))
+    review_summary = json.loads(review_summary) if review_summary else {}
+    structured = build_structured_data(
+        business_data,
+        read_ts_constant(config_files, "CONTACT") or {},
+        read_ts_constant(config_files, "GOOGLE_MAPS"),
+        read_ts_constant(config_files, "BUSINESS_HOURS_SCHEMA") or "",
+        rooms=app_rooms(business_data, output_root),
+        pages=seo_config_constant(business_data, "seoConfigs", output_root),
+        faqs=home_faqs(output_root),
+        aggregate_rating=review_summary.get("aggregateRating") if review_summary.get("reviewCount") else None,
+        routes=app_routes(output_root),
+    )
+    payloads = {route: serialize_json_ld(schemas) for route, schemas in structured.items()}
+    write_output(os.path.join(output_root, STRUCTURED_DATA_PATH), json.dumps(payloads, indent=2, ensure_ascii=False))
+
+    loader = '''// AUTO-GENERATED by generate_rules.py from business.yaml - do not edit by hand
+import structuredData from '../data/structured-data.json';
+
+// Route -> minified JSON-LD array, already safe to inline in a <script> tag
+const payloads: Record<string, string> = structuredData;
+
+function normalizeRoute(pathname: string): string {
+  const trimmed = pathname.replace(/^\\/+|\\/+$/g, '');
+  return trimmed ? `/${trimmed}/` : '/';
+}
+
+/**
+ * Pre-serialized JSON-LD for a route (undefined for routes without structured data).
+ * Use as: <script type="application/ld+json" dangerouslySetInnerHTML={{ __html: json }} />
+ */
+export function getStructuredData(pathname: string): string | undefined {
+  return payloads[normalizeRoute(pathname)];
+}
+'''
+    write_output(os.path.join(output_root, "lib/structured-data.ts"), loader)
+
+# -----------------------------
+# Generation results
+# -----------------------------
+@dataclass
+class GenerateOptions:
+    """Options for generate()"""
+    force: bool = False                      # ignore the build manifest
+    jobs: int = 1                            # worker threads (0 = one per CPU)
+    only: Optional[set] = None               # regenerate just these task names
+    templates_folder: Optional[str] = None   # defaults to <output_root>/.cursor/templates/
+    pipeline: Optional["Pipeline"] = None    # template post-processing stages (default: all)
+    precompress: bool = False                # write .min.json/.gz/.br variants of public files
+    dry_run: bool = False                    # render everything in memory and only compare with disk
+
+@dataclass
+class TaskResult:
+    """Outcome of one template or data generator"""
+    name: str
+    kind: str                                # "template", "public" or "data"
+    status: str = "generated"                # "generated", "up-to-date", "skipped" or "failed"
+    written: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    stages: list = field(default_factory=list)   # StageTiming for each pipeline stage run
+    cache: dict = field(default_factory=dict)    # cache-state files to save once outputs are committed
+
+@dataclass
+class Report:
+    """Structured result of a generate() run"""
+    output_root: str
+    tasks: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+    changes: list = field(default_factory=list)  # OutputChange for every output (dry runs only)
+    pending: dict = field(default_factory=dict)  # path -> rendered bytes (dry runs only)
+
+    @property
+    def out_of_date(self):
+        """Dry-run outputs that differ from disk"""
+        return [change for change in self.changes if change.status != "unchanged"]
+
+    @property
+    def written(self):
+        return [path for task in self.tasks for path in task.written]
+
+    @property
+    def unchanged(self):
+        return [path for task in self.tasks for path in task.unchanged]
+
+    @property
+    def skipped(self):
+        return [task.name for task in self.tasks if task.status == "up-to-date"]
+
+    @property
+    def failed(self):
+        return [task for task in self.tasks if task.status == "failed"]
+
+    @property
+    def stats(self):
+        """Counts shown in the generation summary"""
+        generated = [task for task in self.tasks if task.status == "generated"]
+        return {
+            "templates_processed": sum(task.kind == "template" for task in generated),
+            "data_files_generated": sum(task.kind == "data" for task in generated),
+            "outputs_up_to_date": len(self.skipped),
+            "failed": len(self.failed),
+        }
+
+    @property
+    def stage_totals(self):
+        """Pipeline stage totals across every template: elapsed seconds, bytes in and runs"""
+        totals = {}
+        for task in self.tasks:
+            for timing in task.stages:
+                entry = totals.setdefault(timing.stage, {"elapsed": 0.0, "bytes": 0, "runs": 0})
+                entry["elapsed"] += timing.elapsed
+                entry["bytes"] += timing.bytes_in
+                entry["runs"] += 1
+        return totals
+
+# Elapsed seconds and bytes through one pipeline stage for one output
+StageTiming = namedtuple("StageTiming", ["stage", "output", "elapsed", "bytes_in", "bytes_out"])
+
+_current_task = threading.local()
+
+def current_task():
+    """TaskResult of the task running on this thread (None outside tasks)"""
+    return getattr(_current_task, "result", None)
+
+def current_writer():
+    """Output writer of the generate() run on this thread (None writes straight to disk)"""
+    return getattr(_current_task, "writer", None)
+
+def warn(message):
+    """Record a warning on the running task"""
+    result = current_task()
+    if result is None:
+        print(f"⚠️  Warning: {message}")
+    else:
+        result.warnings.append(message)
+
+# -----------------------------
+# Output writers
+# -----------------------------
+def write_output(path, content):
+    """Write a generated text file, leaving it untouched when the content is unchanged.
+
+    The path is recorded on the running task as written or unchanged.
+    Returns True if the file was written.
+    """
+    return write_bytes_output(path, content.encode("utf-8"))
+
+# Keys every entry of the ai-scrape-data page lists must have
+PAGE_KEYS = ("path", "title", "description", "type")
+
+def validated_items(items, required_keys, label):
+    """Yield dict items, raising as soon as one is missing a required key"""
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"{label}[{i}] is not an object")
+        missing = [key for key in required_keys if key not in item]
+        if missing:
+            raise ValueError(f"{label}[{i}] is missing {', '.join(missing)}")
+        yield item
+
+def iter_json(value, level=0, indent="  "):
+    """Encode a value as JSON in chunks, identical to json.dumps(value, indent=2).
+
+    Lists may be given as generators, so large arrays are produced and
+    written one element at a time instead of being built in memory.
+    """
+    if isinstance(value, dict):
+        if not value:
+            yield "{}"
+            return
+        inner = "\n" + indent * (level + 1)
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + inner + json.dumps(str(key) if not isinstance(key, str) else key) + ": "
+            yield from iter_json(item, level + 1, indent)
+        yield "\n" + indent * level + "}"
+    elif isinstance(value, (list, tuple)) or hasattr(value, "__next__"):
+        inner = "\n" + indent * (level + 1)
+        empty = True
+        for item in value:
+            yield ("[" if empty else ",") + inner
+            empty = False
+            yield from iter_json(item, level + 1, indent)
+        yield "[]" if empty else "\n" + indent * level + "]"
+    else:
+        yield json.dumps(value)
+
+class HashingWriter:
+    """Binary file wrapper that hashes everything written through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+def with_writer(write):
+    """Call ``write(writer)`` with the OutputWriter of the running generate().
+
+    Outside generate() a one-off writer is used and committed immediately,
+    so every output still lands through a temporary file and rename.
+    """
+    writer = current_writer()
+    if writer is not None:
+        return write(writer)
+    writer = OutputWriter()
+    try:
+        changed = write(writer)
+        writer.commit()
+    finally:
+        writer.discard()
+    return changed
+
+def write_stream_output(path, chunks, compress=False):
+    """Stream text chunks to a generated file, leaving it untouched when unchanged.
+
+    The chunks are encoded into a temporary file next to ``path`` while it
+    is hashed, so peak memory does not depend on the size of the output.
+    With ``compress`` the file is gzipped (with a fixed timestamp, so equal
+    content gives equal bytes). Returns True if the file was written.
+    """
+    return with_writer(lambda writer: writer.write_stream(path, chunks, compress))
+
+def write_json_output(path, document):
+    """Stream a JSON document to disk (see write_stream_output); lists may be generators"""
+    return write_stream_output(path, iter_json(document))
+
+def write_bytes_output(path, data):
+    """Write a binary generated file, leaving it untouched when unchanged.
+
+    Returns True if the file was written.
+    """
+    return with_writer(lambda writer: writer.write(path, data))
+
+def remove_output(path):
+    """Delete a generated file that is no longer produced"""
+    with_writer(lambda writer: writer.remove(path))
+
+def read_output(path):
+    """Bytes of a generated file as this run left it (None if it does not exist)"""
+    writer = current_writer()
+    if writer is not None:
+        return writer.read(path)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+def hash_output(path):
+    """SHA-256 hex digest of a generated file as this run left it (see read_output)"""
+    writer = current_writer()
+    return hash_file(path) if writer is None else writer.digest(path)
+
+def list_outputs(folder):
+    """File names in a folder, including files this run has produced but not committed"""
+    names = set(os.listdir(folder)) if os.path.isdir(folder) else set()
+    writer = current_writer()
+    if writer is not None:
+        names = writer.list(folder, names)
+    # Leave out the temporary files of staged outputs
+    return sorted(name for name in names if not (name.startswith(".") and name.endswith(".tmp")))
+
+def read_cache(path):
+    """Bytes of a build-cache file such as the reviews cursor (None if missing)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+def create_temp_file(path):
+    """Create a hidden temporary file next to ``path``; returns (fd, temp path).
+
+    Unlike mkstemp (always 0600) the file gets the mode open() would give a
+    new file, 0666 less the umask, which the kernel applies.
+    """
+    folder, name = os.path.split(path)
+    while True:
+        temp_path = os.path.join(folder, f".{name}.{os.urandom(4).hex()}.tmp")
+        try:
+            return os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666), temp_path
+        except FileExistsError:
+            continue
+
+def save_cache(path, content):
+    """Atomically replace a build-cache file"""
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, temp_path = create_temp_file(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def write_cache(path, content):
+    """Save build-cache state under .generate_cache/ (not an output).
+
+    Inside a task the file is saved by generate() after the run's outputs are
+    committed, so the state never runs ahead of the files it describes; a
+    dry run or a failed task leaves it untouched.
+    """
+    result = current_task()
+    if result is None:
+        save_cache(path, content)
+    else:
+        result.cache[path] = content
+
+class OutputWriter:
+    """Stages the outputs of a generate() run and commits them together.
+
+    An output whose bytes match the file on disk is skipped. Anything else
+    is written to a temporary file next to its target and fsynced, and
+    commit() renames every staged file into place at the end of the run,
+    so file watchers never see a half-written file and a run that crashes
+    leaves the previous outputs intact. Reads and folder listings made
+    through read_output()/list_outputs() see the staged outputs.
+    """
+
+    def __init__(self):
+        self.staged = {}    # path -> (temp path, sha256 hex digest), or None to delete
+        self._lock = threading.Lock()
+
+    def _record(self, path, changed):
+        result = current_task()
+        if result is not None:
+            (result.written if changed else result.unchanged).append(path)
+        return changed
+
+    def _stage(self, path, entry):
+        with self._lock:
+            previous = self.staged.pop(path, None)
+            if entry is not None:
+                self.staged[path] = entry
+        if previous is not None:
+            self._drop(previous)
+
+    def _drop(self, entry):
+        try:
+            os.remove(entry[0])
+        except FileNotFoundError:
+            pass
+
+    def _contents(self, entry):
+        with open(entry[0], "rb") as f:
+            return f.read()
+
+    def _temp_file(self, path):
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = create_temp_file(path)
+        # Replacing a file keeps its mode
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        return fd, temp_path
+
+    def write(self, path, data):
+        """Stage bytes for ``path``; returns True if they differ from the file on disk"""
+        digest = hashlib.sha256(data).hexdigest()
+        if hash_file(path) == digest:
+            self._stage(path, None)
+            return self._record(path, False)
+        fd, temp_path = self._temp_file(path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._stage(path, (temp_path, digest))
+        return self._record(path, True)
+
+    def write_stream(self, path, chunks, compress=False):
+        """Stage text chunks for ``path`` without holding them in memory (see write_stream_output)"""
+        fd, temp_path = self._temp_file(path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                out = HashingWriter(f)
+                target = gzip.GzipFile(filename="", mode="wb", fileobj=out, mtime=0) if compress else out
+                buffer, size = [], 0
+                for chunk in chunks:
+                    buffer.append(chunk)
+                    size += len(chunk)
+                    if size >= 65536:
+                        target.write("".join(buffer).encode("utf-8"))
+                        buffer, size = [], 0
+                target.write("".join(buffer).encode("utf-8"))
+                if compress:
+                    target.close()
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        digest = out.digest.hexdigest()
+        if hash_file(path) == digest:
+            os.remove(temp_path)
+            self._stage(path, None)
+            return self._record(path, False)
+        self._stage(path, (temp_path, digest))
+        return self._record(path, True)
+
+    def remove(self, path):
+        """Delete ``path`` when the batch is committed"""
+        if os.path.exists(path):
+            with self._lock:
+                previous = self.staged.get(path)
+                self.staged[path] = None
+            if previous is not None:
+                self._drop(previous)
+        else:
+            self._stage(path, None)
+
+    def read(self, path):
+        with self._lock:
+            staged = path in self.staged
+            entry = self.staged.get(path)
+        if staged:
+            return None if entry is None else self._contents(entry)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def digest(self, path):
+        with self._lock:
+            if path in self.staged:
+                entry = self.staged[path]
+                return None if entry is None else entry[1]
+        return hash_file(path)
+
+    def list(self, folder, names):
+        folder = os.path.normpath(folder)
+        names = set(names)
+        with self._lock:
+            for path, entry in self.staged.items():
+                if os.path.dirname(path) != folder:
+                    continue
+                if entry is None:
+                    names.discard(os.path.basename(path))
+                else:
+                    names.add(os.path.basename(path))
+        return names
+
+    def discard(self, paths=None):
+        """Drop staged outputs (all of them by default) without touching their targets"""
+        with self._lock:
+            paths = list(self.staged) if paths is None else [path for path in paths if path in self.staged]
+            entries = [self.staged.pop(path) for path in paths]
+        for entry in entries:
+            if entry is not None:
+                self._drop(entry)
+
+    def commit(self):
+        """Move every staged output into place and fsync the folders that changed"""
+        with self._lock:
+            staged, self.staged = self.staged, {}
+        folders = set()
+        try:
+            while staged:
+                path, entry = staged.popitem()
+                if entry is None:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                else:
+                    os.replace(entry[0], path)
+                folders.add(os.path.dirname(path))
+        finally:
+            for entry in staged.values():
+                if entry is not None:
+                    self._drop(entry)
+        # Make the renames themselves durable (not supported on Windows)
+        for folder in folders:
+            try:
+                fd = os.open(folder, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+# Outcome of one output in a dry run: status is "changed", "unchanged", "new" or "removed"
+OutputChange = namedtuple("OutputChange", ["path", "status", "old_size", "new_size"])
+
+class DryRunWriter(OutputWriter):
+    """OutputWriter that keeps every output in memory and never commits (--dry-run, --diff).
+
+    Each output is compared with the file on disk by hash; later tasks see
+    the pending outputs as if earlier ones had been written.
+    """
+
+    def _drop(self, entry):
+        pass
+
+    def _contents(self, entry):
+        return entry[0]
+
+    def write(self, path, data):
+        digest = hashlib.sha256(data).hexdigest()
+        self._stage(path, (data, digest))
+        return self._record(path, hash_file(path) != digest)
+
+    def write_stream(self, path, chunks, compress=False):
+        data = "".join(chunks).encode("utf-8")
+        if compress:
+            buffer = io.BytesIO()
+            with gzip.GzipFile(filename="", mode="wb", fileobj=buffer, mtime=0) as target:
+                target.write(data)
+            data = buffer.getvalue()
+        return self.write(path, data)
+
+    def commit(self):
+        pass
+
+    @property
+    def outputs(self):
+        """path -> rendered bytes of every output (removals excluded)"""
+        return {path: entry[0] for path, entry in self.staged.items() if entry is not None}
+
+    def changes(self):
+        """OutputChange for every output, sorted by path"""
+        changes = []
+        for path, entry in sorted(self.staged.items()):
+            old_size = os.path.getsize(path) if os.path.exists(path) else None
+            if entry is None:
+                if old_size is not None:
+                    changes.append(OutputChange(path, "removed", old_size, None))
+            elif old_size is None:
+                changes.append(OutputChange(path, "new", None, len(entry[0])))
             else:
-                print(f"⚠️  Warning: Placeholder '{ph}' not found in business data")
-                output_content = output_content.replace(f"{{{{{ph}}}}}", "")
-
-        # Rule 1: Convert <a> tags to <Link> components
-        output_content = re.sub(
-            r'<a\s+([^>]*?)href=["\']([^"\']*)["\']([^>]*?)>([^<]*)</a>',
-            r'<Link href="\2" \1\3>\4</Link>',
-            output_content,
-            flags=re.IGNORECASE | re.DOTALL
+                status = "unchanged" if hash_file(path) == entry[1] else "changed"
+                changes.append(OutputChange(path, status, old_size, len(entry[0])))
+        return changes
+
+# -----------------------------
+# Build manifest
+# -----------------------------
+class KeyRecorder(dict):
+    """Copy of the business data that records which top-level keys are read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.keys_read = set()
+        # The unwrapped business data, for caches keyed on it (route_index)
+        self.source = getattr(data, "source", data)
+
+    def __getitem__(self, key):
+        self.keys_read.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.keys_read.add(key)
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        self.keys_read.add(key)
+        return super().get(key, default)
+
+    def __iter__(self):
+        self.keys_read.update(super().keys())
+        return super().__iter__()
+
+    def keys(self):
+        self.keys_read.update(super().keys())
+        return super().keys()
+
+    def items(self):
+        self.keys_read.update(super().keys())
+        return super().items()
+
+    def values(self):
+        self.keys_read.update(super().keys())
+        return super().values()
+
+def hash_text(text):
+    """SHA-256 hex digest of a string"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_file(path):
+    """SHA-256 hex digest of a file's bytes (None if it does not exist)"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+def fingerprint_inputs(business_data, keys, extra=""):
+    """Hash the business.yaml subtree under ``keys`` plus any extra input"""
+    subtree = {key: business_data.get(key, "__missing__") for key in sorted(keys)}
+    payload = json.dumps([GENERATOR_VERSION, extra, subtree], sort_keys=True, default=str)
+    return hash_text(payload)
+
+class BuildManifest:
+    """Content-hash manifest of the inputs and outputs of every generation task.
+
+    A task is up to date when the business.yaml keys it read last time (plus
+    any extra input such as the template text) hash to the same fingerprint
+    and every file it wrote still has the recorded content.
+    """
+
+    def __init__(self, path, output_root=script_dir):
+        self.path = path
+        self.output_root = output_root
+        self.tasks = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == GENERATOR_VERSION:
+                self.tasks = data.get("tasks", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def is_fresh(self, task, business_data, extra=""):
+        entry = self.tasks.get(task)
+        if not entry or not entry.get("outputs"):
+            return False
+        if entry.get("inputs") != fingerprint_inputs(business_data, entry.get("keys", []), extra):
+            return False
+        return all(
+            hash_file(os.path.join(self.output_root, rel_path)) == digest
+            for rel_path, digest in entry["outputs"].items()
         )
 
-        protected_content = []
-        def protect_and_replace(match):
-            protected_content.append(match.group(0))
-            return f'__PROTECTED_{len(protected_content)-1}__'
-        
-        # Protect HTML tags and JSX expressions
-        output_content = re.sub(r'<[^>]*>|{[^}]*}', protect_and_replace, output_content)
-        
-        # Replace quotes in remaining text
-        output_content = output_content.replace("'", "&apos;")
-        
-        # Restore protected content
-        for i, content in enumerate(protected_content):
-            output_content = output_content.replace(f'__PROTECTED_{i}__', content)
-
-        # Determine output file name and location
-        if file_name.endswith(".mdc.template"):
-            output_name = file_name.replace(".mdc.template", ".mdc")
-            output_file = os.path.join(rules_folder, output_name)
-        elif file_name.endswith(".json.template"):
-            output_name = file_name.replace(".json.template", ".json")
-            output_file = os.path.join(script_dir, "public", output_name)
+    def record(self, task, business_data, keys, outputs, extra=""):
+        entry = {
+            "keys": sorted(keys),
+            "inputs": fingerprint_inputs(business_data, keys, extra),
+            "outputs": {
+                os.path.relpath(path, self.output_root): hash_output(path) for path in outputs
+            },
+        }
+        with self._lock:
+            self.tasks[task] = entry
+
+    def tasks_reading(self, keys):
+        """Names of recorded tasks that read any of the given top-level keys"""
+        keys = set(keys)
+        return {task for task, entry in self.tasks.items() if keys.intersection(entry.get("keys", []))}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            content = json.dumps({"version": GENERATOR_VERSION, "tasks": self.tasks}, indent=2, sort_keys=True)
+        write_output(self.path, content)
+
+# -----------------------------
+# Generation
+# -----------------------------
+def load_templates(folder, cache=None):
+    """Read and compile every template in a folder.
+
+    Returns {file_name: (template_hash, segments)}. Templates whose text is
+    unchanged are taken from ``cache`` instead of being recompiled.
+    """
+    cache = cache or {}
+    templates = {}
+    for file_name in os.listdir(folder):
+        if not file_name.endswith(".template"):
+            continue
+        with open(os.path.join(folder, file_name), "r", encoding="utf-8") as f:
+            template = f.read()
+        template_hash = hash_text(template)
+        cached = cache.get(file_name)
+        if cached and cached[0] == template_hash:
+            templates[file_name] = cached
+        else:
+            templates[file_name] = (template_hash, compile_template(template))
+    return templates
+
+def template_output_path(file_name, output_root=script_dir):
+    """Determine output file name and location for a template"""
+    if file_name.endswith(".mdc.template"):
+        output_name = file_name.replace(".mdc.template", ".mdc")
+        return os.path.join(output_root, RULES_DIR, output_name)
+    elif file_name.endswith(".json.template"):
+        output_name = file_name.replace(".json.template", ".json")
+        return os.path.join(output_root, "public", output_name)
+    else:
+        output_name = file_name.replace(".template", ".mdc")
+        return os.path.join(output_root, RULES_DIR, output_name)
+
+# -----------------------------
+# Template post-processing pipeline
+# -----------------------------
+LINK_PATTERN = re.compile(r'<a\s+([^>]*?)href=["\']([^"\']*)["\']([^>]*?)>([^<]*)</a>', re.IGNORECASE | re.DOTALL)
+LINK_REPLACEMENT = r'<Link href="\2" \1\3>\4</Link>'
+
+def rewrite_links(content):
+    """Rule 1: Convert <a> tags to <Link> components"""
+    return LINK_PATTERN.sub(LINK_REPLACEMENT, content)
+
+# Characters that open a protected region, and the character closing each
+TAG_OPEN_PATTERN = re.compile(r"[<{]")
+TAG_CLOSERS = {"<": ">", "{": "}"}
+
+def escape_apostrophes(content):
+    """Rule 2: Escape apostrophes as &apos; outside HTML tags and JSX expressions
+
+    Single pass: text is escaped as it is copied, while a tag (<...>) or
+    JSX expression ({...}) is copied verbatim up to its first closing
+    character. An opener with no closer anywhere after it is plain text.
+    """
+    last_close = {opener: content.rfind(closer) for opener, closer in TAG_CLOSERS.items()}
+    pieces = []
+    text_start = 0
+    match = TAG_OPEN_PATTERN.search(content)
+    while match:
+        start = match.start()
+        opener = match.group()
+        if start < last_close[opener]:
+            end = content.index(TAG_CLOSERS[opener], start + 1) + 1
+            pieces.append(content[text_start:start].replace("'", "&apos;"))
+            pieces.append(content[start:end])
+            text_start = end
+            match = TAG_OPEN_PATTERN.search(content, end)
         else:
-            output_name = file_name.replace(".template", ".mdc")
-            output_file = os.path.join(rules_folder, output_name)
+            match = TAG_OPEN_PATTERN.search(content, start + 1)
+    pieces.append(content[text_start:].replace("'", "&apos;"))
+    return "".join(pieces)
+
+def validate_json(content, output_file):
+    """Warn when a rendered .json output does not parse"""
+    try:
+        json.loads(content)
+    except json.JSONDecodeError as e:
+        warn(f"{output_file} is INVALID JSON: {e}")
+    return content
+
+# One template being rendered: its compiled segments, the shared placeholder
+# context and the path it renders to
+RenderJob = namedtuple("RenderJob", ["segments", "context", "output_file"])
+
+# A named post-processing step; ``run(content, job)`` returns the new content.
+# ``extensions`` limits the stage to outputs with those suffixes (None = all).
+# A ``seed`` stage builds the document from ``job.segments`` and is passed
+# None, so the raw template text is only assembled when no seed stage runs.
+Stage = namedtuple("Stage", ["name", "run", "extensions", "seed"], defaults=(None, False))
+
+def template_source(segments):
+    """Reassemble the raw template text from its compiled segments"""
+    return "".join(segment if i % 2 == 0 else "{{" + segment + "}}" for i, segment in enumerate(segments))
+
+def resolve_placeholders(content, job):
+    # Resolve each distinct placeholder once, then emit the output in one join
+    lookup = build_placeholder_lookup(job.segments, job.context)
+    return render_template(job.segments, lookup)
+
+DEFAULT_STAGES = (
+    Stage("placeholder-resolve", resolve_placeholders, seed=True),
+    Stage("link-rewrite", lambda content, job: rewrite_links(content)),
+    Stage("apostrophe-escape", lambda content, job: escape_apostrophes(content)),
+    Stage("json-validate", lambda content, job: validate_json(content, job.output_file), (".json",)),
+)
+
+def record_stage_timing(stage, job, elapsed, bytes_in, bytes_out):
+    """Default pipeline hook: keep per-stage timings on the running task"""
+    result = current_task()
+    if result is not None:
+        result.stages.append(StageTiming(stage, job.output_file, elapsed, bytes_in, bytes_out))
+
+class Pipeline:
+    """Ordered post-processing stages applied to each rendered template.
+
+    ``disabled`` maps an output extension such as ".json" (or "*" for every
+    output) to the stage names to skip for it. Each hook is called after
+    every stage as ``hook(stage_name, job, elapsed, bytes_in, bytes_out)``.
+    """
+
+    def __init__(self, stages=DEFAULT_STAGES, disabled=None, hooks=(record_stage_timing,)):
+        self.stages = tuple(stages)
+        self.disabled = {ext: set(names) for ext, names in (disabled or {}).items()}
+        self.hooks = list(hooks)
+        known = {stage.name for stage in self.stages}
+        unknown = {name for names in self.disabled.values() for name in names} - known
+        if unknown:
+            raise ValueError(f"Unknown pipeline stage(s): {', '.join(sorted(unknown))}")
+
+    def skipped_for(self, output_file):
+        skipped = set()
+        for ext, names in self.disabled.items():
+            if ext == "*" or output_file.endswith(ext):
+                skipped |= names
+        return skipped
+
+    def stages_for(self, output_file):
+        skipped = self.skipped_for(output_file)
+        return [
+            stage for stage in self.stages
+            if stage.name not in skipped and (stage.extensions is None or output_file.endswith(tuple(stage.extensions)))
+        ]
+
+    def signature(self, output_file):
+        """Identifies the stages an output goes through; empty for the defaults"""
+        if self.stages == DEFAULT_STAGES and not self.skipped_for(output_file):
+            return ""
+        return "|".join(stage.name for stage in self.stages_for(output_file))
+
+    def run(self, job):
+        content = None    # until a stage has produced the document
+        size = None       # UTF-8 size of content, the next stage's bytes_in
+        for stage in self.stages_for(job.output_file):
+            if stage.seed:
+                content = size = None
+            elif content is None:
+                # No seed stage ran (e.g. --skip-stage placeholder-resolve)
+                content = template_source(job.segments)
+            started = time.perf_counter()
+            new_content = stage.run(content, job)
+            elapsed = time.perf_counter() - started
+            if self.hooks:
+                if content is None:
+                    bytes_in = sum(len(segment.encode("utf-8")) for segment in job.segments)
+                else:
+                    bytes_in = size if size is not None else len(content.encode("utf-8"))
+                size = len(new_content.encode("utf-8"))
+                for hook in self.hooks:
+                    hook(stage.name, job, elapsed, bytes_in, size)
+            content = new_content
+        return template_source(job.segments) if content is None else content
+
+DEFAULT_PIPELINE = Pipeline()
+
+def parse_skip_stages(specs):
+    """Turn --skip-stage values (STAGE or STAGE:EXT) into Pipeline(disabled=...)"""
+    disabled = {}
+    for spec in specs or ():
+        name, _, ext = spec.partition(":")
+        if ext and not ext.startswith("."):
+            ext = "." + ext
+        disabled.setdefault(ext or "*", set()).add(name)
+    return disabled
+
+def render_template_output(segments, context, output_file="", pipeline=None):
+    """Render a compiled template and apply the JSX post-processing rules"""
+    return (pipeline or DEFAULT_PIPELINE).run(RenderJob(segments, context, output_file))
 
-        # Write output
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(output_content)
+# -----------------------------
+# Template and data tasks
+# -----------------------------
+def process_template(file_name, template_hash, segments, business_data, context, manifest, force=False,
+                     output_root=script_dir, pipeline=None):
+    """Render one template unless its output is already up to date.
+
+    Returns "generated" or "up-to-date"; errors propagate to the task runner.
+    """
+    pipeline = pipeline or DEFAULT_PIPELINE
+    task = f"template:{file_name}"
+    output_file = template_output_path(file_name, output_root)
+    # Changing which stages run changes the output, so it is part of the fingerprint
+    signature = pipeline.signature(output_file)
+    extra = f"{template_hash}|{signature}" if signature else template_hash
+    if not force and manifest.is_fresh(task, business_data, extra):
+        return "up-to-date"
+
+    # Render, post-process and validate in memory
+    output_content = render_template_output(segments, context, output_file, pipeline)
+
+    # Write output (skipped when the file already has this content)
+    write_output(output_file, output_content)
+
+    result = current_task()
+    manifest.record(task, business_data, context.keys_read(segments[1::2]),
+                    result.written + result.unchanged, extra)
+    return "generated"
+
+def hash_inputs(paths):
+    """Fingerprint of input files other than business.yaml (missing files included)"""
+    return hash_text("\n".join(f"{path}:{hash_output(path)}" for path in paths))
+
+def run_data_generator(name, generator, business_data, manifest, force=False, output_root=script_dir,
+                       inputs=()):
+    """Run one data generator unless its outputs are already up to date.
+
+    ``inputs`` lists files besides business.yaml the generator reads.
+    Returns "generated", "up-to-date" or "skipped" (the generator returned
+    "skipped" because it has nothing to write, so it is not recorded and
+    decides again next run); errors propagate to the task runner.
+    """
+    extra = hash_inputs(inputs) if inputs else ""
+    if not force and manifest.is_fresh(name, business_data, extra):
+        return "up-to-date"
+    recorder = KeyRecorder(business_data)
+    if generator(recorder, output_root) == "skipped":
+        return "skipped"
+    result = current_task()
+    manifest.record(name, business_data, recorder.keys_read, result.written + result.unchanged, extra)
+    return "generated"
+
+# SKIP: Blog posts are maintained manually (generate_blog_posts)
+DATA_GENERATORS = [
+    ("ai-scrape-data.json", generate_ai_scrape_data),
+    ("faq.json", generate_faqs),
+    ("review-summary.json", generate_reviews),
+    ("portfolio.json", generate_portfolio),
+    ("business-config.ts", generate_business_config),
+    ("seo-config.ts", generate_seo_config),
+    ("route-map.json", generate_route_map),
+    ("sitemap.xml", generate_sitemap),
+    ("search-index.ts", generate_search_index),
+    ("chat-index.json", generate_chat_index),
+    ("structured-data.json", generate_structured_data),
+]
+# Files other than business.yaml that a data generator reads, by output root
+DATA_GENERATOR_INPUTS = {
+    "review-summary.json": review_sources,
+    "portfolio.json": review_sources,
+    "search-index.ts": lambda output_root: (
+        [os.path.join(output_root, name) for name in ("data/faq.json", HOME_FAQ_FILE, SEO_CONFIG_FILE)]
+        + review_sources(output_root) + app_page_files(output_root)),
+    "sitemap.xml": lambda output_root: (
+        app_page_files(output_root) + [os.path.join(output_root, name) for name in DYNAMIC_SITEMAP_FILES]),
+    # The app's page files decide which suggested answers get a link
+    "chat-index.json": lambda output_root: [os.path.join(output_root, "data/faq.json")] + app_page_files(output_root),
+    "structured-data.json": structured_data_inputs,
+}
+# Data generators that read another generator's output
+DATA_GENERATOR_AFTER = {
+    "portfolio.json": ("review-summary.json",),
+    "search-index.ts": ("faq.json", "review-summary.json", "seo-config.ts"),
+    "chat-index.json": ("faq.json",),
+    # Reads the app's config modules once they are regenerated
+    "structured-data.json": ("review-summary.json", "business-config.ts", "seo-config.ts"),
+}
+
+# -----------------------------
+# Precompressed public files
+# -----------------------------
+# Top-level public/ files that get minified and precompressed variants
+PRECOMPRESS_EXTENSIONS = (".json", ".txt", ".xml")
+PRECOMPRESS_MANIFEST = "public/precompressed.json"
+PRECOMPRESS_TASK = "precompress"
+
+def manifest_variants(manifest):
+    """public/ file names of the variants listed in a precompressed.json"""
+    try:
+        entries = json.loads(manifest) if manifest else {}
+    except json.JSONDecodeError:
+        return set()
+    names = set()
+    for entry in entries.values() if isinstance(entries, dict) else ():
+        for variant in (entry.get("variants") or {}).values() if isinstance(entry, dict) else ():
+            name = variant.get("path", "").lstrip("/") if isinstance(variant, dict) else ""
+            # Variants are always top-level siblings; never follow anything else
+            if name and "/" not in name and "\\" not in name and name not in (".", ".."):
+                names.add(name)
+    return names
+
+def etag(data):
+    """Strong ETag for a file's bytes"""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
 
-        # Validate JSON if it's a JSON file
-        if output_file.endswith('.json'):
+def gzip_bytes(data):
+    # Fixed mtime and no file name, so equal input gives equal bytes
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def precompress_public(output_root=script_dir):
+    """Write .min.json, .gz and .br variants of public JSON/text files and their ETag manifest.
+
+    JSON files get a minified sibling (name.min.json), and the served body
+    (minified JSON, or the file itself for text and XML) gets .gz and, when
+    the brotli package is installed, .br siblings. public/precompressed.json
+    maps each file's URL to the size and ETag of every variant, so server.js
+    can serve one without compressing or hashing per request. Variants the
+    previous manifest listed that this pass no longer writes (the source was
+    removed or renamed, or brotli is no longer installed) are deleted; files
+    the manifest never listed are left alone.
+    """
+    public_folder = os.path.join(output_root, "public")
+    manifest_path = os.path.join(output_root, PRECOMPRESS_MANIFEST)
+    previous = manifest_variants(read_output(manifest_path))
+    if brotli is None:
+        warn("brotli is not installed, skipping .br variants (pip install brotli)")
+
+    entries = {}
+    variants = set()
+    for file_name in list_outputs(public_folder):
+        path = os.path.join(public_folder, file_name)
+        if (not file_name.endswith(PRECOMPRESS_EXTENSIONS)
+                or file_name.endswith(".min.json") or path == manifest_path):
+            continue
+        original = read_output(path)
+        if original is None:    # a folder, or removed by this run
+            continue
+        entry = {"etag": etag(original), "size": len(original), "variants": {}}
+
+        body, body_name = original, file_name
+        if file_name.endswith(".json"):
             try:
-                with open(output_file, "r", encoding="utf-8") as f:
-                    json.load(f)
-                print(f"✅ Generated: {output_file} (valid JSON)")
+                document = json.loads(original)
             except json.JSONDecodeError as e:
-                print(f"❌ Generated: {output_file} (INVALID JSON: {e})")
-        else:
-            print(f"✅ Generated: {output_file}")
-        templates_processed += 1
-        
+                warn(f"{path} is INVALID JSON, not minified: {e}")
+            else:
+                body = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                body_name = file_name[:-len(".json")] + ".min.json"
+                write_bytes_output(os.path.join(public_folder, body_name), body)
+                variants.add(body_name)
+                entry["variants"]["min"] = {"path": f"/{body_name}", "etag": etag(body), "size": len(body)}
+
+        encodings = [("gzip", ".gz", gzip_bytes)]
+        if brotli is not None:
+            encodings.append(("br", ".br", lambda data: brotli.compress(data, quality=11)))
+        for encoding, suffix, compress in encodings:
+            compressed = compress(body)
+            write_bytes_output(os.path.join(public_folder, body_name + suffix), compressed)
+            variants.add(body_name + suffix)
+            entry["variants"][encoding] = {"path": f"/{body_name}{suffix}", "etag": etag(compressed), "size": len(compressed)}
+        entries[f"/{file_name}"] = entry
+
+    for file_name in sorted(previous - variants):
+        remove_output(os.path.join(public_folder, file_name))
+
+    write_output(manifest_path, json.dumps(entries, indent=2))
+    return "generated"
+
+# -----------------------------
+# Task scheduling
+# -----------------------------
+# A unit of generation work: ``run`` returns "generated" or "up-to-date",
+# ``after`` names tasks that must finish first and ``kind`` groups the task
+# in the summary ("template", "public" or "data").
+Task = namedtuple("Task", ["name", "run", "kind", "after"], defaults=((),))
+
+def execute_task(task, writer=None):
+    """Run one task in isolation so a failure never affects other outputs"""
+    result = TaskResult(task.name, task.kind)
+    _current_task.result = result
+    _current_task.writer = writer
+    started = time.perf_counter()
+    try:
+        result.status = task.run()
     except Exception as e:
-        print(f"❌ Error processing {file_name}: {e}")
+        result.status = "failed"
+        result.error = str(e)
+    finally:
+        _current_task.result = None
+        _current_task.writer = None
+        result.elapsed = time.perf_counter() - started
+    return result
+
+def with_dependents(tasks, names):
+    """``names`` plus every task that runs after one of them, transitively"""
+    dependents = {}
+    for task in tasks:
+        for dep in task.after:
+            dependents.setdefault(dep, []).append(task.name)
+    selected = set(names)
+    stack = list(selected)
+    while stack:
+        for name in dependents.get(stack.pop(), ()):
+            if name not in selected:
+                selected.add(name)
+                stack.append(name)
+    return selected
+
+def run_tasks(tasks, jobs=1, writer=None):
+    """Run tasks in dependency order, up to ``jobs`` at a time.
+
+    ``writer`` (e.g. a DryRunWriter) receives every output instead of disk.
+    Returns {task name: TaskResult}.
+    """
+    names = {task.name for task in tasks}
+    results = {}
+    pending = {task.name: task for task in tasks}
+
+    def ready():
+        return [task for task in pending.values()
+                if all(dep in results or dep not in names for dep in task.after)]
+
+    if jobs == 1:
+        while pending:
+            runnable = ready()
+            if not runnable:
+                raise RuntimeError(f"Dependency cycle between tasks: {', '.join(pending)}")
+            task = runnable[0]
+            del pending[task.name]
+            results[task.name] = execute_task(task, writer)
+        return results
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for task in ready():
+                running[pool.submit(execute_task, task, writer)] = task.name
+                del pending[task.name]
+            if not running:
+                raise RuntimeError(f"Dependency cycle between tasks: {', '.join(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+def build_tasks(business_data, templates, manifest, force=False, output_root=script_dir, pipeline=None,
+                precompress=False):
+    """Create the task list for templates, robots.txt and data files"""
+    # Derived placeholders are resolved lazily and shared by every template
+    context = PlaceholderContext(business_data)
+
+    tasks = []
+    for file_name, (template_hash, segments) in templates.items():
+        tasks.append(Task(
+            f"template:{file_name}",
+            lambda f=file_name, h=template_hash, s=segments:
+                process_template(f, h, s, business_data, context, manifest, force=force, output_root=output_root,
+                                 pipeline=pipeline),
+            "template",
+        ))
+
+    # Update Public Files
+    tasks.append(Task(
+        "robots.txt",
+        lambda: run_data_generator("robots.txt", update_robots_txt, business_data, manifest, force=force,
+                                   output_root=output_root),
+        "public",
+    ))
+
+    # Generate Data Files from business.yaml
+    for name, generator in DATA_GENERATORS:
+        inputs = DATA_GENERATOR_INPUTS[name](output_root) if name in DATA_GENERATOR_INPUTS else ()
+        tasks.append(Task(
+            name,
+            lambda n=name, g=generator, i=inputs: run_data_generator(n, g, business_data, manifest, force=force,
+                                                                     output_root=output_root, inputs=i),
+            "data",
+            DATA_GENERATOR_AFTER.get(name, ()),
+        ))
+
+    # Precompressed variants of public files, once everything else is written
+    if precompress:
+        tasks.append(Task(PRECOMPRESS_TASK, lambda: precompress_public(output_root), "public",
+                          tuple(task.name for task in tasks)))
+    return tasks
+
+def generate(business, output_root=script_dir, options=None, templates=None, manifest=None):
+    """Generate every output for one site and return a Report.
+
+    ``business`` is the parsed business.yaml or a path to it. ``templates``
+    (from load_templates) and ``manifest`` can be passed in by long-lived
+    callers to reuse compiled templates and the in-memory build manifest.
+    Nothing is printed; warnings, errors and timings are in the Report.
+    """
+    options = options or GenerateOptions()
+    report = Report(output_root)
+    started = time.perf_counter()
+
+    if isinstance(business, str):
+        business = load_business(business)
+        report.timings["load_business"] = time.perf_counter() - started
+
+    if templates is None:
+        folder = options.templates_folder or os.path.join(output_root, TEMPLATES_DIR)
+        if not os.path.isdir(folder):
+            folder = templates_folder
+        if os.path.isdir(folder):
+            stage_started = time.perf_counter()
+            templates = load_templates(folder)
+            report.timings["load_templates"] = time.perf_counter() - stage_started
+        else:
+            report.warnings.append(f"Templates folder not found: {folder}")
+            templates = {}
+
+    if manifest is None:
+        manifest = BuildManifest(os.path.join(output_root, MANIFEST_PATH), output_root)
+
+    # Outputs whose inputs are unchanged since the last run are skipped;
+    # a dry run renders everything, since it checks the files themselves
+    force = options.force or options.dry_run or options.only is not None
+    tasks = build_tasks(business, templates, manifest, force=force, output_root=output_root,
+                        pipeline=options.pipeline, precompress=options.precompress)
+    if options.only is not None:
+        # Tasks reading a selected task's output rerun with it; precompression
+        # always reruns, since any public file may have changed
+        selected = with_dependents(tasks, options.only)
+        tasks = [task for task in tasks if task.name in selected or task.name == PRECOMPRESS_TASK]
+
+    # Outputs are staged and only moved into place once every task has run
+    writer = DryRunWriter() if options.dry_run else OutputWriter()
+    stage_started = time.perf_counter()
+    try:
+        results = run_tasks(tasks, jobs=options.jobs or os.cpu_count() or 1, writer=writer)
+    except BaseException:
+        writer.discard()
+        raise
+    report.tasks = [results[task.name] for task in tasks]
+    report.timings["tasks"] = time.perf_counter() - stage_started
+
+    if options.dry_run:
+        report.changes = writer.changes()
+        report.pending = writer.outputs
+        report.timings["total"] = time.perf_counter() - started
+        return report
+
+    # A failed task keeps its previous outputs rather than a partial set
+    for task in report.failed:
+        writer.discard(task.written)
+        task.written.clear()
+    stage_started = time.perf_counter()
+    try:
+        writer.commit()
+    except OSError as e:
+        report.warnings.append(f"Could not commit generated files: {e}")
+    else:
+        # Cache state (review cursor, sitemap lastmod) follows the committed outputs
+        for task in report.tasks:
+            if task.status == "failed":
+                continue
+            for path, content in task.cache.items():
+                try:
+                    save_cache(path, content)
+                except OSError as e:
+                    report.warnings.append(f"Could not save {path}: {e}")
+    report.timings["commit"] = time.perf_counter() - stage_started
+
+    try:
+        manifest.save()
+    except OSError as e:
+        report.warnings.append(f"Could not save build manifest: {e}")
+
+    report.timings["total"] = time.perf_counter() - started
+    return report
 
 # -----------------------------
-# Update Public Files
+# Report output
 # -----------------------------
-print("\n🤖 Updating robots.txt...")
-try:
-    update_robots_txt(business)
-except Exception as e:
-    print(f"❌ Error updating robots.txt: {e}")
+def print_tasks(report, headers=True):
+    """Print the per-output log of a report"""
+    for warning in report.warnings:
+        print(f"⚠️  Warning: {warning}")
+
+    previous_kind = None
+    for task in report.tasks:
+        if headers and task.kind != previous_kind:
+            if task.kind == "public":
+                print("\n🤖 Updating robots.txt...")
+            elif task.kind == "data":
+                print("\n📊 Generating data files from business.yaml...")
+        previous_kind = task.kind
+
+        label = task.name[len("template:"):] if task.kind == "template" else task.name
+        if task.status == "up-to-date":
+            print(f"⏭️  Up to date: {label}")
+            continue
+        if task.status == "skipped":
+            for warning in task.warnings:
+                print(f"⚠️  Warning: {warning}")
+            print(f"⏭️  Skipped: {label}")
+            continue
+        if task.kind == "template":
+            print(f"🔄 Processing: {label}")
+        for warning in task.warnings:
+            print(f"⚠️  Warning: {warning}")
+        if task.status == "failed":
+            verb = "processing" if task.kind == "template" else "generating"
+            print(f"❌ Error {verb} {label}: {task.error}")
+            continue
+        for path in task.written:
+            print(f"✅ Generated: {path}")
+        for path in task.unchanged:
+            print(f"⏭️  Unchanged: {path}")
+
+def print_summary(stats, output_root=script_dir):
+    """Print the final generation summary"""
+    print("\n" + "="*60)
+    print("📊 GENERATION SUMMARY")
+    print("="*60)
+
+    if stats["templates_processed"] > 0:
+        print(f"\n✅ Templates Processed: {stats['templates_processed']}")
+        print(f"   📁 Rules location: {os.path.join(output_root, RULES_DIR)}")
+        print(f"   📁 Public files location: {os.path.join(output_root, 'public/')}")
+
+    if stats["data_files_generated"] > 0:
+        print(f"\n✅ Data Files Generated: {stats['data_files_generated']}")
+        print(f"   📁 Data location: {os.path.join(output_root, 'data/')}")
+        print(f"   📁 Public location: {os.path.join(output_root, 'public/')}")
+
+    if stats["outputs_up_to_date"] > 0:
+        print(f"\n⏭️  Up to date (skipped): {stats['outputs_up_to_date']}")
+        print("   Run with --force to regenerate everything")
+
+    print("\n💡 All files are now data-driven from business.yaml!")
+    print("   - Update business.yaml to change content")
+    print("   - Re-run this script to regenerate all files")
+    print("\n📝 Manually maintained files (NOT auto-generated):")
+    print("   - data/services.json")
+    print("   - data/cities.json")
+    print("   - data/blog-posts.json")
+    print("\n" + "="*60)
+
+def format_size(size):
+    return "-" if size is None else f"{size / 1024:.1f} KiB"
+
+def print_changes(report, diff=False):
+    """Print the outcome of a dry run, with unified diffs of changed text files if asked"""
+    for warning in report.warnings:
+        print(f"⚠️  Warning: {warning}")
+    for task in report.tasks:
+        for warning in task.warnings:
+            print(f"⚠️  Warning: {warning}")
+        if task.status == "failed":
+            print(f"❌ Error in {task.name}: {task.error}")
+
+    icons = {"changed": "✏️ ", "new": "🆕", "removed": "🗑️ "}
+    for change in report.out_of_date:
+        path = os.path.relpath(change.path, report.output_root)
+        print(f"{icons[change.status]} {change.status:<8} {path}  "
+              f"({format_size(change.old_size)} -> {format_size(change.new_size)})")
+        if not diff or change.status == "removed":
+            continue
+        old = b""
+        if change.status == "changed":
+            with open(change.path, "rb") as f:
+                old = f.read()
+        try:
+            old_lines = old.decode("utf-8").splitlines(keepends=True)
+            new_lines = report.pending[change.path].decode("utf-8").splitlines(keepends=True)
+        except UnicodeDecodeError:
+            print("   Binary files differ")
+            continue
+        sys.stdout.writelines(difflib.unified_diff(old_lines, new_lines, f"a/{path}", f"b/{path}"))
+        if new_lines and not new_lines[-1].endswith("\n"):
+            print()
+
+    unchanged = len(report.changes) - len(report.out_of_date)
+    print("\n" + "="*60)
+    if report.out_of_date:
+        print(f"📝 {len(report.out_of_date)} output(s) out of date, {unchanged} unchanged")
+        print("   Run without --dry-run to write them")
+    else:
+        print(f"✅ All {unchanged} output(s) up to date")
+    print("="*60)
+
+def print_stage_timings(report):
+    """Print where template post-processing time went, slowest stage first"""
+    totals = report.stage_totals
+    if not totals:
+        return
+    print("\n⏱️  Pipeline stages:")
+    for stage, entry in sorted(totals.items(), key=lambda item: item[1]["elapsed"], reverse=True):
+        print(f"   {stage:<20} {entry['elapsed'] * 1000:9.2f} ms  {entry['bytes'] / 1024:9.1f} KiB  ({entry['runs']} output(s))")
 
 # -----------------------------
-# Generate Data Files from business.yaml
+# Watch mode
 # -----------------------------
-print("\n📊 Generating data files from business.yaml...")
-data_files_generated = 0
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
 
-try:
-    generate_ai_scrape_data(business)
-    data_files_generated += 1
-except Exception as e:
-    print(f"❌ Error generating ai-scrape-data.json: {e}")
-
-# SKIP: Blog posts are maintained manually
-# try:
-#     generate_blog_posts(business)
-#     data_files_generated += 1
-# except Exception as e:
-#     print(f"❌ Error generating blog-posts.json: {e}")
+class InotifyWatcher:
+    """Blocks until a file changes in one of the watched directories (Linux only)"""
 
-try:
-    generate_faqs(business)
-    data_files_generated += 1
-except Exception as e:
-    print(f"❌ Error generating faq.json: {e}")
+    def __init__(self, folders):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        for folder in folders:
+            if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
 
-try:
-    generate_portfolio(business)
-    data_files_generated += 1
-except Exception as e:
-    print(f"❌ Error generating portfolio.json: {e}")
+    def wait(self, timeout=None):
+        """Return True once an event arrives (False on timeout)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queue; the caller re-checks file contents itself
+        os.read(self.fd, 64 * (INOTIFY_EVENT.size + 256))
+        return True
 
-try:
-    generate_business_config(business)
-    data_files_generated += 1
-except Exception as e:
-    print(f"❌ Error generating business-config.ts: {e}")
+class PollingWatcher:
+    """Portable fallback that compares file mtimes and sizes on an interval"""
 
-try:
-    generate_seo_config(business)
-    data_files_generated += 1
-except Exception as e:
-    print(f"❌ Error generating seo-config.ts: {e}")
-
-# Summary
-print("\n" + "="*60)
-print("📊 GENERATION SUMMARY")
-print("="*60)
-
-if templates_processed > 0:
-    print(f"\n✅ Templates Processed: {templates_processed}")
-    print(f"   📁 Rules location: {rules_folder}")
-    print(f"   📁 Public files location: {os.path.join(script_dir, 'public/')}")
-
-if data_files_generated > 0:
-    print(f"\n✅ Data Files Generated: {data_files_generated}")
-    print(f"   📁 Data location: {os.path.join(script_dir, 'data/')}")
-    print(f"   📁 Public location: {os.path.join(script_dir, 'public/')}")
-
-print("\n💡 All files are now data-driven from business.yaml!")
-print("   - Update business.yaml to change content")
-print("   - Re-run this script to regenerate all files")
-print("\n📝 Manually maintained files (NOT auto-generated):")
-print("   - data/services.json")
-print("   - data/cities.json")
-print("   - data/blog-posts.json")
-print("\n" + "="*60)
\ No newline at end of file
+    def __init__(self, folders, interval=0.1):
+        self.folders = folders
+        self.interval = interval
+        self.snapshot = self._stat_all()
+
+    def _stat_all(self):
+        snapshot = {}
+        for folder in self.folders:
+            for entry in os.scandir(folder):
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Return True once a file changes (False on timeout)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(self.interval)
+            snapshot = self._stat_all()
+            if snapshot != self.snapshot:
+                self.snapshot = snapshot
+                return True
+        return False
+
+def create_watcher(folders):
+    """Use inotify when available, polling otherwise"""
+    try:
+        return InotifyWatcher(folders)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(folders)
+
+def changed_top_level_keys(old, new):
+    """Top-level business.yaml keys whose values differ between two parses"""
+    missing = object()
+    return {key for key in set(old) | set(new) if old.get(key, missing) != new.get(key, missing)}
+
+def watch(business_data, templates, manifest, jobs=1, pipeline=None, precompress=False):
+    """Regenerate only the outputs affected by each business.yaml or template edit.
+
+    The parsed YAML and compiled templates stay in memory; after a change the
+    top-level keys that differ are matched against the keys each task read
+    last time (from the build manifest), and only those tasks are rerun.
+    """
+    folders = [os.path.dirname(business_file), templates_folder]
+    watcher = create_watcher(folders)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"\n👀 Watching {business_file} and {templates_folder} ({kind}), press Ctrl+C to stop")
+
+    with open(business_file, "rb") as f:
+        business_hash = hashlib.sha256(f.read()).hexdigest()
+
+    while True:
+        if not watcher.wait():
+            continue
+        # Editors often save in several steps; let them settle
+        time.sleep(0.01)
+        started = time.perf_counter()
+        only = set()
+
+        try:
+            with open(business_file, "rb") as f:
+                new_hash = hashlib.sha256(f.read()).hexdigest()
+            if new_hash != business_hash:
+                new_business = load_business(business_file)
+                changed = changed_top_level_keys(business_data, new_business)
+                business_data, business_hash = new_business, new_hash
+                if changed:
+                    print(f"\n📝 business.yaml changed: {', '.join(sorted(changed))}")
+                    only |= manifest.tasks_reading(changed)
+        except Exception as e:
+            print(f"❌ Error loading {business_file}: {e}")
+            continue
+
+        try:
+            new_templates = load_templates(templates_folder, templates)
+        except OSError as e:
+            print(f"❌ Error reading templates: {e}")
+            continue
+        for file_name, (template_hash, _) in new_templates.items():
+            if file_name not in templates or templates[file_name][0] != template_hash:
+                print(f"\n📝 Template changed: {file_name}")
+                only.add(f"template:{file_name}")
+        templates = new_templates
+
+        if not only:
+            continue
+        report = generate(business_data, script_dir, GenerateOptions(only=only, jobs=jobs, pipeline=pipeline,
+                                                          precompress=precompress),
+                          templates=templates, manifest=manifest)
+        print_tasks(report, headers=False)
+        elapsed = (time.perf_counter() - started) * 1000
+        stats = report.stats
+        regenerated = stats["templates_processed"] + stats["data_files_generated"]
+        print(f"⚡ Regenerated {regenerated} output(s) in {elapsed:.1f} ms")
+
+# -----------------------------
+# Multi-tenant batch mode
+# -----------------------------
+def discover_tenants(batch_path):
+    """List (business_yaml, output_root) pairs for a batch run.
+
+    ``batch_path`` is either a directory, where every sub-directory holding a
+    business.yaml is one site (generated in place) and every other *.yaml
+    file ``<name>.yaml`` is generated into ``<name>/``, or a manifest file
+    listing ``{business: ..., output: ...}`` entries relative to itself.
+    Raises OSError when the path cannot be read, and ValueError (or
+    yaml.YAMLError) when the manifest does not parse or is malformed.
+    """
+    tenants = []
+    if os.path.isdir(batch_path):
+        for entry in sorted(os.scandir(batch_path), key=lambda e: e.name):
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "business.yaml")):
+                tenants.append((os.path.join(entry.path, "business.yaml"), entry.path))
+            elif entry.is_file() and entry.name.endswith((".yaml", ".yml")):
+                tenants.append((entry.path, os.path.join(batch_path, os.path.splitext(entry.name)[0])))
+        return tenants
+
+    base_dir = os.path.dirname(os.path.abspath(batch_path))
+    with open(batch_path, "r", encoding="utf-8") as f:
+        data = json.load(f) if batch_path.endswith(".json") else yaml.safe_load(f)
+    if isinstance(data, dict):
+        data = data.get("tenants", [])
+    if not isinstance(data, (list, type(None))):
+        raise ValueError("expected a list of tenants")
+    for item in validated_items(data or [], ("business",), "tenants"):
+        business, output = item["business"], item.get("output", os.path.dirname(str(item["business"])))
+        if not isinstance(business, str) or not isinstance(output, str):
+            raise ValueError(f"tenant {business!r}: business and output must be paths")
+        tenants.append((os.path.join(base_dir, business), os.path.join(base_dir, output)))
+    return tenants
+
+# Templates compiled once by the parent process and shared with every tenant
+_shared_templates = {}
+
+def init_batch_worker(templates):
+    """Process pool initializer: receive the compiled shared templates once per worker"""
+    global _shared_templates
+    _shared_templates = templates
+
+def generate_tenant(business_path, output_root, force=False):
+    """Generate one tenant's outputs.
+
+    A tenant may override the shared templates with its own
+    .cursor/templates/ folder. Returns a Report; a tenant that could not be
+    loaded gets a report with a single failed task.
+    """
+    tenant_templates = os.path.join(output_root, TEMPLATES_DIR)
+    templates = None if os.path.isdir(tenant_templates) else _shared_templates
+    try:
+        return generate(business_path, output_root, GenerateOptions(force=force), templates=templates)
+    except Exception as e:
+        report = Report(output_root)
+        report.tasks.append(TaskResult(business_path, "data", status="failed", error=str(e)))
+        return report
+
+def run_batch(batch_path, jobs=1, force=False):
+    """Generate many sites in one process tree, fanning tenants out across a process pool.
+
+    Returns the number of tenants that failed.
+    """
+    try:
+        tenants = discover_tenants(batch_path)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error reading batch {batch_path}: {e}")
+        return 1
+    if not tenants:
+        print(f"❌ No business YAML files found in {batch_path}")
+        return 1
+
+    templates = load_templates(templates_folder) if os.path.isdir(templates_folder) else {}
+    jobs = jobs or os.cpu_count() or 1
+    print(f"🏢 Generating {len(tenants)} site(s) with {jobs} worker(s)")
+
+    if jobs == 1:
+        init_batch_worker(templates)
+        reports = (generate_tenant(path, root, force) for path, root in tenants)
+        failures = report_batch(reports)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_batch_worker, initargs=(templates,)) as pool:
+            futures = [pool.submit(generate_tenant, path, root, force) for path, root in tenants]
+            failures = report_batch(future.result() for future in futures)
+
+    return failures
+
+def report_batch(reports):
+    """Print each tenant's log as it completes, then the batch summary"""
+    totals = {"templates_processed": 0, "data_files_generated": 0, "outputs_up_to_date": 0, "failed": 0}
+    succeeded = failed = 0
+    for report in reports:
+        print(f"\n📦 {report.output_root}")
+        print_tasks(report)
+        stats = report.stats
+        if stats["failed"]:
+            failed += 1
+        else:
+            succeeded += 1
+        for key, value in stats.items():
+            totals[key] += value
+
+    print("\n" + "="*60)
+    print("📊 BATCH SUMMARY")
+    print("="*60)
+    print(f"\n✅ Sites generated: {succeeded}")
+    if failed:
+        print(f"❌ Sites with errors: {failed}")
+    print(f"   Templates processed: {totals['templates_processed']}")
+    print(f"   Data files generated: {totals['data_files_generated']}")
+    print(f"   Up to date (skipped): {totals['outputs_up_to_date']}")
+    print("\n" + "="*60)
+    return failed
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Generate rules and data files from business.yaml")
+    parser.add_argument("--force", action="store_true",
+                        help="regenerate every output, ignoring the build manifest")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and regenerate affected outputs when business.yaml or a template changes")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="run up to N independent outputs in parallel (0 = one per CPU)")
+    parser.add_argument("--batch", metavar="PATH",
+                        help="generate many sites: a directory of tenant folders/YAML files or a tenant manifest")
+    parser.add_argument("--skip-stage", action="append", metavar="STAGE[:EXT]",
+                        help="skip a template post-processing stage, optionally only for outputs ending in EXT "
+                             f"(stages: {', '.join(stage.name for stage in DEFAULT_STAGES)})")
+    parser.add_argument("--stage-timings", action="store_true",
+                        help="print elapsed time and bytes processed per post-processing stage")
+    parser.add_argument("--precompress", action="store_true",
+                        help="also write minified and .gz/.br variants of public files with an ETag manifest")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="render every output in memory and report which files would change, writing nothing "
+                             "(exits 1 if any output is out of date)")
+    parser.add_argument("--diff", action="store_true",
+                        help="like --dry-run, and print a unified diff of every changed text file")
+    args = parser.parse_args()
+    dry_run = args.dry_run or args.diff
+    if dry_run and (args.watch or args.batch):
+        parser.error("--dry-run/--diff cannot be combined with --watch or --batch")
+
+    try:
+        pipeline = Pipeline(disabled=parse_skip_stages(args.skip_stage))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.batch:
+        sys.exit(1 if run_batch(args.batch, jobs=args.jobs, force=args.force) else 0)
+
+    try:
+        business = load_business(business_file, use_cache=not dry_run)
+        print(f"✅ Loaded business data from {business_file}")
+    except FileNotFoundError:
+        print(f"❌ Error: {business_file} not found!")
+        exit(1)
+    except Exception as e:
+        print(f"❌ Error loading {business_file}: {e}")
+        exit(1)
+
+    # Check if templates folder exists
+    if not os.path.exists(templates_folder):
+        print(f"❌ Templates folder not found: {templates_folder}")
+        print("Please ensure templates are in the correct location.")
+        exit(1)
+
+    print(f"📁 Processing templates from: {templates_folder}")
+
+    manifest = BuildManifest(manifest_file)
+    templates = load_templates(templates_folder)
+
+    report = generate(business, script_dir, GenerateOptions(force=args.force, jobs=args.jobs, pipeline=pipeline,
+                                                          precompress=args.precompress, dry_run=dry_run),
+                      templates=templates, manifest=manifest)
+    if dry_run:
+        print_changes(report, diff=args.diff)
+        if args.stage_timings:
+            print_stage_timings(report)
+        sys.exit(1 if report.out_of_date or report.failed else 0)
+
+    print_tasks(report)
+    if args.stage_timings:
+        print_stage_timings(report)
+    print_summary(report.stats)
+
+    if args.watch:
+        try:
+            watch(business, templates, manifest, jobs=args.jobs, pipeline=pipeline, precompress=args.precompress)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+
+if __name__ == "__main__":
+    main()
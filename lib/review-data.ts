@@ -0,0 +1,185 @@
+// AUTO-GENERATED by generate_rules.py from data/reviews/*.csv - do not edit by hand
+
+export interface NormalizedReview {
+  id: string;
+  platform: 'Booking.com' | 'Google';
+  author: string;
+  rating: number;               // out of 10 (Google stars x 2)
+  date: string | null;          // ISO date-time; null for Google
+  dateText?: string;            // e.g. "3 months ago" (Google)
+  title: string;
+  comment: string;
+  negativeComment: string;
+  categories: Record<string, number>;
+  avatar?: string;
+}
+
+export interface ReviewPage {
+  page: number;
+  pages: number;
+  reviews: NormalizedReview[];
+}
+
+export const REVIEW_SUMMARY = {
+  "reviewCount": 68,
+  "ratingValue": 7.99,
+  "bestRating": 10,
+  "worstRating": 1,
+  "positiveCount": 47,
+  "platforms": {
+    "Booking.com": {
+      "reviewCount": 58,
+      "ratingValue": 7.78
+    },
+    "Google": {
+      "reviewCount": 10,
+      "ratingValue": 9.2
+    }
+  },
+  "categories": {
+    "staff": 9.22,
+    "cleanliness": 8.32,
+    "location": 8.28,
+    "facilities": 7.84,
+    "comfort": 7.97,
+    "valueForMoney": 8.45
+  },
+  "distribution": {
+    "10": 28,
+    "9": 7,
+    "8": 12,
+    "7": 6,
+    "6": 5,
+    "5": 4,
+    "4": 1,
+    "3": 1,
+    "2": 1,
+    "1": 3
+  },
+  "displayed": {
+    "total": 40,
+    "Booking.com": 31,
+    "Google": 9
+  },
+  "pageSize": 12,
+  "pages": 4,
+  "aggregateRating": {
+    "@type": "AggregateRating",
+    "ratingValue": "8.0",
+    "reviewCount": 68,
+    "bestRating": "10",
+    "worstRating": "1"
+  }
+};
+
+// Precomputed AggregateRating JSON-LD
+export const AGGREGATE_RATING_SCHEMA = REVIEW_SUMMARY.aggregateRating;
+
+export const RECENT_REVIEWS: NormalizedReview[] = [
+  {
+    "id": "booking:6949779983",
+    "platform": "Booking.com",
+    "author": "Selin",
+    "rating": 10.0,
+    "date": "2025-08-11T14:51:15",
+    "title": "",
+    "comment": "Sød personale hjælpsomme",
+    "negativeComment": "",
+    "categories": {
+      "staff": 10.0,
+      "cleanliness": 10.0,
+      "location": 10.0,
+      "facilities": 10.0,
+      "comfort": 10.0,
+      "valueForMoney": 10.0
+    }
+  },
+  {
+    "id": "booking:5437052964",
+    "platform": "Booking.com",
+    "author": "Bedri",
+    "rating": 8.0,
+    "date": "2025-08-04T14:27:33",
+    "title": "",
+    "comment": "Einfach",
+    "negativeComment": "",
+    "categories": {
+      "staff": 10.0,
+      "cleanliness": 7.5,
+      "location": 7.5,
+      "facilities": 10.0,
+      "comfort": 10.0,
+      "valueForMoney": 10.0
+    }
+  },
+  {
+    "id": "booking:6351271712",
+    "platform": "Booking.com",
+    "author": "Sebastian",
+    "rating": 10.0,
+    "date": "2025-06-21T12:04:39",
+    "title": "",
+    "comment": "Very good and quite location, 10min walk to the center.\nRestaurants, cafes and shops around.\nThe room was big and clean, with a good view.,good wifi,\nbig TV and  netflix.  Helpfull and very friendly stuff.\nWith date of 06/2025  the location on maps.me was not correct. \nI need to search a bit, after short phone call they picked me up from the street.\nGoogle maps has the correct location.",
+    "negativeComment": "",
+    "categories": {
+      "staff": 10.0,
+      "cleanliness": 10.0,
+      "location": 7.5,
+      "facilities": 10.0,
+      "comfort": 10.0,
+      "valueForMoney": 10.0
+    }
+  },
+  {
+    "id": "booking:4980358144",
+    "platform": "Booking.com",
+    "author": "Gülay",
+    "rating": 9.0,
+    "date": "2025-05-21T12:03:05",
+    "title": "",
+    "comment": "çalışanları çok ilgili ve güvenlik açısından hiçbir endişemiz yoktur",
+    "negativeComment": "",
+    "categories": {
+      "staff": 10.0,
+      "cleanliness": 10.0,
+      "location": 10.0,
+      "facilities": 10.0,
+      "comfort": 10.0,
+      "valueForMoney": 7.5
+    }
+  },
+  {
+    "id": "booking:4881433587",
+    "platform": "Booking.com",
+    "author": "Micco",
+    "rating": 8.0,
+    "date": "2025-05-16T00:21:45",
+    "title": "",
+    "comment": "Hyvä sijainti ja pysäköinti moottoripyörälle. Ystävällinen henkilökunta ja huone ihan ok.",
+    "negativeComment": "",
+    "categories": {
+      "staff": 10.0,
+      "cleanliness": 7.5,
+      "location": 10.0,
+      "facilities": 7.5,
+      "comfort": 7.5,
+      "valueForMoney": 10.0
+    }
+  }
+];
+
+const pageCache = new Map<number, Promise<ReviewPage>>();
+
+/**
+ * One page of displayed reviews, newest first (1-based).
+ * Loads only that page's JSON; returns null past the last page.
+ */
+export async function getReviewPage(page: number): Promise<ReviewPage | null> {
+  if (!Number.isInteger(page) || page < 1 || page > REVIEW_SUMMARY.pages) return null;
+  let pending = pageCache.get(page);
+  if (!pending) {
+    pending = import(`../data/review-pages/page-${page}.json`).then((module) => module.default as ReviewPage);
+    pageCache.set(page, pending);
+  }
+  return pending;
+}
@@ -0,0 +1,108 @@
+// AUTO-GENERATED by generate_rules.py from business.yaml - do not edit by hand
+
+export const SEARCH_SHARDS = 2;
+
+export interface SearchDoc {
+  kind: 'service' | 'location' | 'faq' | 'blog' | 'review' | 'policy' | 'room';
+  title: string;
+  url: string;
+  snippet: string;
+}
+
+export interface SearchResult extends SearchDoc {
+  score: number;
+}
+
+interface SearchShard {
+  terms: Record<string, [number, number][]>;   // term -> [doc, weight] pairs
+  prefixes: Record<string, string[]>;         // prefix -> most common completions
+}
+
+const STOPWORDS = new Set(["a", "an", "and", "are", "as", "at", "be", "by", "dhe", "for", "from", "has", "have", "in", "is", "it", "me", "ne", "of", "on", "or", "our", "per", "qe", "te", "the", "to", "we", "with", "you", "your"]);
+const FOLD_TABLE: Record<string, string> = {"ı": "i", "ß": "ss", "æ": "ae", "ø": "o", "œ": "oe", "đ": "d", "ł": "l"};
+const PREFIX_MIN = 2;
+
+let docsPending: Promise<SearchDoc[]> | null = null;
+const shardCache = new Map<number, Promise<SearchShard>>();
+
+// Must match fold_text() in generate_rules.py
+export function foldText(text: string): string {
+  return text
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(/[ıßæøœđł]/g, (ch) => FOLD_TABLE[ch]);
+}
+
+export function searchTokens(text: string): string[] {
+  return (foldText(text).match(/[\p{L}\p{N}]+/gu) || []).filter(
+    (token) => !STOPWORDS.has(token) && (token.length > 1 || /^\d$/.test(token))
+  );
+}
+
+// FNV-1a over UTF-16 code units; must match route_shard() in generate_rules.py
+function termShard(term: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < term.length; i++) {
+    hash ^= term.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193) >>> 0;
+  }
+  return hash % SEARCH_SHARDS;
+}
+
+function loadDocs(): Promise<SearchDoc[]> {
+  if (!docsPending) {
+    docsPending = import('../data/search/docs.json').then((module) => module.default.docs as SearchDoc[]);
+  }
+  return docsPending;
+}
+
+function loadShard(shard: number): Promise<SearchShard> {
+  let pending = shardCache.get(shard);
+  if (!pending) {
+    pending = import(`../data/search/terms-${shard}.json`).then((module) => module.default as SearchShard);
+    shardCache.set(shard, pending);
+  }
+  return pending;
+}
+
+async function postings(term: string): Promise<[number, number][]> {
+  return (await loadShard(termShard(term))).terms[term] || [];
+}
+
+/** Autocomplete: the most common indexed terms starting with the last word of ``query``. */
+export async function suggest(query: string): Promise<string[]> {
+  const tokens = searchTokens(query);
+  const prefix = tokens[tokens.length - 1];
+  if (!prefix || prefix.length < PREFIX_MIN) return [];
+  return (await loadShard(termShard(prefix))).prefixes[prefix] || [];
+}
+
+/**
+ * Ranked results for ``query``; the last word also matches as a prefix.
+ * Each term costs one shard lookup, weighted by inverse document frequency.
+ */
+export async function search(query: string, limit = 10): Promise<SearchResult[]> {
+  const tokens = searchTokens(query);
+  if (!tokens.length) return [];
+  const docs = await loadDocs();
+  const scores = new Map<number, number>();
+  const addTerm = async (term: string, boost: number) => {
+    const list = await postings(term);
+    if (!list.length) return;
+    const idf = Math.log(1 + docs.length / list.length);
+    for (const [doc, weight] of list) {
+      scores.set(doc, (scores.get(doc) || 0) + weight * idf * boost);
+    }
+  };
+
+  const last = tokens.pop() as string;
+  await Promise.all(tokens.map((term) => addTerm(term, 1)));
+  const completions = last.length >= PREFIX_MIN ? await suggest(last) : [];
+  const lastTerms = completions.includes(last) ? completions : [last, ...completions];
+  await Promise.all(lastTerms.map((term) => addTerm(term, term === last ? 1 : 0.5)));
+
+  return Array.from(scores, ([doc, score]) => ({ ...docs[doc], score }))
+    .sort((a, b) => b.score - a.score)
+    .slice(0, limit);
+}
@@ -0,0 +1,18 @@
+// AUTO-GENERATED by generate_rules.py from business.yaml - do not edit by hand
+import structuredData from '../data/structured-data.json';
+
+// Route -> minified JSON-LD array, already safe to inline in a <script> tag
+const payloads: Record<string, string> = structuredData;
+
+function normalizeRoute(pathname: string): string {
+  const trimmed = pathname.replace(/^\/+|\/+$/g, '');
+  return trimmed ? `/${trimmed}/` : '/';
+}
+
+/**
+ * Pre-serialized JSON-LD for a route (undefined for routes without structured data).
+ * Use as: <script type="application/ld+json" dangerouslySetInnerHTML={{ __html: json }} />
+ */
+export function getStructuredData(pathname: string): string | undefined {
+  return payloads[normalizeRoute(pathname)];
+}
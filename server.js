@@ -1,6 +1,8 @@
   // Load environment variables from .env.local
   require('dotenv').config({ path: '.env.local' });
 
+  const fs = require('fs');
+  const path = require('path');
   const { createServer } = require('http');
   const { parse } = require('url');
   const next = require('next');
@@ -56,6 +58,72 @@
     }
   }
 
+  // Precompressed public files: `python generate_rules.py --precompress` writes
+  // .min.json/.gz/.br variants and public/precompressed.json, which lists the
+  // size and ETag of each. The manifest is read once at startup.
+  const publicDir = path.join(__dirname, 'public');
+  let precompressed = {};
+  try {
+    precompressed = JSON.parse(fs.readFileSync(path.join(publicDir, 'precompressed.json'), 'utf8'));
+  } catch (error) {
+    if (error.code !== 'ENOENT') console.error('Ignoring public/precompressed.json:', error.message);
+  }
+
+  const CONTENT_TYPES = {
+    '.json': 'application/json; charset=utf-8',
+    '.txt': 'text/plain; charset=utf-8',
+    '.xml': 'application/xml; charset=utf-8',
+  };
+
+  // Encodings the client accepts, e.g. "gzip, br;q=0.8, *;q=0"
+  function acceptedEncodings(header) {
+    const accepted = new Set();
+    for (const part of (header || '').split(',')) {
+      const [name, ...params] = part.trim().toLowerCase().split(';');
+      const q = params.map((param) => param.trim()).find((param) => param.startsWith('q='));
+      if (name && (!q || parseFloat(q.slice(2)) > 0)) accepted.add(name);
+    }
+    return accepted;
+  }
+
+  // Serve a file listed in the manifest in the best accepted encoding;
+  // returns false to let Next.js handle the request instead
+  function servePrecompressed(req, res, pathname) {
+    const entry = Object.prototype.hasOwnProperty.call(precompressed, pathname) ? precompressed[pathname] : null;
+    if (!entry || (req.method !== 'GET' && req.method !== 'HEAD')) return false;
+
+    const accepted = acceptedEncodings(req.headers['accept-encoding']);
+    const encoding = ['br', 'gzip'].find((name) => entry.variants[name] && accepted.has(name));
+    const variant = encoding
+      ? entry.variants[encoding]
+      : entry.variants.min || { path: pathname, etag: entry.etag, size: entry.size };
+    const file = path.join(publicDir, variant.path);
+    if (path.dirname(file) !== publicDir || !fs.existsSync(file)) return false;
+
+    res.setHeader('Content-Type', CONTENT_TYPES[path.extname(pathname)] || 'application/octet-stream');
+    res.setHeader('Vary', 'Accept-Encoding');
+    res.setHeader('ETag', variant.etag);
+    res.setHeader('Cache-Control', 'public, max-age=0');
+    if (encoding) res.setHeader('Content-Encoding', encoding);
+    if (req.headers['if-none-match'] === variant.etag) {
+      res.statusCode = 304;
+      res.end();
+      return true;
+    }
+    res.setHeader('Content-Length', variant.size);
+    if (req.method === 'HEAD') {
+      res.end();
+      return true;
+    }
+    fs.createReadStream(file)
+      .on('error', (error) => {
+        console.error('Error serving', file, error);
+        res.destroy(error);
+      })
+      .pipe(res);
+    return true;
+  }
+
   app.prepare().then(async () => {
     // Initialize MySQL database
     await initDatabase();
@@ -63,6 +131,7 @@
     const server = createServer(async (req, res) => {
       try {
         const parsedUrl = parse(req.url, true);
+        if (servePrecompressed(req, res, parsedUrl.pathname)) return;
         await handle(req, res, parsedUrl);
       } catch (err) {
         console.error('Error occurred handling', req.url, err);
@@ -0,0 +1,47 @@
+// AUTO-GENERATED by generate_rules.py from business.yaml - do not edit by hand
+const index = require('./chat-index.json');
+
+// Answers scoring below this, or below RELATIVE_SCORE x the best match, are too weak to suggest
+const MIN_SCORE = 1.2;
+const RELATIVE_SCORE = 0.5;
+
+const { k1, b, avgDocLength, docs, docLengths, idf, postings } = index;
+const stopwords = new Set(index.tokenizer.stopwords);
+const foldTable = index.tokenizer.fold;
+const foldPattern = new RegExp(`[${Object.keys(foldTable).join('')}]`, 'g');
+// Per-document part of the BM25 denominator, computed once at startup
+const lengthNorms = docLengths.map((length) => k1 * (1 - b + (b * length) / (avgDocLength || 1)));
+
+// Must match search_tokens()/chat_tokens() in generate_rules.py
+function tokenize(text) {
+  const folded = text
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(foldPattern, (ch) => foldTable[ch]);
+  return (folded.match(/[\p{L}\p{N}]+/gu) || []).filter(
+    (token) => !stopwords.has(token) && (token.length > 1 || /^\d$/.test(token))
+  );
+}
+
+/**
+ * Best matching answers for a guest message, highest BM25 score first.
+ * Each query term is one postings lookup; no I/O after startup.
+ */
+function suggestAnswers(message, limit = 3, minScore = MIN_SCORE) {
+  const scores = new Map();
+  for (const term of new Set(tokenize(message || ''))) {
+    const entries = postings[term];
+    if (!entries) continue;
+    for (const [doc, tf] of entries) {
+      const score = (idf[term] * tf * (k1 + 1)) / (tf + lengthNorms[doc]);
+      scores.set(doc, (scores.get(doc) || 0) + score);
+    }
+  }
+  const answers = Array.from(scores, ([doc, score]) => ({ ...docs[doc], score }))
+    .sort((x, y) => y.score - x.score);
+  const cutoff = Math.max(minScore, answers.length ? answers[0].score * RELATIVE_SCORE : 0);
+  return answers.filter((answer) => answer.score >= cutoff).slice(0, limit);
+}
+
+module.exports = { suggestAnswers, tokenize };
@@ -2,6 +2,7 @@ require('dotenv').config();
 const { createServer } = require('http');
 const { Server } = require('socket.io');
 const mysql = require('mysql2/promise');
+const { suggestAnswers } = require('./chat-retrieval');
 
 const PORT = process.env.PORT || 8080;
 
@@ -185,6 +186,14 @@ io.on('connection', (socket) => {
       io.to('staff-room').emit('message', newMessage);
       console.log(`[SERVER] Emitted to staff-room`);
     }
+
+    // Suggest answers from the generated FAQ/policy index while guests wait for staff
+    if (!isStaff) {
+      const answers = suggestAnswers(message);
+      if (answers.length) {
+        socket.emit('suggested-answers', { message, answers });
+      }
+    }
   });
 
   // Handle typing indicator
@@ -0,0 +1,28 @@
+"""--batch tenant discovery"""
+import os
+
+import generate_rules as g
+
+
+def test_manifest_paths_are_relative_to_it(tmp_path):
+    manifest = tmp_path / "sites.yaml"
+    manifest.write_text("tenants:\n  - business: a/business.yaml\n  - business: b.yaml\n    output: out/b\n")
+    assert g.discover_tenants(str(manifest)) == [
+        (os.path.join(tmp_path, "a/business.yaml"), os.path.join(tmp_path, "a")),
+        (os.path.join(tmp_path, "b.yaml"), os.path.join(tmp_path, "out/b")),
+    ]
+
+
+def test_unreadable_batch_is_reported(tmp_path, capsys):
+    bad = {
+        "missing.yaml": None,
+        "broken.yaml": "tenants: [\n",
+        "broken.json": '{"tenants": [',
+        "no-business.yaml": "- output: x\n",
+        "not-a-list.yaml": "tenants: 5\n",
+    }
+    for name, content in bad.items():
+        if content is not None:
+            (tmp_path / name).write_text(content)
+        assert g.run_batch(str(tmp_path / name)) == 1
+        assert f"Error reading batch {tmp_path / name}" in capsys.readouterr().out
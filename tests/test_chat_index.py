@@ -0,0 +1,63 @@
+"""Chat suggested-answer index (generate_chat_index)"""
+import os
+
+import generate_rules as g
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_jsx_sections():
+    source = '''
+    const x = useRef<HTMLElement>(null);
+    return (
+      <main>
+        <h1>Ignored</h1>
+        {/* Rules */}
+        <section ref={x as React.RefObject<HTMLElement>} className={`a ${ok ? "b" : "c"}`}>
+          <h2 className="t">House <em>Rules</em></h2>
+          <ul>
+            <li>Quiet hours: <strong>10 PM</strong></li>
+            <li>No pets{" "}allowed</li>
+          </ul>
+          <p>Guests&apos; valuables<br />belong in the safe.</p>
+        </section>
+        <h2>Empty</h2>
+      </main>
+    );
+    '''
+    assert g.jsx_sections(source) == [
+        ("House Rules", ["Quiet hours: 10 PM", "No pets allowed", "Guests' valuables belong in the safe."]),
+        ("Empty", []),
+    ]
+
+
+def test_booking_policies_page_sections():
+    with open(os.path.join(REPO_ROOT, g.BOOKING_POLICIES_PAGE), encoding="utf-8") as f:
+        sections = dict(g.jsx_sections(f.read()))
+    assert "Free cancellation up to 48 hours before arrival" in sections["Cancellation Policy"]
+    assert "Pets are not allowed" in sections["House Rules"]
+
+
+def test_app_routes(tmp_path):
+    for page in ("app/page.tsx", "app/contact/page.tsx", "app/(info)/terms/page.tsx",
+                 "app/rooms/[id]/page.tsx", "app/_lib/page.tsx", "app/api/reviews/route.ts"):
+        (tmp_path / page).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / page).write_text("")
+    assert g.app_routes(str(tmp_path)) == {"/", "/contact/", "/terms/"}
+
+
+def test_suggested_urls_are_app_routes():
+    business = g.load_business(os.path.join(REPO_ROOT, "business.yaml"), use_cache=False)
+    routes = g.app_routes(REPO_ROOT)
+    documents = g.chat_documents(business, [{"question": "Q?", "answer": "A", "id": 1}], [("Rules", ["x"])], routes)
+    urls = {url for _, _, _, url, _ in documents}
+    assert None in urls
+    assert all(g.normalize_route(url) in routes for url in urls if url)
+
+
+def test_chat_faqs_filter():
+    faqs = [{"id": 1, "question": "Where?", "answer": "Here"}, {"id": 4, "question": "Estimates?", "answer": "Free"}]
+    titles = [title for _, title, _, _, _ in g.chat_documents({"CHAT_FAQS": [1]}, faqs)]
+    assert titles == ["Where?"]
+    titles = [title for _, title, _, _, _ in g.chat_documents({}, faqs)]
+    assert titles == ["Where?", "Estimates?"]
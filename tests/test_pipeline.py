@@ -0,0 +1,29 @@
+"""Template post-processing pipeline"""
+import pytest
+
+import generate_rules as g
+
+
+def render(pipeline, template="<p>{{BUSINESS_NAME}}'s</p>"):
+    job = g.RenderJob(g.compile_template(template), g.PlaceholderContext({"BUSINESS_NAME": "Xhema"}), "out.mdc")
+    return pipeline.run(job)
+
+
+def test_default_pipeline_starts_from_segments(monkeypatch):
+    def fail(segments):
+        raise AssertionError("raw template text was assembled")
+    monkeypatch.setattr(g, "template_source", fail)
+    timings = []
+    pipeline = g.Pipeline(hooks=[lambda *args: timings.append(args)])
+    assert render(pipeline) == "<p>Xhema&apos;s</p>"
+    sizes = [(stage, bytes_in, bytes_out) for stage, _, _, bytes_in, bytes_out in timings]
+    assert sizes[0] == ("placeholder-resolve", len("<p>BUSINESS_NAME's</p>"), len("<p>Xhema's</p>"))
+    assert sizes[-1] == ("apostrophe-escape", len("<p>Xhema's</p>"), len("<p>Xhema&apos;s</p>"))
+
+
+@pytest.mark.parametrize("disabled, expected", [
+    ({"*": {"placeholder-resolve"}}, "<p>{{BUSINESS_NAME}}&apos;s</p>"),
+    ({"*": {"placeholder-resolve", "link-rewrite", "apostrophe-escape"}}, "<p>{{BUSINESS_NAME}}'s</p>"),
+])
+def test_skipping_the_seed_stage_uses_the_template_text(disabled, expected):
+    assert render(g.Pipeline(disabled=disabled)) == expected
@@ -0,0 +1,45 @@
+"""Precompressed variants of public/ files"""
+import types
+
+import generate_rules as g
+
+
+def test_orphaned_variants_are_removed(tmp_path):
+    public = tmp_path / "public"
+    public.mkdir()
+    (public / "data.json").write_text('{"a": 1}')
+    g.precompress_public(str(tmp_path))
+    assert (public / "data.min.json").exists()
+    assert (public / "data.min.json.gz").exists()
+
+    (public / "data.json").rename(public / "renamed.json")
+    g.precompress_public(str(tmp_path))
+    names = {path.name for path in public.iterdir()}
+    assert not any(name.startswith("data.") for name in names)
+    assert {"renamed.min.json", "renamed.min.json.gz"} <= names
+
+
+def test_unlisted_files_are_kept(tmp_path):
+    public = tmp_path / "public"
+    public.mkdir()
+    hand_made = {"notes.gz": b"x", "vendor.min.json": b"{}", "feed.xml.gz": b"x", "feed.xml.br": b"x"}
+    for name, data in hand_made.items():
+        (public / name).write_bytes(data)
+    g.precompress_public(str(tmp_path))
+    g.precompress_public(str(tmp_path))
+    for name, data in hand_made.items():
+        assert (public / name).read_bytes() == data
+
+
+def test_br_variants_are_removed_without_brotli(tmp_path, monkeypatch):
+    public = tmp_path / "public"
+    public.mkdir()
+    (public / "robots.txt").write_text("User-agent: *\n")
+    monkeypatch.setattr(g, "brotli", types.SimpleNamespace(compress=lambda data, quality: b"br:" + data))
+    g.precompress_public(str(tmp_path))
+    assert (public / "robots.txt.br").exists()
+
+    monkeypatch.setattr(g, "brotli", None)
+    g.precompress_public(str(tmp_path))
+    assert not (public / "robots.txt.br").exists()
+    assert (public / "robots.txt.gz").exists()
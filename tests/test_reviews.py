@@ -0,0 +1,91 @@
+"""Incremental review ingestion (ReviewSource, generate_reviews)"""
+import os
+import shutil
+
+import pytest
+
+import generate_rules as g
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPORTS = [os.path.join(REPO_ROOT, g.REVIEWS_DIR, name) for name in (g.BOOKING_REVIEWS_FILE, g.GOOGLE_REVIEWS_FILE)]
+OUTPUTS = (g.REVIEW_SUMMARY_PATH, "lib/review-data.ts")
+
+
+def read_outputs(root):
+    files = {path: (root / path).read_bytes() for path in OUTPUTS}
+    pages = root / g.REVIEW_PAGES_DIR
+    for name in sorted(os.listdir(pages)):
+        files[f"{g.REVIEW_PAGES_DIR}/{name}"] = (pages / name).read_bytes()
+    return files
+
+
+def full_rebuild(root):
+    (root / g.REVIEWS_DIR).mkdir(parents=True)
+    for path in EXPORTS:
+        shutil.copy(path, root / g.REVIEWS_DIR)
+    g.generate_reviews({}, str(root))
+    return read_outputs(root)
+
+
+@pytest.fixture(scope="module")
+def expected(tmp_path_factory):
+    return full_rebuild(tmp_path_factory.mktemp("full"))
+
+
+@pytest.mark.parametrize("fraction", [0.0, 0.1, 0.37, 0.5, 0.83, 0.999])
+def test_incremental_matches_full_rebuild(tmp_path, expected, fraction):
+    """Ingest a truncated export (often mid-row), then the whole file"""
+    folder = tmp_path / g.REVIEWS_DIR
+    folder.mkdir(parents=True)
+    for path in EXPORTS:
+        with open(path, "rb") as f:
+            data = f.read()
+        (folder / os.path.basename(path)).write_bytes(data[:int(len(data) * fraction)])
+    g.generate_reviews({}, str(tmp_path))
+    assert (tmp_path / g.REVIEW_CURSOR_PATH).exists()
+
+    for path in EXPORTS:
+        shutil.copy(path, folder)
+    g.generate_reviews({}, str(tmp_path))
+    assert read_outputs(tmp_path) == expected
+
+
+def test_appended_rows_are_read_from_cursor(tmp_path, expected):
+    """Appending in two steps at row boundaries gives the same result as one read"""
+    folder = tmp_path / g.REVIEWS_DIR
+    folder.mkdir(parents=True)
+    for path in EXPORTS:
+        with open(path, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+        target = folder / os.path.basename(path)
+        for end in (len(lines) // 3, 2 * len(lines) // 3, len(lines)):
+            target.write_bytes(b"".join(lines[:end]))
+            g.generate_reviews({}, str(tmp_path))
+    assert read_outputs(tmp_path) == expected
+
+
+def test_rewritten_export_is_read_again(tmp_path, expected):
+    folder = tmp_path / g.REVIEWS_DIR
+    folder.mkdir(parents=True)
+    for path in EXPORTS:
+        (folder / os.path.basename(path)).write_bytes(b"unrelated,header\n1,2\n")
+    g.generate_reviews({}, str(tmp_path))
+    for path in EXPORTS:
+        shutil.copy(path, folder)
+    g.generate_reviews({}, str(tmp_path))
+    assert read_outputs(tmp_path) == expected
+
+
+def test_dry_run_leaves_cursor_alone(tmp_path):
+    full_rebuild(tmp_path)
+    cursor = tmp_path / g.REVIEW_CURSOR_PATH
+    before = cursor.read_bytes()
+    os.remove(tmp_path / g.REVIEWS_DIR / g.GOOGLE_REVIEWS_FILE)
+
+    report = g.generate({}, str(tmp_path), g.GenerateOptions(dry_run=True, only={"review-summary.json"}),
+                        templates={})
+    assert cursor.read_bytes() == before
+    cache_folder = os.path.join(str(tmp_path), g.CACHE_DIR)
+    assert report.changes
+    assert all(not change.path.startswith(cache_folder) for change in report.changes)
+    assert report.out_of_date
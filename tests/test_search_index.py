@@ -0,0 +1,36 @@
+"""Site search index (generate_search_index)"""
+import os
+
+import generate_rules as g
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_results_link_to_app_routes():
+    business = g.load_business(os.path.join(REPO_ROOT, "business.yaml"), use_cache=False)
+    routes = g.app_routes(REPO_ROOT)
+    faqs = [{"question": "Q?", "answer": "A", "id": 1}]
+    reviews = [{"author": "Ana", "platform": "Google", "title": "Great", "comment": "Clean rooms"}]
+    documents = g.search_documents(business, faqs, reviews, g.booking_policies(REPO_ROOT), routes)
+    kinds = {kind for kind, _, _, _ in documents}
+    assert {"review", "policy"} <= kinds
+    assert all(g.normalize_route(url.split("#")[0]) in routes for _, _, url, _ in documents)
+    # Without a route filter the business.yaml service pages are indexed too
+    unfiltered = g.search_documents(business, faqs, reviews)
+    assert any(kind == "service" for kind, _, _, _ in unfiltered)
+
+
+def test_indexes_rendered_faqs_amenities_and_rooms():
+    business = g.load_business(os.path.join(REPO_ROOT, "business.yaml"), use_cache=False)
+    routes = g.app_routes(REPO_ROOT)
+    documents = g.search_documents(business, routes=routes, home_faqs=g.home_faqs(REPO_ROOT),
+                                   amenities=g.amenities(REPO_ROOT), rooms=g.app_rooms(business, REPO_ROOT))
+    by_kind = {}
+    for kind, title, url, _ in documents:
+        by_kind.setdefault(kind, []).append((title, url))
+    assert ("Is parking available?", "/#faq") in by_kind["faq"]
+    assert ("A ka parking të disponueshëm?", "/#faq") in by_kind["faq"]
+    assert ("Free High-Speed WiFi", "/amenities/") in by_kind["service"]
+    assert ("Twin Room 1", "/rooms/twin-room-1/") in by_kind["room"]
+    docs, postings, _ = g.build_search_index(documents)
+    assert any(docs[doc]["kind"] == "room" for doc, _ in postings["jacuzzi"])
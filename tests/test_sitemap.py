@@ -0,0 +1,35 @@
+"""public/sitemap.xml (generate_sitemap)"""
+import generate_rules as g
+
+BUSINESS = {
+    "BUSINESS_NAME": "Test Hotel",
+    "WEBSITE_URL": "https://test.example",
+    "SERVICES": [{"NAME": "Room Service", "URL": "/room-service/"}],
+}
+
+
+def make_app(root, *pages):
+    for page in pages:
+        path = root / "app" / page / "page.tsx"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+def test_only_served_pages_are_listed(tmp_path):
+    make_app(tmp_path, ".", "contact", "rooms")
+    unfiltered = [path for path, _ in g.sitemap_pages(BUSINESS)]
+    assert "/room-service/" in unfiltered
+    assert [path for path, _ in g.sitemap_pages(BUSINESS, g.app_routes(str(tmp_path)))] == ["/", "/contact"]
+
+
+def test_auto_mode_is_skipped_when_the_app_serves_the_sitemap(tmp_path):
+    make_app(tmp_path, ".")
+    (tmp_path / "app/sitemap.ts").write_text("")
+    report = g.generate(BUSINESS, str(tmp_path), g.GenerateOptions(only={"sitemap.xml"}), templates={})
+    assert [(task.name, task.status) for task in report.tasks] == [("sitemap.xml", "skipped")]
+    assert not (tmp_path / "public/sitemap.xml").exists()
+
+    (tmp_path / "app/sitemap.ts").unlink()
+    report = g.generate(BUSINESS, str(tmp_path), g.GenerateOptions(only={"sitemap.xml"}), templates={})
+    assert [(task.name, task.status) for task in report.tasks] == [("sitemap.xml", "generated")]
+    assert "<loc>https://test.example/</loc>" in (tmp_path / "public/sitemap.xml").read_text()
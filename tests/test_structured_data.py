@@ -0,0 +1,34 @@
+"""Pre-rendered JSON-LD (generate_structured_data)"""
+import json
+import os
+
+import generate_rules as g
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_payloads_cover_served_routes(tmp_path):
+    business = g.load_business(os.path.join(REPO_ROOT, "business.yaml"), use_cache=False)
+    routes = g.app_routes(REPO_ROOT)
+    variables = {"siteConfig": {"url": "https://hotelxhema.com", "social": {}}}
+    seo_config = [os.path.join(REPO_ROOT, "lib/seo-config.ts")]
+    rooms = g.read_ts_constant(seo_config, "roomsSEOData", variables)
+    structured = g.build_structured_data(
+        business, {"street": "Main St", "city": "Prishtina", "zip": "10000", "phone": "044", "email": "a@b.c"},
+        rooms=rooms, pages=g.read_ts_constant(seo_config, "seoConfigs", variables),
+        faqs=g.read_ts_constant([os.path.join(REPO_ROOT, "components/FAQSection.tsx")], "faqData"),
+        routes=routes,
+    )
+    assert {"/", "/rooms/", "/contact/", "/booking-policies/"} <= set(structured)
+    assert all(route in routes or route.startswith("/rooms/") for route in structured)
+    assert [schema["@type"] for schema in structured["/"]] == ["Hotel", "FAQPage"]
+    room = structured["/rooms/twin-room-1/"][0]
+    assert room["@type"] == "HotelRoom" and room["containedInPlace"]["email"] == "a@b.c"
+    assert room["offers"]["lowPrice"] == "28" and room["offers"]["highPrice"] == "39"
+    # Only routes in app_routes() get a static page payload
+    assert "/contact/" not in g.build_structured_data(business, {}, routes={"/"})
+
+
+def test_payload_is_safe_to_inline():
+    payload = g.serialize_json_ld([{"name": "</script><b>"}])
+    assert "<" not in payload and json.loads(payload) == [{"name": "</script><b>"}]
@@ -0,0 +1,21 @@
+"""Task selection for --only and watch mode"""
+import generate_rules as g
+
+
+def test_only_pulls_in_dependents(tmp_path):
+    business = {"BUSINESS_NAME": "Test Hotel", "CONTACT": {"PHONE": "123"}}
+    report = g.generate(business, str(tmp_path), g.GenerateOptions(dry_run=True, only={"faq.json"}), templates={})
+    assert {task.name for task in report.tasks} == {
+        "faq.json", "search-index.ts", "chat-index.json",
+    }
+
+
+def test_with_dependents_is_transitive():
+    tasks = [
+        g.Task("a", None, "data"),
+        g.Task("b", None, "data", ("a",)),
+        g.Task("c", None, "data", ("b",)),
+        g.Task("d", None, "data"),
+    ]
+    assert g.with_dependents(tasks, {"a"}) == {"a", "b", "c"}
+    assert g.with_dependents(tasks, {"d"}) == {"d"}
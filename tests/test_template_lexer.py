@@ -0,0 +1,56 @@
+"""escape_apostrophes against the regex protect/restore pass it replaced"""
+import random
+import re
+
+import pytest
+
+import generate_rules as g
+
+
+def regex_escape(content):
+    # The pre-lexer implementation, kept verbatim as the reference
+    protected_content = []
+    def protect_and_replace(match):
+        protected_content.append(match.group(0))
+        return f'__PROTECTED_{len(protected_content)-1}__'
+    content = re.sub(r'<[^>]*>|{[^}]*}', protect_and_replace, content)
+    content = content.replace("'", "&apos;")
+    for i, text in enumerate(protected_content):
+        content = content.replace(f'__PROTECTED_{i}__', text)
+    return content
+
+
+EDGE_TEMPLATES = [
+    "",
+    "it's",
+    "<p>it's</p>",
+    "<a href='/x'>Joe's</a>",
+    "{'a'} isn't {b}",
+    "{isOpen ? 'yes' : 'no'}",
+    "a < b and it's > c",
+    "unclosed <div class='x' it's",
+    "unclosed {value 'x' it's",
+    "it's > and } first, then < and {",
+    "<p>{'nested'}</p> it's",
+    "{<b>'mixed'</b>}'",
+    "<p {attr}>'a'</p>",
+    "<a {b>'c'}",
+    "'<'>'{'}'",
+    "<<'>>",
+    "{{'x'}}'",
+    "multi\nline <div\n  class='x'\n>it's\n</div>",
+    "''''",
+]
+
+
+@pytest.mark.parametrize("template", EDGE_TEMPLATES)
+def test_matches_regex_on_edge_templates(template):
+    assert g.escape_apostrophes(template) == regex_escape(template)
+
+
+def test_matches_regex_on_random_templates():
+    rng = random.Random(11)
+    alphabet = "<>{}'a \n"
+    for _ in range(20000):
+        template = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+        assert g.escape_apostrophes(template) == regex_escape(template), template
@@ -0,0 +1,122 @@
+"""scan_ts_declarations / replace_ts_declarations (lib/seo-config.ts patching)"""
+import os
+
+import generate_rules as g
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def spans(source):
+    return {name: source[start:end] for name, (start, end) in g.scan_ts_declarations(source).items()}
+
+
+def line_spans(source):
+    return {
+        name: (source.count("\n", 0, start) + 1, source.count("\n", 0, end) + 1)
+        for name, (start, end) in g.scan_ts_declarations(source).items()
+    }
+
+
+def test_real_seo_config_spans():
+    with open(os.path.join(REPO_ROOT, "lib/seo-config.ts"), encoding="utf-8") as f:
+        source = f.read()
+    assert line_spans(source) == {
+        "siteConfig": (87, 120),
+        "seoConfigs": (122, 409),
+        "roomsSEOData": (412, 587),
+        "attractionsSEOData": (590, 831),
+        "defaultSEO": (833, 857),
+    }
+    for name, text in spans(source).items():
+        assert text.startswith(f"export const {name}")
+        assert text.endswith("};")
+
+
+def test_braces_in_strings_and_comments():
+    source = (
+        'export const a = { s: "}", t: \'{\', u: `}${ {x: "}"}.x }`, // }\n'
+        "  /* } */ v: 1 };\n"
+        "export const b = 2;\n"
+    )
+    assert spans(source) == {
+        "a": source[:source.index(";") + 1],
+        "b": "export const b = 2;",
+    }
+
+
+def test_regex_literals():
+    source = (
+        "export const a = [/{/, x.replace(/}/g, '')];\n"
+        "export const b = () => { return /{/.test(y); };\n"
+        "export const c = () => typeof z / 2;\n"
+        "export const d = { ok: true };\n"
+    )
+    assert list(spans(source).values()) == source.splitlines()
+
+
+def test_missing_semicolon_ends_at_line_break():
+    source = (
+        "export const a = {\n"
+        "  x: 1\n"
+        "}\n"
+        "function helper() { return 1; }\n"
+        "export const b = [1, 2]\n"
+        "  .map((v) => v)\n"
+        "const c = 3;\n"
+    )
+    assert spans(source) == {
+        "a": "export const a = {\n  x: 1\n}",
+        "b": "export const b = [1, 2]\n  .map((v) => v)",
+    }
+
+
+def test_replace_leaves_other_declarations():
+    source = "export const a = { x: 1 };\nexport const b = { y: 2 };\n"
+    result, missing = g.replace_ts_declarations(source, {"b": "export const b = {};", "z": ""})
+    assert result == "export const a = { x: 1 };\nexport const b = {};\n"
+    assert missing == ["z"]
+
+
+def test_seo_config_only_replaces_site_config(tmp_path):
+    with open(os.path.join(REPO_ROOT, "lib/seo-config.ts"), encoding="utf-8") as f:
+        source = f.read()
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib/seo-config.ts").write_text(source, encoding="utf-8")
+    business = {"BUSINESS_NAME": "Test Hotel", "WEBSITE_URL": "https://test.example"}
+    g.generate_seo_config(business, str(tmp_path))
+
+    result = (tmp_path / "lib/seo-config.ts").read_text(encoding="utf-8")
+    before, after = spans(source), spans(result)
+    assert 'name: "Test Hotel"' in after["siteConfig"]
+    for name in ("seoConfigs", "roomsSEOData", "attractionsSEOData", "defaultSEO"):
+        assert after[name] == before[name]
+
+
+def test_declaration_ends_across_blank_lines():
+    source = "export const a = {\n  x: 1\n}\n\n\n   \n// next\nexport const b = [1]\n\n\n  .length\n"
+    assert spans(source) == {
+        "a": "export const a = {\n  x: 1\n}",
+        "b": "export const b = [1]\n\n\n  .length",
+    }
+
+
+def test_parse_ts_literal():
+    source = '''export const ROOMS: Record<string, {name: string; tags: string[]}> = {
+  // comment
+  "twin-1": { name: 'Twin \\'1\\'', tags: ["Bed", `${siteConfig.url}/rooms/`], price: 28, url: siteConfig.url, },
+  twin2: { name: "Twin 2", tags: [], hidden: true, id: siteConfig.social.facebookAppId },
+} as const;
+'''
+    variables = {"siteConfig": {"url": "https://x.test", "social": {}}}
+    assert g.read_ts_constant([], "ROOMS") is None
+    start = source.index("= {") + 1
+    assert g.parse_ts_literal(source, start, variables)[0] == {
+        "twin-1": {"name": "Twin '1'", "tags": ["Bed", "https://x.test/rooms/"], "price": 28, "url": "https://x.test"},
+        "twin2": {"name": "Twin 2", "tags": [], "hidden": True, "id": None},
+    }
+    try:
+        g.parse_ts_literal("{ url: process.env.URL || 'x' }")
+    except ValueError as e:
+        assert "line 1" in str(e)
+    else:
+        raise AssertionError("expressions are not literals")